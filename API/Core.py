@@ -13,7 +13,15 @@ class Core:
 
     def __init__(self):
         self.api_key = self.load_api_key()
-        self.client = RiotAPIClient(default_headers={"X-Riot-Token": self.api_key})
+        # RIOT_API_BASE_URL: serveur local qui imite l'API Riot (ex: "http://localhost:8080/{region}"),
+        # "{region}" est remplacé par la région/plateforme (comme le fait pulsefire), pour rejouer un crawl hors ligne
+        self.base_url = os.getenv("RIOT_API_BASE_URL")
+        if self.base_url:
+            self.client = RiotAPIClient(
+                base_url=self.base_url, default_headers={"X-Riot-Token": self.api_key}
+            )
+        else:
+            self.client = RiotAPIClient(default_headers={"X-Riot-Token": self.api_key})
 
     def load_api_key(self):
         api_key = os.getenv("RIOT_API_KEY")
@@ -85,4 +93,6 @@ class Core:
             return None
 
     def build_region_url(self, region, path):
+        if self.base_url:
+            return f"{self.base_url.format(region=region)}{path}"
         return f"{self.REGION_URLS[region]}{path}"
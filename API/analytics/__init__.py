@@ -1,4 +1,5 @@
 from .stats_extractor import extract_match_stats, extract_timeline_stats
+from .match_fields import MATCH_STATS_FIELDS, compile_match_stats_extractor
 from .stats_aggregator import aggregate_stats, get_role_specific_stats, get_rank_string
 from .location_pipeline import (
     create_location_pipeline,
@@ -7,10 +8,16 @@ from .location_pipeline import (
     get_location_heatmap_data,
     MAP_AREAS
 )
+from .heatmap import build_heatmap, merge_heatmaps, smooth_heatmap
+from .spatial_index import EventSpatialIndex, build_event_index
+from .participant_index import ParticipantIndex, build_participant_index
+from .trajectory import build_trajectory, classify_regions, summarize_trajectory
 
 __all__ = [
     "extract_match_stats",
     "extract_timeline_stats",
+    "MATCH_STATS_FIELDS",
+    "compile_match_stats_extractor",
     "aggregate_stats",
     "get_role_specific_stats",
     "get_rank_string",
@@ -19,4 +26,14 @@ __all__ = [
     "get_area_stats",
     "get_location_heatmap_data",
     "MAP_AREAS",
+    "build_heatmap",
+    "merge_heatmaps",
+    "smooth_heatmap",
+    "EventSpatialIndex",
+    "build_event_index",
+    "ParticipantIndex",
+    "build_participant_index",
+    "build_trajectory",
+    "classify_regions",
+    "summarize_trajectory",
 ]
@@ -0,0 +1,176 @@
+from typing import Dict, List, Optional, Tuple
+from .map_utils import MAP_SIZE, GAME_PHASES, get_game_phase
+
+# Heatmaps agrégées côté serveur: taille fixe quel que soit le nombre de matchs
+
+HEATMAP_BINS = 20
+
+HEATMAP_ROLES = ['TOP', 'JUNGLE', 'MIDDLE', 'BOTTOM', 'UTILITY']
+
+HEATMAP_EVENT_FIELDS = {
+    'deaths': 'death_events',
+    'kills': 'kill_events',
+    'assists': 'assist_events',
+    'objectives': 'objective_events',
+}
+
+
+def create_grid(bins: int = HEATMAP_BINS) -> List[List[float]]:
+    return [[0] * bins for _ in range(bins)]
+
+
+def bin_position(x: int, y: int, bins: int = HEATMAP_BINS) -> Tuple[int, int]:
+    # ligne = y, colonne = x, les positions en bord de carte tombent dans la dernière case
+    col = min(max(int(x * bins / MAP_SIZE), 0), bins - 1)
+    row = min(max(int(y * bins / MAP_SIZE), 0), bins - 1)
+    return row, col
+
+
+def create_layer(bins: int = HEATMAP_BINS) -> Dict:
+    return {
+        'count': 0,
+        'all': create_grid(bins),
+        'phases': {phase: create_grid(bins) for phase in GAME_PHASES},
+        'roles': {role: create_grid(bins) for role in HEATMAP_ROLES},
+    }
+
+
+def create_heatmap(bins: int = HEATMAP_BINS) -> Dict:
+    return {
+        'bins': bins,
+        'map_size': MAP_SIZE,
+        'matches': 0,
+        'layers': {event_type: create_layer(bins) for event_type in HEATMAP_EVENT_FIELDS},
+    }
+
+
+def add_event(heatmap: Dict, event_type: str, x: int, y: int,
+              timestamp: float = 0, role: Optional[str] = None) -> bool:
+    if x <= 0 or y <= 0:
+        return False
+
+    layer = heatmap['layers'][event_type]
+    row, col = bin_position(x, y, heatmap['bins'])
+
+    layer['count'] += 1
+    layer['all'][row][col] += 1
+    layer['phases'][get_game_phase(timestamp)][row][col] += 1
+    if role in layer['roles']:
+        layer['roles'][role][row][col] += 1
+
+    return True
+
+
+def add_match(heatmap: Dict, match: Dict, position_filter=None) -> None:
+    role = match.get('role')
+    heatmap['matches'] += 1
+
+    for event_type, field in HEATMAP_EVENT_FIELDS.items():
+        for event in match.get(field, []):
+            x = event.get('x', 0)
+            y = event.get('y', 0)
+
+            if position_filter and not position_filter(x, y):
+                continue
+
+            add_event(heatmap, event_type, x, y, event.get('timestamp', 0), role)
+
+
+def build_heatmap(
+    processed_matches: List[Dict],
+    bins: int = HEATMAP_BINS,
+    position_filter=None
+) -> Dict:
+    heatmap = create_heatmap(bins)
+
+    for match in processed_matches:
+        add_match(heatmap, match, position_filter)
+
+    return heatmap
+
+
+def merge_grids(target: List[List[float]], source: List[List[float]]) -> None:
+    for target_row, source_row in zip(target, source):
+        for col, value in enumerate(source_row):
+            target_row[col] += value
+
+
+def merge_heatmaps(target: Dict, source: Dict) -> Dict:
+    # fusion en place: les comptes s'additionnent, utile pour combiner plusieurs saisons/joueurs
+    if target['bins'] != source['bins']:
+        raise ValueError(
+            f"Cannot merge heatmaps with different bin counts ({target['bins']} vs {source['bins']})"
+        )
+
+    target['matches'] += source['matches']
+
+    for event_type, source_layer in source['layers'].items():
+        target_layer = target['layers'].setdefault(event_type, create_layer(target['bins']))
+        target_layer['count'] += source_layer['count']
+        merge_grids(target_layer['all'], source_layer['all'])
+
+        for group in ('phases', 'roles'):
+            for key, grid in source_layer[group].items():
+                if key not in target_layer[group]:
+                    target_layer[group][key] = create_grid(target['bins'])
+                merge_grids(target_layer[group][key], grid)
+
+    return target
+
+
+def binomial_kernel(radius: int) -> List[float]:
+    weights = [1]
+    for _ in range(2 * radius):
+        weights = [a + b for a, b in zip([0] + weights, weights + [0])]
+    total = sum(weights)
+    return [w / total for w in weights]
+
+
+def smooth_grid(grid: List[List[float]], radius: int = 1) -> List[List[float]]:
+    # flou séparable (lignes puis colonnes), les bords sont renormalisés pour ne pas être assombris
+    if radius <= 0:
+        return [list(row) for row in grid]
+
+    kernel = binomial_kernel(radius)
+    size = len(grid)
+
+    def blur_line(values):
+        blurred = []
+        for i in range(len(values)):
+            total = 0.0
+            weight = 0.0
+            for k, w in enumerate(kernel):
+                j = i + k - radius
+                if 0 <= j < len(values):
+                    total += values[j] * w
+                    weight += w
+            blurred.append(total / weight if weight else 0.0)
+        return blurred
+
+    rows = [blur_line(row) for row in grid]
+    columns = [blur_line([rows[r][c] for r in range(size)]) for c in range(len(rows[0]) if rows else 0)]
+
+    return [
+        [round(columns[c][r], 3) for c in range(len(columns))]
+        for r in range(size)
+    ]
+
+
+def smooth_heatmap(heatmap: Dict, radius: int = 1) -> Dict:
+    smoothed = {
+        'bins': heatmap['bins'],
+        'map_size': heatmap['map_size'],
+        'matches': heatmap['matches'],
+        'smoothing_radius': radius,
+        'layers': {},
+    }
+
+    for event_type, layer in heatmap['layers'].items():
+        smoothed['layers'][event_type] = {
+            'count': layer['count'],
+            'all': smooth_grid(layer['all'], radius),
+            'phases': {k: smooth_grid(g, radius) for k, g in layer['phases'].items()},
+            'roles': {k: smooth_grid(g, radius) for k, g in layer['roles'].items()},
+        }
+
+    return smoothed
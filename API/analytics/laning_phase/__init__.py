@@ -1,9 +1,11 @@
 from .wave_management import analyze_wave_management, aggregate_wave_management_stats
 from .trading_analysis import analyze_trading_efficiency, aggregate_trading_stats
+from .laning_kernel import analyze_laning_phase
 
 __all__ = [
     'analyze_wave_management',
     'analyze_trading_efficiency',
     'aggregate_wave_management_stats',
-    'aggregate_trading_stats'
+    'aggregate_trading_stats',
+    'analyze_laning_phase'
 ]
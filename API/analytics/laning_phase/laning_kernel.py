@@ -0,0 +1,168 @@
+from collections import deque
+from typing import Dict, Optional, Tuple
+from .wave_management import (
+    get_lane_position_zone,
+    detect_wave_state,
+    update_cs_window,
+    is_recall,
+    classify_recall,
+    build_wave_management_result,
+)
+from .trading_analysis import (
+    read_damage_totals,
+    build_damage_trade,
+    record_damage_checkpoint,
+    build_trading_result,
+)
+
+# Noyau phase de lane: une seule passe sur les frames avant laning_end_time
+# pour le wave management et l'analyse des trades
+
+
+def find_lane_participant(match_data: Dict, participant_id: int) -> Optional[Dict]:
+    for p in match_data["info"]["participants"]:
+        if p["participantId"] == participant_id:
+            return p
+    return None
+
+
+def analyze_laning_phase(
+    match_data: Dict,
+    timeline_data: Dict,
+    participant_id: int,
+    role: str,
+    team_side: str,
+    opponent_id: Optional[int] = None,
+    laning_end_time: int = 14,
+    participant: Optional[Dict] = None
+) -> Tuple[Dict, Dict]:
+    if not timeline_data or "info" not in timeline_data or "frames" not in timeline_data["info"]:
+        return {}, {}
+
+    frames = timeline_data["info"]["frames"]
+
+    if participant is None:
+        participant = find_lane_participant(match_data, participant_id)
+
+    participant_key = str(participant_id)
+    opponent_key = str(opponent_id) if opponent_id else None
+
+    # wave management
+    zone_time = {"own_tower": 0, "middle": 0, "enemy_tower": 0, "unknown": 0}
+    wave_states = []
+    current_zone = "unknown"
+    zone_start_time = 0
+    cs_window = deque()
+    recalls = []
+    last_position = None
+    last_gold = 0
+    last_cs = 0
+    cs_curve = []
+
+    # trading
+    damage_trades_count = 0
+    last_damage_dealt = 0
+    last_damage_taken = 0
+    damage_at_checkpoints = {
+        "5min": {},
+        "10min": {},
+        "14min": {}
+    }
+    opponent_damage = (0, 0) if opponent_id else None
+
+    for frame in frames:
+        timestamp_minutes = frame["timestamp"] / 60000
+        if timestamp_minutes > laning_end_time:
+            break
+
+        participant_frames = frame["participantFrames"]
+        opponent_frame = participant_frames.get(opponent_key) if opponent_key else None
+
+        if opponent_frame:
+            opponent_damage = read_damage_totals(opponent_frame)
+
+        participant_frame = participant_frames.get(participant_key)
+        if not participant_frame:
+            continue
+
+        timestamp_seconds = frame["timestamp"] / 1000
+        position = participant_frame.get("position", {})
+        pos_x = position.get("x", 0)
+        pos_y = position.get("y", 0)
+        current_gold = participant_frame.get("totalGold", 0)
+        current_cs = (
+            participant_frame.get("minionsKilled", 0) +
+            participant_frame.get("jungleMinionsKilled", 0)
+        )
+
+        # positionnement et état de la wave
+        if pos_x > 0 and pos_y > 0:
+            zone = get_lane_position_zone(pos_x, pos_y, role, team_side)
+
+            if zone != current_zone:
+                time_in_zone = timestamp_seconds - zone_start_time
+                zone_time[current_zone] = zone_time.get(current_zone, 0) + time_in_zone
+                current_zone = zone
+                zone_start_time = timestamp_seconds
+
+            cs_rate = update_cs_window(cs_window, timestamp_minutes, current_cs)
+            wave_states.append({
+                "timestamp": timestamp_minutes,
+                "zone": zone,
+                "wave_state": detect_wave_state(cs_rate, zone, timestamp_seconds - zone_start_time),
+                "cs_rate": round(cs_rate, 2)
+            })
+
+        # retours base
+        if last_position and is_recall(position, last_position):
+            recalls.append(classify_recall(timestamp_minutes, current_gold - last_gold, last_cs))
+
+        last_position = position
+        last_gold = current_gold
+        last_cs = current_cs
+
+        # courbe de CS vs adversaire
+        cs_diff = 0
+        if opponent_frame:
+            opponent_cs = (
+                opponent_frame.get("minionsKilled", 0) +
+                opponent_frame.get("jungleMinionsKilled", 0)
+            )
+            cs_diff = current_cs - opponent_cs
+
+        cs_curve.append({
+            "timestamp": round(timestamp_minutes, 1),
+            "cs": current_cs,
+            "cs_diff": cs_diff
+        })
+
+        # trades
+        damage_dealt, damage_taken = read_damage_totals(participant_frame)
+
+        if build_damage_trade(timestamp_minutes, damage_dealt, damage_taken, last_damage_dealt, last_damage_taken):
+            damage_trades_count += 1
+
+        record_damage_checkpoint(
+            damage_at_checkpoints, timestamp_minutes, damage_dealt, damage_taken, laning_end_time
+        )
+
+        last_damage_dealt = damage_dealt
+        last_damage_taken = damage_taken
+
+    wave_management = build_wave_management_result(
+        laning_end_time, zone_time, wave_states, recalls, cs_curve
+    )
+
+    trading_analysis = {}
+    if participant:
+        trading_analysis = build_trading_result(
+            participant,
+            laning_end_time,
+            last_damage_dealt,
+            last_damage_taken,
+            damage_trades_count,
+            damage_at_checkpoints,
+            opponent_damage
+        )
+
+    return wave_management, trading_analysis
@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from ..map_utils import LANING_CHECKPOINTS
 
 
@@ -46,61 +46,24 @@ def analyze_trading_efficiency(
         if not participant_frame:
             continue
 
-        damage_dealt = participant_frame.get("damageStats", {}).get("totalDamageDoneToChampions", 0)
-        damage_taken = participant_frame.get("damageStats", {}).get("totalDamageTaken", 0)
-
-        damage_dealt_delta = damage_dealt - last_damage_dealt
-        damage_taken_delta = damage_taken - last_damage_taken
-
-        if damage_dealt_delta > 0 or damage_taken_delta > 0:
-            trade_efficiency = 0
-            if damage_taken_delta > 0:
-                trade_efficiency = damage_dealt_delta / damage_taken_delta
-            elif damage_dealt_delta > 0:
-                trade_efficiency = float('inf')
-
-            damage_trades.append({
-                "timestamp": timestamp_minutes,
-                "damage_dealt": damage_dealt_delta,
-                "damage_taken": damage_taken_delta,
-                "trade_efficiency": trade_efficiency if trade_efficiency != float('inf') else 999,
-                "total_damage_dealt": damage_dealt,
-                "total_damage_taken": damage_taken
-            })
-
-        if LANING_CHECKPOINTS['5MIN_START'] <= timestamp_minutes <= LANING_CHECKPOINTS['5MIN_END']:
-            damage_at_checkpoints["5min"] = {
-                "damage_dealt": damage_dealt,
-                "damage_taken": damage_taken,
-                "timestamp": timestamp_minutes
-            }
-        elif LANING_CHECKPOINTS['10MIN_START'] <= timestamp_minutes <= LANING_CHECKPOINTS['10MIN_END']:
-            damage_at_checkpoints["10min"] = {
-                "damage_dealt": damage_dealt,
-                "damage_taken": damage_taken,
-                "timestamp": timestamp_minutes
-            }
-        elif LANING_CHECKPOINTS['14MIN_START'] <= timestamp_minutes <= laning_end_time:
-            damage_at_checkpoints["14min"] = {
-                "damage_dealt": damage_dealt,
-                "damage_taken": damage_taken,
-                "timestamp": timestamp_minutes
-            }
+        damage_dealt, damage_taken = read_damage_totals(participant_frame)
 
-        last_damage_dealt = damage_dealt
-        last_damage_taken = damage_taken
+        trade = build_damage_trade(
+            timestamp_minutes, damage_dealt, damage_taken, last_damage_dealt, last_damage_taken
+        )
+        if trade:
+            damage_trades.append(trade)
 
-    total_damage_dealt_in_lane = last_damage_dealt
-    total_damage_taken_in_lane = last_damage_taken
+        record_damage_checkpoint(
+            damage_at_checkpoints, timestamp_minutes, damage_dealt, damage_taken, laning_end_time
+        )
 
-    overall_trade_efficiency = 0
-    if total_damage_taken_in_lane > 0:
-        overall_trade_efficiency = total_damage_dealt_in_lane / total_damage_taken_in_lane
+        last_damage_dealt = damage_dealt
+        last_damage_taken = damage_taken
 
-    opponent_trading = {}
+    opponent_damage = None
     if opponent_id:
-        opponent_damage_dealt = 0
-        opponent_damage_taken = 0
+        opponent_damage = (0, 0)
 
         for frame in frames:
             timestamp_minutes = frame["timestamp"] / 60000
@@ -109,9 +72,95 @@ def analyze_trading_efficiency(
 
             opponent_frame = frame["participantFrames"].get(str(opponent_id))
             if opponent_frame:
-                opponent_damage_dealt = opponent_frame.get("damageStats", {}).get("totalDamageDoneToChampions", 0)
-                opponent_damage_taken = opponent_frame.get("damageStats", {}).get("totalDamageTaken", 0)
+                opponent_damage = read_damage_totals(opponent_frame)
+
+    return build_trading_result(
+        participant,
+        laning_end_time,
+        last_damage_dealt,
+        last_damage_taken,
+        len(damage_trades),
+        damage_at_checkpoints,
+        opponent_damage
+    )
+
+
+def read_damage_totals(participant_frame: Dict) -> Tuple[int, int]:
+    damage_stats = participant_frame.get("damageStats", {})
+    return (
+        damage_stats.get("totalDamageDoneToChampions", 0),
+        damage_stats.get("totalDamageTaken", 0)
+    )
+
+
+def build_damage_trade(
+    timestamp_minutes: float,
+    damage_dealt: int,
+    damage_taken: int,
+    last_damage_dealt: int,
+    last_damage_taken: int
+) -> Optional[Dict]:
+    damage_dealt_delta = damage_dealt - last_damage_dealt
+    damage_taken_delta = damage_taken - last_damage_taken
 
+    if damage_dealt_delta <= 0 and damage_taken_delta <= 0:
+        return None
+
+    trade_efficiency = 0
+    if damage_taken_delta > 0:
+        trade_efficiency = damage_dealt_delta / damage_taken_delta
+    elif damage_dealt_delta > 0:
+        trade_efficiency = float('inf')
+
+    return {
+        "timestamp": timestamp_minutes,
+        "damage_dealt": damage_dealt_delta,
+        "damage_taken": damage_taken_delta,
+        "trade_efficiency": trade_efficiency if trade_efficiency != float('inf') else 999,
+        "total_damage_dealt": damage_dealt,
+        "total_damage_taken": damage_taken
+    }
+
+
+def record_damage_checkpoint(
+    damage_at_checkpoints: Dict,
+    timestamp_minutes: float,
+    damage_dealt: int,
+    damage_taken: int,
+    laning_end_time: int
+) -> None:
+    checkpoint = None
+    if LANING_CHECKPOINTS['5MIN_START'] <= timestamp_minutes <= LANING_CHECKPOINTS['5MIN_END']:
+        checkpoint = "5min"
+    elif LANING_CHECKPOINTS['10MIN_START'] <= timestamp_minutes <= LANING_CHECKPOINTS['10MIN_END']:
+        checkpoint = "10min"
+    elif LANING_CHECKPOINTS['14MIN_START'] <= timestamp_minutes <= laning_end_time:
+        checkpoint = "14min"
+
+    if checkpoint:
+        damage_at_checkpoints[checkpoint] = {
+            "damage_dealt": damage_dealt,
+            "damage_taken": damage_taken,
+            "timestamp": timestamp_minutes
+        }
+
+
+def build_trading_result(
+    participant: Dict,
+    laning_end_time: int,
+    total_damage_dealt_in_lane: int,
+    total_damage_taken_in_lane: int,
+    damage_trades_count: int,
+    damage_at_checkpoints: Dict,
+    opponent_damage: Optional[Tuple[int, int]] = None
+) -> Dict:
+    overall_trade_efficiency = 0
+    if total_damage_taken_in_lane > 0:
+        overall_trade_efficiency = total_damage_dealt_in_lane / total_damage_taken_in_lane
+
+    opponent_trading = {}
+    if opponent_damage is not None:
+        opponent_damage_dealt, opponent_damage_taken = opponent_damage
         opponent_trading = {
             "damage_dealt": opponent_damage_dealt,
             "damage_taken": opponent_damage_taken,
@@ -140,7 +189,7 @@ def analyze_trading_efficiency(
         "damage_taken_per_minute_laning": round(total_damage_taken_in_lane / laning_end_time, 1),
         "laning_damage_pct_of_total": round(laning_damage_dealt_pct, 1),
         "laning_damage_taken_pct_of_total": round(laning_damage_taken_pct, 1),
-        "damage_trades_count": len(damage_trades),
+        "damage_trades_count": damage_trades_count,
         "damage_checkpoints": damage_at_checkpoints,
         "opponent_trading": opponent_trading,
         "damage_self_mitigated_full_game": damage_self_mitigated,
@@ -1,3 +1,4 @@
+from collections import deque
 from typing import Dict, List, Optional, Tuple
 from ..map_utils import (
     LANE_POSITION_THRESHOLDS,
@@ -5,6 +6,8 @@ from ..map_utils import (
     RECALL_CONSTANTS,
 )
 
+CS_RATE_WINDOW_MINUTES = 2
+
 
 def get_top_lane_zone(x: int, team_side: str) -> str:
     # zone top lane selon X
@@ -101,6 +104,44 @@ def detect_wave_state(cs_rate: float, position_zone: str, time_in_zone: int) ->
     return "unknown"
 
 
+def is_recall(current_position: Dict, last_position: Dict) -> bool:
+    # retour base: position à la fontaine ou téléportation entre deux frames
+    pos_x = current_position.get("x", 0)
+    pos_y = current_position.get("y", 0)
+    last_x = last_position.get("x", 0)
+    last_y = last_position.get("y", 0)
+
+    blue_max = FOUNTAIN_THRESHOLDS['BLUE_FOUNTAIN_MAX']
+    red_min = FOUNTAIN_THRESHOLDS['RED_FOUNTAIN_MIN']
+
+    at_fountain = (
+        (pos_x < blue_max and pos_y < blue_max) or
+        (pos_x > red_min and pos_y > red_min)
+    )
+
+    distance_moved = ((pos_x - last_x)**2 + (pos_y - last_y)**2)**0.5
+    teleport_threshold = RECALL_CONSTANTS['TELEPORT_DISTANCE_THRESHOLD']
+
+    return at_fountain or distance_moved > teleport_threshold
+
+
+def classify_recall(timestamp_minutes: float, gold_on_recall: int, cs_before_recall: int) -> Dict:
+    recall_quality = "unknown"
+    if gold_on_recall >= RECALL_CONSTANTS['GOOD_RECALL_GOLD']:
+        recall_quality = "good_gold"
+    elif gold_on_recall >= RECALL_CONSTANTS['ACCEPTABLE_RECALL_GOLD']:
+        recall_quality = "acceptable"
+    elif gold_on_recall < RECALL_CONSTANTS['EARLY_RECALL_GOLD']:
+        recall_quality = "early"
+
+    return {
+        "timestamp": timestamp_minutes,
+        "gold_on_recall": gold_on_recall,
+        "cs_on_recall": cs_before_recall,
+        "recall_quality": recall_quality
+    }
+
+
 def analyze_recall_timing(
     frames: List[Dict],
     participant_id: int,
@@ -110,7 +151,6 @@ def analyze_recall_timing(
     last_position = None
     last_gold = 0
     last_cs = 0
-    position_history = []
 
     for frame in frames:
         timestamp_minutes = frame["timestamp"] / 60000
@@ -125,45 +165,8 @@ def analyze_recall_timing(
         current_gold = participant_frame.get("totalGold", 0)
         current_cs = participant_frame.get("minionsKilled", 0) + participant_frame.get("jungleMinionsKilled", 0)
 
-        position_history.append(current_position)
-        if len(position_history) > 3:
-            position_history.pop(0)
-
-        if last_position:
-            pos_x = current_position.get("x", 0)
-            pos_y = current_position.get("y", 0)
-            last_x = last_position.get("x", 0)
-            last_y = last_position.get("y", 0)
-
-            blue_max = FOUNTAIN_THRESHOLDS['BLUE_FOUNTAIN_MAX']
-            red_min = FOUNTAIN_THRESHOLDS['RED_FOUNTAIN_MIN']
-
-            at_fountain = (
-                (pos_x < blue_max and pos_y < blue_max) or
-                (pos_x > red_min and pos_y > red_min)
-            )
-
-            distance_moved = ((pos_x - last_x)**2 + (pos_y - last_y)**2)**0.5
-            teleport_threshold = RECALL_CONSTANTS['TELEPORT_DISTANCE_THRESHOLD']
-
-            if at_fountain or distance_moved > teleport_threshold:
-                gold_on_recall = current_gold - last_gold
-                cs_before_recall = last_cs
-
-                recall_quality = "unknown"
-                if gold_on_recall >= RECALL_CONSTANTS['GOOD_RECALL_GOLD']:
-                    recall_quality = "good_gold"
-                elif gold_on_recall >= RECALL_CONSTANTS['ACCEPTABLE_RECALL_GOLD']:
-                    recall_quality = "acceptable"
-                elif gold_on_recall < RECALL_CONSTANTS['EARLY_RECALL_GOLD']:
-                    recall_quality = "early"
-
-                recalls.append({
-                    "timestamp": timestamp_minutes,
-                    "gold_on_recall": gold_on_recall,
-                    "cs_on_recall": cs_before_recall,
-                    "recall_quality": recall_quality
-                })
+        if last_position and is_recall(current_position, last_position):
+            recalls.append(classify_recall(timestamp_minutes, current_gold - last_gold, last_cs))
 
         last_position = current_position
         last_gold = current_gold
@@ -214,6 +217,22 @@ def calculate_cs_differential_curve(
     return cs_curve
 
 
+def update_cs_window(cs_window: deque, timestamp_minutes: float, current_cs: int) -> float:
+    # fenêtre glissante de 2 min: les frames sont triées, on retire juste par la gauche
+    cs_window.append((timestamp_minutes, current_cs))
+    while timestamp_minutes - cs_window[0][0] > CS_RATE_WINDOW_MINUTES:
+        cs_window.popleft()
+
+    if len(cs_window) < 2:
+        return 0
+
+    time_diff = cs_window[-1][0] - cs_window[0][0]
+    cs_diff = cs_window[-1][1] - cs_window[0][1]
+    if time_diff > 0:
+        return cs_diff / time_diff
+    return 0
+
+
 def track_zone_positioning(
     frames: List[Dict],
     participant_id: int,
@@ -226,7 +245,7 @@ def track_zone_positioning(
     wave_states = []
     current_zone = "unknown"
     zone_start_time = 0
-    cs_window = []
+    cs_window = deque()
     last_cs = 0
 
     for frame in frames:
@@ -258,15 +277,7 @@ def track_zone_positioning(
                 current_zone = zone
                 zone_start_time = timestamp_seconds
 
-            cs_window.append({"time": timestamp_minutes, "cs": current_cs})
-            cs_window = [entry for entry in cs_window if timestamp_minutes - entry["time"] <= 2]
-
-            cs_rate = 0
-            if len(cs_window) >= 2:
-                time_diff = cs_window[-1]["time"] - cs_window[0]["time"]
-                cs_diff = cs_window[-1]["cs"] - cs_window[0]["cs"]
-                if time_diff > 0:
-                    cs_rate = cs_diff / time_diff
+            cs_rate = update_cs_window(cs_window, timestamp_minutes, current_cs)
 
             time_in_current_zone = timestamp_seconds - zone_start_time
             wave_state = detect_wave_state(cs_rate, zone, time_in_current_zone)
@@ -345,6 +356,16 @@ def analyze_wave_management(
     recalls = analyze_recall_timing(frames, participant_id, laning_end_time)
     cs_curve = calculate_cs_differential_curve(frames, participant_id, opponent_id, laning_end_time)
 
+    return build_wave_management_result(laning_end_time, zone_time, wave_states, recalls, cs_curve)
+
+
+def build_wave_management_result(
+    laning_end_time: int,
+    zone_time: Dict,
+    wave_states: List[Dict],
+    recalls: List[Dict],
+    cs_curve: List[Dict]
+) -> Dict:
     zone_percentages = calculate_zone_percentages(zone_time)
     wave_state_counts = calculate_wave_state_distribution(wave_states)
     cs_trend = analyze_cs_trend(cs_curve)
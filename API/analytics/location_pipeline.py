@@ -5,6 +5,8 @@ from .map_utils import (
     get_region,
     is_near_objective
 )
+from .heatmap import HEATMAP_BINS, build_heatmap, smooth_heatmap
+from .spatial_index import EventSpatialIndex, build_timeline_index
 
 # Mais quelle merveille cette pipeline de localisation, non?
 
@@ -69,7 +71,8 @@ def is_in_area(x: int, y: int, area_name: str) -> bool:
 def filter_events_by_location(
     timeline_frames: List[Dict],
     area_name: str,
-    event_types: Optional[List[str]] = None
+    event_types: Optional[List[str]] = None,
+    index: Optional[EventSpatialIndex] = None
 ) -> List[Dict]:
     if area_name not in MAP_AREAS:
         return []
@@ -78,32 +81,34 @@ def filter_events_by_location(
     if event_types is None:
         event_types = area['event_types']
 
-    filtered_events = []
-
-    for frame in timeline_frames:
-        if 'events' not in frame:
-            continue
+    if index is None:
+        index = build_timeline_index(timeline_frames)
 
-        timestamp = frame.get('timestamp', 0)
+    # le carré englobant ne visite que les cellules autour de la zone, is_in_area tranche le cercle
+    center = area['center']
+    radius = area['radius']
+    candidates = index.query_rect(
+        center['x'] - radius, center['y'] - radius,
+        center['x'] + radius, center['y'] + radius
+    )
 
-        for event in frame['events']:
-            event_type = event.get('type')
+    filtered_events = []
 
-            if event_type not in event_types:
-                continue
+    for event in sorted(candidates, key=lambda e: e['sequence']):
+        if event['event_type'] not in event_types:
+            continue
 
-            position = event.get('position', {})
-            x = position.get('x', 0)
-            y = position.get('y', 0)
+        x = event['x']
+        y = event['y']
 
-            if x > 0 and y > 0 and is_in_area(x, y, area_name):
-                filtered_events.append({
-                    'timestamp': timestamp / 60000,  # en minutes
-                    'event_type': event_type,
-                    'position': {'x': x, 'y': y},
-                    'area': area_name,
-                    'raw_event': event
-                })
+        if is_in_area(x, y, area_name):
+            filtered_events.append({
+                'timestamp': event['timestamp'],  # en minutes
+                'event_type': event['event_type'],
+                'position': {'x': x, 'y': y},
+                'area': area_name,
+                'raw_event': event['data']
+            })
 
     return filtered_events
 
@@ -111,13 +116,14 @@ def filter_events_by_location(
 def get_area_stats(
     timeline_frames: List[Dict],
     participant_id: int,
-    area_name: str
+    area_name: str,
+    index: Optional[EventSpatialIndex] = None
 ) -> Dict:
     if area_name not in MAP_AREAS:
         return {}
 
     area = MAP_AREAS[area_name]
-    events = filter_events_by_location(timeline_frames, area_name)
+    events = filter_events_by_location(timeline_frames, area_name, index=index)
 
     participant_events = []
     for event_data in events:
@@ -163,37 +169,30 @@ def aggregate_location_data(
 
     frames = timeline_data['info']['frames']
 
+    # une seule passe sur les frames, chaque zone interroge ensuite l'index
+    index = build_timeline_index(frames)
+
     location_stats = {}
     for area_name in MAP_AREAS.keys():
-        location_stats[area_name] = get_area_stats(frames, participant_id, area_name)
+        location_stats[area_name] = get_area_stats(frames, participant_id, area_name, index=index)
 
     return location_stats
 
 
 def get_location_heatmap_data(
     processed_matches: List[Dict],
-    area_name: Optional[str] = None
+    area_name: Optional[str] = None,
+    bins: int = HEATMAP_BINS,
+    smoothing: int = 0
 ) -> Dict:
-    heatmap = {
-        'kills': [],
-        'deaths': [],
-        'assists': [],
-        'objectives': []
-    }
+    position_filter = None
+    if area_name is not None:
+        position_filter = lambda x, y: is_in_area(x, y, area_name)
+
+    heatmap = build_heatmap(processed_matches, bins=bins, position_filter=position_filter)
 
-    for match in processed_matches:
-        death_events = match.get('death_events', [])
-        for death in death_events:
-            x = death.get('x', 0)
-            y = death.get('y', 0)
-
-            if x > 0 and y > 0:
-                if area_name is None or is_in_area(x, y, area_name):
-                    heatmap['deaths'].append({
-                        'x': x,
-                        'y': y,
-                        'timestamp': death.get('timestamp', 0)
-                    })
+    if smoothing > 0:
+        return smooth_heatmap(heatmap, smoothing)
 
     return heatmap
 
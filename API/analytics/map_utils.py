@@ -38,8 +38,18 @@ LANING_CHECKPOINTS = {
     '14MIN_START': 13.5,
 }
 
+GAME_PHASES = {
+    'early': {'start': 0, 'end': 14},
+    'mid': {'start': 14, 'end': 25},
+    'late': {'start': 25, 'end': None},
+}
+
 OBJECTIVE_PROXIMITY_THRESHOLD = 3000
 
+# mort dans les 1.5 min avant un objectif épique pris par l'ennemi = throw
+OBJECTIVE_THROW_WINDOW = 1.5
+EPIC_OBJECTIVE_TYPES = ('BARON_NASHOR', 'DRAGON', 'RIFTHERALD')
+
 ROLE_HOME_REGIONS = {
     'TOP': ['TOP_LANE'],
     'MIDDLE': ['MID_LANE'],
@@ -69,6 +79,13 @@ def get_region(x: int, y: int) -> str:
     return 'JUNGLE'
 
 
+def get_game_phase(timestamp_minutes: float) -> str:
+    for phase, bounds in GAME_PHASES.items():
+        if bounds['end'] is None or timestamp_minutes <= bounds['end']:
+            return phase
+    return 'late'
+
+
 def calculate_distance(x1: int, y1: int, x2: int, y2: int) -> float:
     return math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
 
@@ -0,0 +1,217 @@
+from .participant_index import ParticipantIndex
+
+# Table déclarative des champs de extract_match_stats: chaque champ sait lire son chemin
+# dans le match / participant / challenges, on compile un extracteur qui ne lit que ceux demandés
+
+REQUIRED = object()
+
+
+def info_field(key):
+    return lambda match, participant, challenges, index: match["info"][key]
+
+
+def participant_field(key, default=REQUIRED):
+    if default is REQUIRED:
+        return lambda match, participant, challenges, index: participant[key]
+    return lambda match, participant, challenges, index: participant.get(key, default)
+
+
+def challenge_field(key, default=0):
+    return lambda match, participant, challenges, index: challenges.get(key, default)
+
+
+def game_minutes(match):
+    return match["info"]["gameDuration"] / 60
+
+
+def compute_kda(match, participant, challenges, index):
+    return (participant["kills"] + participant["assists"]) / max(participant["deaths"], 1)
+
+
+def compute_cs_per_min(match, participant, challenges, index):
+    total_cs = participant["totalMinionsKilled"] + participant["neutralMinionsKilled"]
+    return total_cs / game_minutes(match)
+
+
+def compute_damage_per_min(match, participant, challenges, index):
+    return participant["totalDamageDealtToChampions"] / game_minutes(match)
+
+
+def compute_vision_per_min(match, participant, challenges, index):
+    return participant["visionScore"] / game_minutes(match)
+
+
+def compute_kill_participation(match, participant, challenges, index):
+    kill_participation = challenges.get("killParticipation", 0)
+    if kill_participation == 0:
+        team_kills, _ = index.team_stats(participant["teamId"])
+        if team_kills > 0:
+            kill_participation = (participant["kills"] + participant["assists"]) / team_kills
+    return round(kill_participation, 3)
+
+
+def compute_damage_share(match, participant, challenges, index):
+    damage_share = challenges.get("teamDamagePercentage", 0)
+    if damage_share == 0:
+        _, team_damage = index.team_stats(participant["teamId"])
+        if team_damage > 0:
+            damage_share = participant["totalDamageDealtToChampions"] / team_damage
+    return round(damage_share, 3)
+
+
+def compute_role(match, participant, challenges, index):
+    return index.role_of(participant)
+
+
+def compute_opponent_champion(match, participant, challenges, index):
+    opponent = index.opponent_of(participant)
+    return opponent["championName"] if opponent else None
+
+
+def rune_style(participant, slot):
+    styles = (participant.get("perks") or {}).get("styles") or []
+    return styles[slot] if len(styles) > slot else {}
+
+
+def rune_style_field(slot):
+    return lambda match, participant, challenges, index: rune_style(participant, slot).get("style", 0)
+
+
+def rune_selections_field(slot):
+    return lambda match, participant, challenges, index: [
+        s.get("perk", 0) for s in rune_style(participant, slot).get("selections", [])
+    ]
+
+
+MATCH_STATS_FIELDS = {
+    "match_id": lambda match, participant, challenges, index: match["metadata"]["matchId"],
+    "game_duration": info_field("gameDuration"),
+    "game_creation": info_field("gameCreation"),
+    "game_end": info_field("gameEndTimestamp"),
+    "queue_id": info_field("queueId"),
+    "role": compute_role,
+    "champion_id": participant_field("championId"),
+    "champion_name": participant_field("championName"),
+    "win": participant_field("win"),
+    "kills": participant_field("kills"),
+    "deaths": participant_field("deaths"),
+    "assists": participant_field("assists"),
+    "kda": compute_kda,
+    "total_minions_killed": participant_field("totalMinionsKilled"),
+    "neutral_minions_killed": participant_field("neutralMinionsKilled"),
+    "cs_per_min": compute_cs_per_min,
+    "gold_earned": participant_field("goldEarned"),
+    "gold_spent": participant_field("goldSpent", 0),
+    "total_damage_to_champions": participant_field("totalDamageDealtToChampions"),
+    "damage_per_min": compute_damage_per_min,
+    "vision_score": participant_field("visionScore"),
+    "wards_placed": participant_field("wardsPlaced"),
+    "wards_killed": participant_field("wardsKilled"),
+    "control_wards_placed": participant_field("detectorWardsPlaced"),
+    "vision_score_per_min": compute_vision_per_min,
+    "turret_kills": participant_field("turretKills"),
+    "inhibitor_kills": participant_field("inhibitorKills"),
+    "dragon_kills": participant_field("dragonKills", 0),
+    "baron_kills": participant_field("baronKills", 0),
+    "double_kills": participant_field("doubleKills"),
+    "triple_kills": participant_field("tripleKills"),
+    "quadra_kills": participant_field("quadraKills"),
+    "penta_kills": participant_field("pentaKills"),
+    "team_position": participant_field("teamPosition", "UNKNOWN"),
+    "summoner_level": participant_field("summonerLevel", 0),
+    "kill_participation": compute_kill_participation,
+    "damage_share": compute_damage_share,
+    "first_blood_kill": participant_field("firstBloodKill", False),
+    "first_blood_assist": participant_field("firstBloodAssist", False),
+    "first_tower_kill": participant_field("firstTowerKill", False),
+    "first_tower_assist": participant_field("firstTowerAssist", False),
+    "total_damage_taken": participant_field("totalDamageTaken", 0),
+    "damage_self_mitigated": participant_field("damageSelfMitigated", 0),
+    "solo_kills": challenge_field("soloKills"),
+    "turret_plates_taken": challenge_field("turretPlatesTaken"),
+    "turret_takedowns": participant_field("turretTakedowns", 0),
+    "objectives_stolen": participant_field("objectivesStolen", 0),
+    "gold_per_minute": challenge_field("goldPerMinute"),
+    "vision_score_advantage_lane": challenge_field("visionScoreAdvantageLaneOpponent"),
+    "max_cs_advantage_lane": challenge_field("maxCsAdvantageOnLaneOpponent"),
+    "max_level_lead_lane": challenge_field("maxLevelLeadLaneOpponent"),
+    "opponent_champion": compute_opponent_champion,
+    "summoner1_id": participant_field("summoner1Id", 0),
+    "summoner2_id": participant_field("summoner2Id", 0),
+    "summoner1_casts": participant_field("summoner1Casts", 0),
+    "summoner2_casts": participant_field("summoner2Casts", 0),
+    "primary_rune_style": rune_style_field(0),
+    "sub_rune_style": rune_style_field(1),
+    "primary_rune_selections": rune_selections_field(0),
+    "sub_rune_selections": rune_selections_field(1),
+    "item0": participant_field("item0", 0),
+    "item1": participant_field("item1", 0),
+    "item2": participant_field("item2", 0),
+    "item3": participant_field("item3", 0),
+    "item4": participant_field("item4", 0),
+    "item5": participant_field("item5", 0),
+    "item6": participant_field("item6", 0),
+    "time_ccing_others": participant_field("timeCCingOthers", 0),
+    "total_time_cc_dealt": participant_field("totalTimeCCDealt", 0),
+    "total_time_spent_dead": participant_field("totalTimeSpentDead", 0),
+    "longest_time_spent_living": participant_field("longestTimeSpentLiving", 0),
+    "total_heal": participant_field("totalHeal", 0),
+    "total_heals_on_teammates": participant_field("totalHealsOnTeammates", 0),
+    "total_damage_shielded_on_teammates": participant_field("totalDamageShieldedOnTeammates", 0),
+    "rift_herald_takedowns": challenge_field("riftHeraldTakedowns"),
+    "nexus_takedowns": participant_field("nexusTakedowns", 0),
+    "nexus_kills": participant_field("nexusKills", 0),
+    "game_ended_in_early_surrender": participant_field("gameEndedInEarlySurrender", False),
+    "game_ended_in_surrender": participant_field("gameEndedInSurrender", False),
+    "team_early_surrendered": participant_field("teamEarlySurrendered", False),
+    "takedowns_first_10_minutes": challenge_field("takedownsFirst10Minutes"),
+    "lane_minions_first_10_minutes": challenge_field("laneMinionsFirst10Minutes"),
+    "early_laning_phase_gold_exp_advantage": challenge_field("earlyLaningPhaseGoldExpAdvantage"),
+    "jungler_kills_early_jungle": challenge_field("junglerKillsEarlyJungle"),
+    "epic_monster_steals": challenge_field("epicMonsterSteals"),
+    "baron_takedowns": challenge_field("baronTakedowns"),
+    "dragon_takedowns": challenge_field("dragonTakedowns"),
+    "elder_dragon_kills": challenge_field("elderDragonKillsWithOpposingSoul"),
+    "damage_per_minute_challenge": challenge_field("damagePerMinute"),
+    "kda_challenge": challenge_field("kda"),
+    "effective_heal_and_shielding": challenge_field("effectiveHealAndShielding"),
+    "kill_after_hidden_with_ally": challenge_field("killAfterHiddenWithAlly"),
+    "knocked_enemy_into_team_and_kill": challenge_field("knockEnemyIntoTeamAndKillThem"),
+    "multi_kill_one_spell": challenge_field("multiKillOneSpell"),
+    "pick_kill_with_ally": challenge_field("pickKillWithAlly"),
+    "solo_baron_kills": challenge_field("soloBaronKills"),
+    "solo_turrents": challenge_field("soloTurrents"),
+    "takedowns_after_gaining_level_advantage": challenge_field("takedownsAfterGainingLevelAdvantage"),
+    "teleport_takedowns": challenge_field("teleportTakedowns"),
+    "three_wards_one_sweeper": challenge_field("threeWardsOneSweeperCount"),
+    "vision_score_per_minute_challenge": challenge_field("visionScorePerMinute"),
+    "wards_guarded": challenge_field("wardsGuarded"),
+    "control_ward_time_coverage": challenge_field("controlWardTimeCoverageInRiverOrEnemyHalf"),
+}
+
+
+def compile_match_stats_extractor(fields=None):
+    # fields=None -> tous les champs, dans l'ordre de la table
+    if fields is None:
+        fields = list(MATCH_STATS_FIELDS)
+
+    unknown = [name for name in fields if name not in MATCH_STATS_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown match stats fields: {', '.join(unknown)}")
+
+    getters = tuple((name, MATCH_STATS_FIELDS[name]) for name in dict.fromkeys(fields))
+
+    def extract(match, puuid, index=None):
+        index = index or ParticipantIndex(match)
+        participant = index.get(puuid)
+        if not participant:
+            return None
+
+        challenges = participant.get("challenges", {})
+        return {
+            name: getter(match, participant, challenges, index)
+            for name, getter in getters
+        }
+
+    extract.fields = tuple(name for name, _ in getters)
+    return extract
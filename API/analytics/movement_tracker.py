@@ -1,5 +1,6 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 from .map_utils import get_region, calculate_distance, ROLE_HOME_REGIONS
+from .trajectory import build_trajectory, summarize_trajectory
 
 
 def track_map_presence(timeline_data: Dict, participant_id: int) -> Dict:
@@ -178,3 +179,128 @@ def calculate_jungle_time(timeline_data: Dict, participant_id: int) -> Dict:
     return {
         'jungle_time_percent': round((jungle_time / total_frames) * 100, 2)
     }
+
+
+EARLY_LANE_FRAMES = 15
+
+EARLY_LANE_HOME_REGIONS = {'TOP': 'TOP_LANE', 'MIDDLE': 'MID_LANE', 'BOTTOM': 'BOT_LANE', 'UTILITY': 'BOT_LANE'}
+
+
+def track_movement(timeline_data: Dict, participant_id: int, role: str,
+                   step_seconds: Optional[float] = None) -> Dict:
+    # step_seconds: trajectoire interpolée (frames + events) au lieu d'un point par minute;
+    # None garde l'échantillonnage par frame, comparable aux stats déjà stockées
+    if step_seconds:
+        trajectory = build_trajectory(timeline_data, participant_id, step_seconds)
+        return summarize_trajectory(
+            trajectory,
+            ROLE_HOME_REGIONS.get(role),
+            EARLY_LANE_HOME_REGIONS.get(role),
+            early_minutes=EARLY_LANE_FRAMES
+        )
+
+    # une seule passe: chaque position est classée une fois pour les quatre métriques
+    if not timeline_data or 'info' not in timeline_data:
+        return {
+            'map_presence': {},
+            'roaming': {},
+            'early_lane_presence': {},
+            'jungle_proximity': {},
+        }
+
+    frames = timeline_data['info'].get('frames', [])
+    home_regions = ROLE_HOME_REGIONS.get(role)
+    early_home_region = EARLY_LANE_HOME_REGIONS.get(role)
+
+    region_time = {'TOP_LANE': 0, 'MID_LANE': 0, 'BOT_LANE': 0, 'JUNGLE': 0, 'RIVER': 0}
+    last_position = None
+    total_distance = 0
+
+    roam_count = 0
+    in_roam = False
+    frames_roaming = 0
+    frames_home = 0
+
+    early_frames = 0
+    early_frames_in_lane = 0
+
+    for i, frame in enumerate(frames):
+        if 'participantFrames' not in frame:
+            continue
+
+        participant_frame = frame['participantFrames'].get(str(participant_id))
+        if not participant_frame or 'position' not in participant_frame:
+            continue
+
+        pos = participant_frame['position']
+        x, y = pos.get('x', 0), pos.get('y', 0)
+
+        if x == 0 and y == 0:
+            continue
+
+        region = get_region(x, y)
+
+        region_time[region] += 1
+        if last_position:
+            total_distance += calculate_distance(last_position[0], last_position[1], x, y)
+        last_position = (x, y)
+
+        if home_regions:
+            if region in home_regions:
+                frames_home += 1
+                in_roam = False
+            else:
+                frames_roaming += 1
+                if not in_roam:
+                    roam_count += 1
+                    in_roam = True
+
+        if early_home_region and i < EARLY_LANE_FRAMES:
+            early_frames += 1
+            if region == early_home_region:
+                early_frames_in_lane += 1
+
+    total_frames = sum(region_time.values())
+    if total_frames == 0:
+        return {
+            'map_presence': {},
+            'roaming': {},
+            'early_lane_presence': {},
+            'jungle_proximity': {},
+        }
+
+    map_presence = {
+        'region_distribution': {
+            region: round((time / total_frames) * 100, 2)
+            for region, time in region_time.items()
+        },
+        'total_distance_traveled': round(total_distance, 2),
+        'distance_per_minute': round(total_distance / max(total_frames, 1), 2),
+        'frames_tracked': total_frames
+    }
+
+    roaming = {}
+    if home_regions:
+        roaming = {
+            'roam_count': roam_count,
+            'time_in_lane_percent': round((frames_home / total_frames) * 100, 2),
+            'time_roaming_percent': round((frames_roaming / total_frames) * 100, 2),
+            'roams_per_10min': round((roam_count / total_frames) * 10, 2)
+        }
+
+    early_lane_presence = {}
+    if early_frames > 0:
+        early_lane_presence = {
+            'early_lane_presence_percent': round((early_frames_in_lane / early_frames) * 100, 2)
+        }
+
+    jungle_proximity = {
+        'jungle_time_percent': round((region_time['JUNGLE'] / total_frames) * 100, 2)
+    }
+
+    return {
+        'map_presence': map_presence,
+        'roaming': roaming,
+        'early_lane_presence': early_lane_presence,
+        'jungle_proximity': jungle_proximity,
+    }
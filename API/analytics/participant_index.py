@@ -0,0 +1,59 @@
+from ..utils.helpers import detect_role
+
+# Index par match construit une fois: puuid / participantId / équipe / rôle / adversaire en O(1)
+
+
+class ParticipantIndex:
+
+    def __init__(self, match):
+        self.participants = match["info"]["participants"]
+        self.by_puuid = {}
+        self.by_id = {}
+        self.roles = {}
+        self.by_team_role = {}
+        self.team_totals = {}
+
+        for participant in self.participants:
+            participant_id = participant.get("participantId")
+            team_id = participant["teamId"]
+            role = detect_role(participant)
+
+            self.by_puuid[participant["puuid"]] = participant
+            self.by_id[participant_id] = participant
+            self.roles[participant_id] = role
+            self.by_team_role[(team_id, role)] = participant
+
+            totals = self.team_totals.setdefault(team_id, {"kills": 0, "damage": 0, "gold": 0})
+            totals["kills"] += participant["kills"]
+            totals["damage"] += participant["totalDamageDealtToChampions"]
+            totals["gold"] += participant.get("goldEarned", 0)
+
+    def get(self, puuid):
+        return self.by_puuid.get(puuid)
+
+    def get_by_id(self, participant_id):
+        return self.by_id.get(participant_id)
+
+    def role_of(self, participant):
+        return self.roles.get(participant.get("participantId"))
+
+    def opponent_of(self, participant, role=None):
+        # adversaire direct: même rôle dans l'équipe d'en face
+        role = role or self.role_of(participant)
+        if not role:
+            return None
+
+        for team_id in self.team_totals:
+            if team_id != participant["teamId"]:
+                opponent = self.by_team_role.get((team_id, role))
+                if opponent:
+                    return opponent
+        return None
+
+    def team_stats(self, team_id):
+        totals = self.team_totals.get(team_id, {"kills": 0, "damage": 0})
+        return totals["kills"], totals["damage"]
+
+
+def build_participant_index(match):
+    return ParticipantIndex(match)
@@ -1,20 +1,13 @@
-from typing import Dict, List
-from .movement_tracker import (
-    track_map_presence,
-    analyze_roaming,
-    analyze_early_lane_presence,
-    calculate_jungle_time
-)
+from typing import Dict, List, Optional
+from .movement_tracker import track_movement
 
 
 def extract_role_metrics(match_data: Dict, timeline_data: Dict,
-                        participant_id: int, role: str, team_side: str) -> Dict:
+                        participant_id: int, role: str, team_side: str,
+                        movement_step_seconds: Optional[float] = None) -> Dict:
     metrics = {'role': role, 'participant_id': participant_id}
 
-    metrics['map_presence'] = track_map_presence(timeline_data, participant_id)
-    metrics['roaming'] = analyze_roaming(timeline_data, participant_id, role)
-    metrics['early_lane_presence'] = analyze_early_lane_presence(timeline_data, participant_id, role)
-    metrics['jungle_proximity'] = calculate_jungle_time(timeline_data, participant_id)
+    metrics.update(track_movement(timeline_data, participant_id, role, movement_step_seconds))
 
     return metrics
 
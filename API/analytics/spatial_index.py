@@ -0,0 +1,251 @@
+import heapq
+import math
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional
+from .map_utils import MAP_SIZE, MAP_REGIONS, OBJECTIVE_LOCATIONS, get_region
+
+# Index spatial en grille uniforme: chaque cellule garde ses events triés par timestamp,
+# donc une requête ne visite que les cellules touchées et coupe par bisect sur le temps
+
+SPATIAL_CELL_SIZE = 1000
+
+INDEXED_EVENT_FIELDS = {
+    'death': 'death_events',
+    'kill': 'kill_events',
+}
+
+
+class EventSpatialIndex:
+
+    def __init__(self, cell_size=SPATIAL_CELL_SIZE):
+        self.cell_size = cell_size
+        self.grid_size = math.ceil(MAP_SIZE / cell_size)
+        self._cells = {}
+        self._sorted = True
+        self.size = 0
+
+    def _cell_of(self, x, y):
+        col = min(max(int(x // self.cell_size), 0), self.grid_size - 1)
+        row = min(max(int(y // self.cell_size), 0), self.grid_size - 1)
+        return row, col
+
+    def add(self, event_type, x, y, timestamp, role=None, champion=None, match_id=None, data=None):
+        if x <= 0 or y <= 0:
+            return False
+
+        # sequence = ordre d'insertion, pour rendre les résultats dans l'ordre des frames
+        event = {
+            'event_type': event_type,
+            'x': x,
+            'y': y,
+            'timestamp': timestamp,
+            'role': role,
+            'champion': champion,
+            'match_id': match_id,
+            'data': data,
+            'sequence': self.size,
+        }
+
+        cell = self._cells.setdefault(self._cell_of(x, y), {'timestamps': [], 'events': []})
+        cell['timestamps'].append(timestamp)
+        cell['events'].append(event)
+        self._sorted = False
+        self.size += 1
+        return True
+
+    def _ensure_sorted(self):
+        if self._sorted:
+            return
+
+        for cell in self._cells.values():
+            order = sorted(range(len(cell['events'])), key=lambda i: cell['timestamps'][i])
+            cell['events'] = [cell['events'][i] for i in order]
+            cell['timestamps'] = [cell['timestamps'][i] for i in order]
+
+        self._sorted = True
+
+    def _cell_events(self, cell, start_time=None, end_time=None):
+        lo = 0 if start_time is None else bisect_left(cell['timestamps'], start_time)
+        hi = len(cell['timestamps']) if end_time is None else bisect_right(cell['timestamps'], end_time)
+        return cell['events'][lo:hi]
+
+    @staticmethod
+    def _matches(event, event_type=None, role=None, champion=None):
+        if event_type and event['event_type'] != event_type:
+            return False
+        if role and event['role'] != role:
+            return False
+        if champion and event['champion'] != champion:
+            return False
+        return True
+
+    def _iter_cells(self, x_min, y_min, x_max, y_max):
+        row_min, col_min = self._cell_of(x_min, y_min)
+        row_max, col_max = self._cell_of(x_max, y_max)
+
+        for row in range(row_min, row_max + 1):
+            for col in range(col_min, col_max + 1):
+                cell = self._cells.get((row, col))
+                if cell:
+                    yield cell
+
+    def query_rect(self, x_min, y_min, x_max, y_max, event_type=None,
+                   start_time=None, end_time=None, role=None, champion=None) -> List[Dict]:
+        self._ensure_sorted()
+        results = []
+
+        for cell in self._iter_cells(x_min, y_min, x_max, y_max):
+            for event in self._cell_events(cell, start_time, end_time):
+                if not (x_min <= event['x'] <= x_max and y_min <= event['y'] <= y_max):
+                    continue
+                if self._matches(event, event_type, role, champion):
+                    results.append(event)
+
+        return results
+
+    def query_radius(self, x, y, radius, event_type=None,
+                     start_time=None, end_time=None, role=None, champion=None) -> List[Dict]:
+        candidates = self.query_rect(
+            x - radius, y - radius, x + radius, y + radius,
+            event_type, start_time, end_time, role, champion
+        )
+        radius_sq = radius * radius
+        return [
+            e for e in candidates
+            if (e['x'] - x) ** 2 + (e['y'] - y) ** 2 < radius_sq
+        ]
+
+    def query_region(self, region_name, event_type=None,
+                     start_time=None, end_time=None, role=None, champion=None) -> List[Dict]:
+        bounds = MAP_REGIONS.get(region_name, {'x_min': 0, 'x_max': MAP_SIZE, 'y_min': 0, 'y_max': MAP_SIZE})
+        candidates = self.query_rect(
+            bounds['x_min'], bounds['y_min'], bounds['x_max'], bounds['y_max'],
+            event_type, start_time, end_time, role, champion
+        )
+        # les rectangles se chevauchent, get_region tranche comme dans le reste du pipeline
+        return [e for e in candidates if get_region(e['x'], e['y']) == region_name]
+
+    def query_objective(self, objective_name, radius, event_type=None,
+                        start_time=None, end_time=None, role=None, champion=None) -> List[Dict]:
+        location = OBJECTIVE_LOCATIONS.get(objective_name)
+        if not location:
+            return []
+        return self.query_radius(
+            location['x'], location['y'], radius,
+            event_type, start_time, end_time, role, champion
+        )
+
+    def nearest(self, x, y, k=1, max_distance=None, event_type=None,
+                start_time=None, end_time=None, role=None, champion=None) -> List[Dict]:
+        # on élargit l'anneau de cellules jusqu'à ce que les k meilleurs soient garantis
+        self._ensure_sorted()
+        center_row, center_col = self._cell_of(x, y)
+        best = []
+        counter = 0
+
+        for ring in range(self.grid_size + 1):
+            for row in range(center_row - ring, center_row + ring + 1):
+                for col in range(center_col - ring, center_col + ring + 1):
+                    if max(abs(row - center_row), abs(col - center_col)) != ring:
+                        continue
+
+                    cell = self._cells.get((row, col))
+                    if not cell:
+                        continue
+
+                    for event in self._cell_events(cell, start_time, end_time):
+                        if not self._matches(event, event_type, role, champion):
+                            continue
+
+                        dist = math.sqrt((event['x'] - x) ** 2 + (event['y'] - y) ** 2)
+                        if max_distance is not None and dist > max_distance:
+                            continue
+
+                        counter += 1
+                        heapq.heappush(best, (-dist, counter, event))
+                        if len(best) > k:
+                            heapq.heappop(best)
+
+            # tout point hors de l'anneau courant est au moins à ring * cell_size
+            reach = ring * self.cell_size
+            if len(best) == k and -best[0][0] <= reach:
+                break
+            if max_distance is not None and reach > max_distance:
+                break
+
+        return [
+            {**event, 'distance': round(-neg_dist, 1)}
+            for neg_dist, _, event in sorted(best, key=lambda item: -item[0])
+        ]
+
+    def hotspots(self, limit=3, event_type=None, start_time=None,
+                 end_time=None, role=None, champion=None) -> List[Dict]:
+        # "où est-ce que je meurs le plus avant 15 min": compte par cellule
+        self._ensure_sorted()
+        counts = []
+
+        for (row, col), cell in self._cells.items():
+            events = [
+                e for e in self._cell_events(cell, start_time, end_time)
+                if self._matches(e, event_type, role, champion)
+            ]
+            if not events:
+                continue
+
+            center_x = (col + 0.5) * self.cell_size
+            center_y = (row + 0.5) * self.cell_size
+            counts.append({
+                'count': len(events),
+                'x': round(center_x),
+                'y': round(center_y),
+                'region': get_region(center_x, center_y),
+            })
+
+        counts.sort(key=lambda c: c['count'], reverse=True)
+        return counts[:limit]
+
+
+def build_event_index(processed_stats: List[Dict], cell_size=SPATIAL_CELL_SIZE) -> EventSpatialIndex:
+    index = EventSpatialIndex(cell_size)
+
+    for match in processed_stats:
+        role = match.get('role')
+        champion = match.get('champion_name')
+        match_id = match.get('match_id')
+
+        for event_type, field in INDEXED_EVENT_FIELDS.items():
+            for event in match.get(field, []):
+                index.add(
+                    event_type,
+                    event.get('x', 0),
+                    event.get('y', 0),
+                    event.get('timestamp', 0),
+                    role=role,
+                    champion=champion,
+                    match_id=match_id
+                )
+
+    return index
+
+
+def build_timeline_index(timeline_frames: List[Dict], cell_size=SPATIAL_CELL_SIZE) -> EventSpatialIndex:
+    # tous les events positionnés d'une timeline, type Riot brut, timestamp en minutes
+    index = EventSpatialIndex(cell_size)
+
+    for frame in timeline_frames:
+        if 'events' not in frame:
+            continue
+
+        timestamp = frame.get('timestamp', 0) / 60000
+
+        for event in frame['events']:
+            position = event.get('position', {})
+            index.add(
+                event.get('type'),
+                position.get('x', 0),
+                position.get('y', 0),
+                timestamp,
+                data=event
+            )
+
+    return index
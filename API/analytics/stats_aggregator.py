@@ -95,6 +95,12 @@ def calculate_early_game_stats(processed_stats):
             sum(s["gold_diff_at_15"] for s in stats_with_gold_diff) / count, 0
         )
 
+    stats_with_cs15 = [s for s in processed_stats if s.get("cs_at_15", 0) > 0]
+    if stats_with_cs15:
+        early_game["avg_cs_at_15"] = round(
+            sum(s["cs_at_15"] for s in stats_with_cs15) / len(stats_with_cs15), 1
+        )
+
     return early_game
 
 
@@ -309,6 +315,7 @@ def calculate_macro_stats(processed_stats):
     return {
         "death_analysis": {
             "death_timing": death_timing,
+            "avg_deaths_before_10": round(death_timing["0-10min"] / len(stats_with_timeline), 2),
             "avg_deaths_per_game": round(
                 sum(s["deaths"] for s in processed_stats) / total_games, 2
             ),
@@ -1,230 +1,32 @@
-from ..utils.helpers import detect_role
+from .participant_index import ParticipantIndex
+from .match_fields import compile_match_stats_extractor
 from .role_metrics import extract_role_metrics
-from .map_utils import is_near_objective, OBJECTIVE_PROXIMITY_THRESHOLD
-from .laning_phase import analyze_wave_management, analyze_trading_efficiency
+from .map_utils import (
+    is_near_objective,
+    OBJECTIVE_PROXIMITY_THRESHOLD,
+    OBJECTIVE_THROW_WINDOW,
+    EPIC_OBJECTIVE_TYPES,
+)
+from .laning_phase import analyze_laning_phase
 from .location_pipeline import aggregate_location_data
 
 
-def find_participant_data(match, puuid):
+def find_participant_data(match, puuid, index=None):
     # récup participant, team, role et adversaire
-    my_participant = None
-    my_team_id = None
-    my_role = None
-    opponent_champion = None
-
-    for participant in match["info"]["participants"]:
-        if participant["puuid"] == puuid:
-            my_participant = participant
-            my_team_id = participant["teamId"]
-            my_role = detect_role(participant)
-
-        if my_role and my_team_id:
-            is_enemy = participant["teamId"] != my_team_id
-            if is_enemy and detect_role(participant) == my_role:
-                opponent_champion = participant["championName"]
-
-    return my_participant, my_team_id, my_role, opponent_champion
-
-
-def calculate_team_stats(participants, team_id):
-    # kills et dégâts totaux de la team
-    team_kills = 0
-    team_damage = 0
-
-    for participant in participants:
-        if participant["teamId"] == team_id:
-            team_kills += participant["kills"]
-            team_damage += participant["totalDamageDealtToChampions"]
-
-    return team_kills, team_damage
-
-
-def extract_rune_data(participant):
-    # extraction des runes
-    perks = participant.get("perks")
-    if not perks:
-        return {
-            "primary_rune_style": 0,
-            "sub_rune_style": 0,
-            "primary_rune_selections": [],
-            "sub_rune_selections": []
-        }
-
-    styles = perks.get("styles", [])
-    if not styles:
-        return {
-            "primary_rune_style": 0,
-            "sub_rune_style": 0,
-            "primary_rune_selections": [],
-            "sub_rune_selections": []
-        }
-
-    primary_style = styles[0] if len(styles) > 0 else {}
-    sub_style = styles[1] if len(styles) > 1 else {}
-
-    return {
-        "primary_rune_style": primary_style.get("style", 0),
-        "sub_rune_style": sub_style.get("style", 0),
-        "primary_rune_selections": [s.get("perk", 0) for s in primary_style.get("selections", [])],
-        "sub_rune_selections": [s.get("perk", 0) for s in sub_style.get("selections", [])]
-    }
-
-
-def calculate_kill_participation(participant, team_kills, challenges):
-    # participation aux kills
-    kill_participation = challenges.get("killParticipation", 0)
-    if kill_participation == 0 and team_kills > 0:
-        player_kills = participant["kills"]
-        player_assists = participant["assists"]
-        kill_participation = (player_kills + player_assists) / team_kills
-    return kill_participation
-
-
-def calculate_damage_share(participant, team_damage, challenges):
-    # part des dégâts de la team
-    damage_share = challenges.get("teamDamagePercentage", 0)
-    if damage_share == 0 and team_damage > 0:
-        player_damage = participant["totalDamageDealtToChampions"]
-        damage_share = player_damage / team_damage
-    return damage_share
-
-
-def extract_match_stats(match, puuid):
-    # extraction stats joueur d'un match
-    my_participant, my_team_id, my_role, opponent_champion = find_participant_data(match, puuid)
+    index = index or ParticipantIndex(match)
 
+    my_participant = index.get(puuid)
     if not my_participant:
-        return None
+        return None, None, None, None
 
-    team_kills, team_damage = calculate_team_stats(match["info"]["participants"], my_team_id)
-    challenges = my_participant.get("challenges", {})
+    my_role = index.role_of(my_participant)
+    opponent = index.opponent_of(my_participant)
+    opponent_champion = opponent["championName"] if opponent else None
 
-    kill_participation = calculate_kill_participation(my_participant, team_kills, challenges)
-    damage_share = calculate_damage_share(my_participant, team_damage, challenges)
+    return my_participant, my_participant["teamId"], my_role, opponent_champion
 
-    game_duration_minutes = match["info"]["gameDuration"] / 60
-    total_cs = my_participant["totalMinionsKilled"] + my_participant["neutralMinionsKilled"]
-    player_damage = my_participant["totalDamageDealtToChampions"]
-    player_vision = my_participant["visionScore"]
 
-    rune_data = extract_rune_data(my_participant)
-
-    stats = {
-        "match_id": match["metadata"]["matchId"],
-        "game_duration": match["info"]["gameDuration"],
-        "game_creation": match["info"]["gameCreation"],
-        "game_end": match["info"]["gameEndTimestamp"],
-        "queue_id": match["info"]["queueId"],
-        "role": my_role,
-        "champion_id": my_participant["championId"],
-        "champion_name": my_participant["championName"],
-        "win": my_participant["win"],
-        "kills": my_participant["kills"],
-        "deaths": my_participant["deaths"],
-        "assists": my_participant["assists"],
-        "kda": (
-            (my_participant["kills"] + my_participant["assists"]) /
-            max(my_participant["deaths"], 1)
-        ),
-        "total_minions_killed": my_participant["totalMinionsKilled"],
-        "neutral_minions_killed": my_participant["neutralMinionsKilled"],
-        "cs_per_min": total_cs / game_duration_minutes,
-        "gold_earned": my_participant["goldEarned"],
-        "gold_spent": my_participant.get("goldSpent", 0),
-        "total_damage_to_champions": player_damage,
-        "damage_per_min": player_damage / game_duration_minutes,
-        "vision_score": player_vision,
-        "wards_placed": my_participant["wardsPlaced"],
-        "wards_killed": my_participant["wardsKilled"],
-        "control_wards_placed": my_participant["detectorWardsPlaced"],
-        "vision_score_per_min": player_vision / game_duration_minutes,
-        "turret_kills": my_participant["turretKills"],
-        "inhibitor_kills": my_participant["inhibitorKills"],
-        "dragon_kills": my_participant.get("dragonKills", 0),
-        "baron_kills": my_participant.get("baronKills", 0),
-        "double_kills": my_participant["doubleKills"],
-        "triple_kills": my_participant["tripleKills"],
-        "quadra_kills": my_participant["quadraKills"],
-        "penta_kills": my_participant["pentaKills"],
-        "team_position": my_participant.get("teamPosition", "UNKNOWN"),
-        "summoner_level": my_participant.get("summonerLevel", 0),
-        "kill_participation": round(kill_participation, 3),
-        "damage_share": round(damage_share, 3),
-        "first_blood_kill": my_participant.get("firstBloodKill", False),
-        "first_blood_assist": my_participant.get("firstBloodAssist", False),
-        "first_tower_kill": my_participant.get("firstTowerKill", False),
-        "first_tower_assist": my_participant.get("firstTowerAssist", False),
-        "total_damage_taken": my_participant.get("totalDamageTaken", 0),
-        "damage_self_mitigated": my_participant.get("damageSelfMitigated", 0),
-        "solo_kills": challenges.get("soloKills", 0),
-        "turret_plates_taken": challenges.get("turretPlatesTaken", 0),
-        "turret_takedowns": my_participant.get("turretTakedowns", 0),
-        "objectives_stolen": my_participant.get("objectivesStolen", 0),
-        "gold_per_minute": challenges.get("goldPerMinute", 0),
-        "vision_score_advantage_lane": challenges.get(
-            "visionScoreAdvantageLaneOpponent",
-            0
-        ),
-        "max_cs_advantage_lane": challenges.get(
-            "maxCsAdvantageOnLaneOpponent",
-            0
-        ),
-        "max_level_lead_lane": challenges.get(
-            "maxLevelLeadLaneOpponent",
-            0
-        ),
-        "opponent_champion": opponent_champion,
-        "summoner1_id": my_participant.get("summoner1Id", 0),
-        "summoner2_id": my_participant.get("summoner2Id", 0),
-        "summoner1_casts": my_participant.get("summoner1Casts", 0),
-        "summoner2_casts": my_participant.get("summoner2Casts", 0),
-        **rune_data,
-        "item0": my_participant.get("item0", 0),
-        "item1": my_participant.get("item1", 0),
-        "item2": my_participant.get("item2", 0),
-        "item3": my_participant.get("item3", 0),
-        "item4": my_participant.get("item4", 0),
-        "item5": my_participant.get("item5", 0),
-        "item6": my_participant.get("item6", 0),
-        "time_ccing_others": my_participant.get("timeCCingOthers", 0),
-        "total_time_cc_dealt": my_participant.get("totalTimeCCDealt", 0),
-        "total_time_spent_dead": my_participant.get("totalTimeSpentDead", 0),
-        "longest_time_spent_living": my_participant.get("longestTimeSpentLiving", 0),
-        "total_heal": my_participant.get("totalHeal", 0),
-        "total_heals_on_teammates": my_participant.get("totalHealsOnTeammates", 0),
-        "total_damage_shielded_on_teammates": my_participant.get("totalDamageShieldedOnTeammates", 0),
-        "rift_herald_takedowns": challenges.get("riftHeraldTakedowns", 0),
-        "nexus_takedowns": my_participant.get("nexusTakedowns", 0),
-        "nexus_kills": my_participant.get("nexusKills", 0),
-        "game_ended_in_early_surrender": my_participant.get("gameEndedInEarlySurrender", False),
-        "game_ended_in_surrender": my_participant.get("gameEndedInSurrender", False),
-        "team_early_surrendered": my_participant.get("teamEarlySurrendered", False),
-        "takedowns_first_10_minutes": challenges.get("takedownsFirst10Minutes", 0),
-        "lane_minions_first_10_minutes": challenges.get("laneMinionsFirst10Minutes", 0),
-        "early_laning_phase_gold_exp_advantage": challenges.get("earlyLaningPhaseGoldExpAdvantage", 0),
-        "jungler_kills_early_jungle": challenges.get("junglerKillsEarlyJungle", 0),
-        "epic_monster_steals": challenges.get("epicMonsterSteals", 0),
-        "baron_takedowns": challenges.get("baronTakedowns", 0),
-        "dragon_takedowns": challenges.get("dragonTakedowns", 0),
-        "elder_dragon_kills": challenges.get("elderDragonKillsWithOpposingSoul", 0),
-        "damage_per_minute_challenge": challenges.get("damagePerMinute", 0),
-        "kda_challenge": challenges.get("kda", 0),
-        "effective_heal_and_shielding": challenges.get("effectiveHealAndShielding", 0),
-        "kill_after_hidden_with_ally": challenges.get("killAfterHiddenWithAlly", 0),
-        "knocked_enemy_into_team_and_kill": challenges.get("knockEnemyIntoTeamAndKillThem", 0),
-        "multi_kill_one_spell": challenges.get("multiKillOneSpell", 0),
-        "pick_kill_with_ally": challenges.get("pickKillWithAlly", 0),
-        "solo_baron_kills": challenges.get("soloBaronKills", 0),
-        "solo_turrents": challenges.get("soloTurrents", 0),
-        "takedowns_after_gaining_level_advantage": challenges.get("takedownsAfterGainingLevelAdvantage", 0),
-        "teleport_takedowns": challenges.get("teleportTakedowns", 0),
-        "three_wards_one_sweeper": challenges.get("threeWardsOneSweeperCount", 0),
-        "vision_score_per_minute_challenge": challenges.get("visionScorePerMinute", 0),
-        "wards_guarded": challenges.get("wardsGuarded", 0),
-        "control_ward_time_coverage": challenges.get("controlWardTimeCoverageInRiverOrEnemyHalf", 0),
-    }
-
-    return stats
+extract_match_stats = compile_match_stats_extractor()
 
 
 def extract_cs_and_gold_milestones(frames, participant_id, opponent_id):
@@ -340,6 +142,41 @@ def extract_death_events(frames, participant_id):
     return death_events
 
 
+def extract_takedown_events(frames, participant_id):
+    kill_events = []
+    assist_events = []
+
+    for frame in frames:
+        if "events" not in frame:
+            continue
+
+        timestamp_minutes = frame["timestamp"] / 60000
+
+        for event in frame["events"]:
+            if event["type"] != "CHAMPION_KILL":
+                continue
+
+            is_kill = event.get("killerId") == participant_id
+            is_assist = participant_id in event.get("assistingParticipantIds", [])
+            if not is_kill and not is_assist:
+                continue
+
+            position = event.get("position", {})
+            takedown = {
+                "timestamp": timestamp_minutes,
+                "x": position.get("x", 0),
+                "y": position.get("y", 0),
+                "victim_id": event.get("victimId"),
+            }
+
+            if is_kill:
+                kill_events.append(takedown)
+            else:
+                assist_events.append(takedown)
+
+    return kill_events, assist_events
+
+
 def calculate_death_metrics(death_events):
     deaths_0_10 = sum(1 for d in death_events if d["timestamp"] <= 10)
     deaths_10_20 = sum(1 for d in death_events if 10 < d["timestamp"] <= 20)
@@ -411,12 +248,15 @@ def extract_objectives_and_turrets(frames, participant_id, team_id):
             if event["type"] == "ELITE_MONSTER_KILL":
                 monster_type = event.get("monsterType", "")
                 killer_team_id = event.get("killerTeamId")
+                position = event.get("position", {})
 
                 objective_events.append({
                     "type": monster_type,
                     "timestamp": timestamp_minutes,
                     "team": "ally" if killer_team_id == team_id else "enemy",
                     "killer_team_id": killer_team_id,
+                    "x": position.get("x", 0),
+                    "y": position.get("y", 0),
                 })
 
             elif event["type"] == "BUILDING_KILL":
@@ -434,43 +274,54 @@ def extract_objectives_and_turrets(frames, participant_id, team_id):
     return objective_events, turret_events
 
 
-def calculate_objective_throws(objective_events, death_events):
-    objective_throws = []
+def calculate_objective_throws(objective_events, death_events, window_minutes=OBJECTIVE_THROW_WINDOW):
+    # fusion de deux flux triés par temps: la fenêtre de morts [lo, hi) avance avec les objectifs
+    enemy_objectives = sorted(
+        (e for e in objective_events if e["team"] == "enemy" and e["type"] in EPIC_OBJECTIVE_TYPES),
+        key=lambda e: e["timestamp"]
+    )
+    deaths = sorted(death_events, key=lambda d: d["timestamp"])
 
-    for obj_event in objective_events:
-        if obj_event["team"] == "enemy" and obj_event["type"] in ["BARON_NASHOR", "DRAGON", "RIFTHERALD"]:
-            for death in death_events:
-                time_diff = obj_event["timestamp"] - death["timestamp"]
-                if 0 < time_diff <= 1.5:
-                    objective_throws.append({
-                        "death_time": death["timestamp"],
-                        "objective_type": obj_event["type"],
-                        "objective_time": obj_event["timestamp"],
-                        "time_before_objective": round(time_diff, 2),
-                    })
+    objective_throws = []
+    lo = 0
+    hi = 0
+
+    for obj_event in enemy_objectives:
+        objective_time = obj_event["timestamp"]
+
+        while hi < len(deaths) and objective_time - deaths[hi]["timestamp"] > 0:
+            hi += 1
+        while lo < hi and objective_time - deaths[lo]["timestamp"] > window_minutes:
+            lo += 1
+
+        for death in deaths[lo:hi]:
+            time_diff = objective_time - death["timestamp"]
+            objective_throws.append({
+                "death_time": death["timestamp"],
+                "objective_type": obj_event["type"],
+                "objective_time": objective_time,
+                "time_before_objective": round(time_diff, 2),
+            })
 
     return objective_throws
 
 
-def extract_timeline_stats(match, timeline, puuid, role=None):
-    my_participant = None
+def extract_timeline_stats(match, timeline, puuid, role=None, index=None, movement_step_seconds=None):
+    index = index or ParticipantIndex(match)
+    my_participant = index.get(puuid)
     participant_id = None
     team_id = None
     my_role = role
     opponent_id = None
 
-    for participant in match["info"]["participants"]:
-        if participant["puuid"] == puuid:
-            my_participant = participant
-            participant_id = participant["participantId"]
-            team_id = participant["teamId"]
-            if not my_role:
-                my_role = detect_role(participant)
+    if my_participant:
+        participant_id = my_participant["participantId"]
+        team_id = my_participant["teamId"]
+        my_role = my_role or index.role_of(my_participant)
 
-        if my_role and team_id:
-            is_enemy = participant["teamId"] != team_id
-            if is_enemy and detect_role(participant) == my_role:
-                opponent_id = participant["participantId"]
+        opponent = index.opponent_of(my_participant, my_role)
+        if opponent:
+            opponent_id = opponent["participantId"]
 
     if not my_participant or not timeline:
         return None
@@ -483,6 +334,7 @@ def extract_timeline_stats(match, timeline, puuid, role=None):
     milestones = extract_cs_and_gold_milestones(frames, participant_id, opponent_id)
     death_events = extract_death_events(frames, participant_id)
     death_metrics = calculate_death_metrics(death_events)
+    kill_events, assist_events = extract_takedown_events(frames, participant_id)
     item_completions = extract_item_completions(frames, participant_id)
     objective_events, turret_events = extract_objectives_and_turrets(frames, participant_id, team_id)
     objective_throws = calculate_objective_throws(objective_events, death_events)
@@ -493,28 +345,22 @@ def extract_timeline_stats(match, timeline, puuid, role=None):
         timeline_data=timeline,
         participant_id=participant_id,
         role=my_role,
-        team_side=team_side
+        team_side=team_side,
+        movement_step_seconds=movement_step_seconds
     )
 
     wave_management = {}
     trading_analysis = {}
     if my_role and my_role != "JUNGLE":
-        wave_management = analyze_wave_management(
+        wave_management, trading_analysis = analyze_laning_phase(
             match_data=match,
             timeline_data=timeline,
             participant_id=participant_id,
             role=my_role,
             team_side=team_side,
             opponent_id=opponent_id,
-            laning_end_time=14
-        )
-
-        trading_analysis = analyze_trading_efficiency(
-            match_data=match,
-            timeline_data=timeline,
-            participant_id=participant_id,
-            opponent_id=opponent_id,
-            laning_end_time=14
+            laning_end_time=14,
+            participant=my_participant
         )
 
     location_data = aggregate_location_data(
@@ -526,6 +372,8 @@ def extract_timeline_stats(match, timeline, puuid, role=None):
     timeline_stats = {
         **milestones,
         "death_events": death_events,
+        "kill_events": kill_events,
+        "assist_events": assist_events,
         "item_completion_times": item_completions,
         "objective_events": objective_events,
         "turret_events": turret_events,
@@ -539,3 +387,70 @@ def extract_timeline_stats(match, timeline, puuid, role=None):
     }
 
     return timeline_stats
+
+
+EARLY_DEATH_MINUTES = 10
+
+
+def count_early_deaths(frames, participant_id, until_minutes=EARLY_DEATH_MINUTES):
+    early_deaths = 0
+
+    for frame in frames:
+        timestamp_minutes = frame["timestamp"] / 60000
+        if timestamp_minutes > until_minutes:
+            break
+
+        for event in frame.get("events", []):
+            if event["type"] == "CHAMPION_KILL" and event.get("victimId") == participant_id:
+                early_deaths += 1
+
+    return early_deaths
+
+
+def extract_timeline_benchmark_stats(match, timeline, puuid, index=None):
+    # version légère de extract_timeline_stats pour le crawl: seulement les métriques comparées aux benchmarks
+    index = index or ParticipantIndex(match)
+    my_participant = index.get(puuid)
+
+    if not my_participant or not timeline or "frames" not in timeline.get("info", {}):
+        return None
+
+    frames = timeline["info"]["frames"]
+    participant_id = my_participant["participantId"]
+    role = index.role_of(my_participant)
+    opponent = index.opponent_of(my_participant, role)
+    opponent_id = opponent["participantId"] if opponent else None
+
+    milestones = extract_cs_and_gold_milestones(frames, participant_id, opponent_id)
+
+    stats = {
+        "role": role,
+        "cs_at_10": milestones["cs_at_10"] or None,
+        "cs_at_15": milestones["cs_at_15"] or None,
+        "gold_diff_at_15": milestones["gold_diff_at_15"] if opponent_id else None,
+        "early_deaths": count_early_deaths(frames, participant_id),
+        "lane_pressure_score": None,
+        "cs_differential": None,
+        "trade_efficiency": None,
+        "damage_differential": None,
+    }
+
+    if role and role != "JUNGLE":
+        wave_management, trading_analysis = analyze_laning_phase(
+            match_data=match,
+            timeline_data=timeline,
+            participant_id=participant_id,
+            role=role,
+            team_side='blue' if my_participant["teamId"] == 100 else 'red',
+            opponent_id=opponent_id,
+            laning_end_time=14,
+            participant=my_participant
+        )
+        if wave_management:
+            stats["lane_pressure_score"] = wave_management.get("lane_pressure_score")
+            stats["cs_differential"] = wave_management.get("avg_cs_differential")
+        if trading_analysis:
+            stats["trade_efficiency"] = trading_analysis.get("trade_efficiency_ratio")
+            stats["damage_differential"] = trading_analysis.get("damage_differential")
+
+    return stats
@@ -0,0 +1,152 @@
+from typing import Dict, List, Optional
+import numpy as np
+from .map_utils import get_region
+
+# Trajectoire sous la minute: positions des frames + events positionnés (kills, objectifs, wards),
+# interpolées linéairement sur une grille de temps fine, tout en tableaux numpy
+
+TRAJECTORY_STEP_SECONDS = 15
+
+# même ordre que region_distribution dans track_movement
+MOVEMENT_REGIONS = ['TOP_LANE', 'MID_LANE', 'BOT_LANE', 'JUNGLE', 'RIVER']
+
+EVENT_PARTICIPANT_KEYS = ('killerId', 'victimId', 'creatorId', 'participantId')
+
+
+def event_involves(event: Dict, participant_id: int) -> bool:
+    for key in EVENT_PARTICIPANT_KEYS:
+        if event.get(key) == participant_id:
+            return True
+    return participant_id in event.get('assistingParticipantIds', [])
+
+
+def collect_trajectory_anchors(timeline_data: Dict, participant_id: int):
+    # points connus (temps en ms, x, y); un event au même instant qu'une frame est prioritaire
+    event_points = []
+    frame_points = []
+
+    if not timeline_data or 'info' not in timeline_data:
+        return np.empty(0), np.empty(0), np.empty(0)
+
+    for frame in timeline_data['info'].get('frames', []):
+        frame_time = frame.get('timestamp', 0)
+
+        participant_frame = frame.get('participantFrames', {}).get(str(participant_id))
+        if participant_frame and 'position' in participant_frame:
+            pos = participant_frame['position']
+            x, y = pos.get('x', 0), pos.get('y', 0)
+            if x != 0 or y != 0:
+                frame_points.append((frame_time, x, y))
+
+        for event in frame.get('events', []):
+            position = event.get('position')
+            if not position or not event_involves(event, participant_id):
+                continue
+
+            x, y = position.get('x', 0), position.get('y', 0)
+            if x > 0 and y > 0:
+                event_points.append((event.get('timestamp', frame_time), x, y))
+
+    points = event_points + frame_points
+    if not points:
+        return np.empty(0), np.empty(0), np.empty(0)
+
+    anchors = np.array(points, dtype=float)
+    order = np.argsort(anchors[:, 0], kind='stable')
+    anchors = anchors[order]
+
+    # np.interp veut des temps strictement croissants: premier point gardé par instant
+    _, first = np.unique(anchors[:, 0], return_index=True)
+    anchors = anchors[first]
+
+    return anchors[:, 0], anchors[:, 1], anchors[:, 2]
+
+
+def interpolate_trajectory(times_ms: np.ndarray, xs: np.ndarray, ys: np.ndarray,
+                           step_seconds: float = TRAJECTORY_STEP_SECONDS,
+                           end_minutes: Optional[float] = None) -> Dict:
+    if len(times_ms) == 0:
+        return {'t': np.empty(0), 'x': np.empty(0), 'y': np.empty(0), 'step_seconds': step_seconds}
+
+    step_ms = step_seconds * 1000
+    end_ms = times_ms[-1] if end_minutes is None else min(times_ms[-1], end_minutes * 60000)
+    grid = np.arange(times_ms[0], end_ms + step_ms / 2, step_ms)
+
+    return {
+        't': grid / 60000,
+        'x': np.interp(grid, times_ms, xs),
+        'y': np.interp(grid, times_ms, ys),
+        'step_seconds': step_seconds,
+    }
+
+
+def build_trajectory(timeline_data: Dict, participant_id: int,
+                     step_seconds: float = TRAJECTORY_STEP_SECONDS,
+                     end_minutes: Optional[float] = None) -> Dict:
+    times_ms, xs, ys = collect_trajectory_anchors(timeline_data, participant_id)
+    return interpolate_trajectory(times_ms, xs, ys, step_seconds, end_minutes)
+
+
+def classify_regions(xs, ys) -> np.ndarray:
+    # les positions interpolées passent par le même classifieur que le reste du pipeline
+    return np.array([get_region(x, y) for x, y in zip(xs, ys)], dtype=object)
+
+
+def summarize_trajectory(trajectory: Dict, home_regions: Optional[List[str]] = None,
+                         early_home_region: Optional[str] = None,
+                         early_minutes: float = 15) -> Dict:
+    # mêmes sorties que track_movement, chaque échantillon compte pour step_seconds au lieu d'une minute
+    regions = classify_regions(trajectory['x'], trajectory['y'])
+    samples = len(regions)
+    if samples == 0:
+        return {
+            'map_presence': {},
+            'roaming': {},
+            'early_lane_presence': {},
+            'jungle_proximity': {},
+        }
+
+    step_seconds = trajectory['step_seconds']
+    minutes = samples * step_seconds / 60
+    total_distance = float(np.hypot(np.diff(trajectory['x']), np.diff(trajectory['y'])).sum())
+
+    def percent(mask):
+        return round(float(np.count_nonzero(mask)) / len(mask) * 100, 2)
+
+    map_presence = {
+        'region_distribution': {region: percent(regions == region) for region in MOVEMENT_REGIONS},
+        'total_distance_traveled': round(total_distance, 2),
+        'distance_per_minute': round(total_distance / minutes, 2),
+        'frames_tracked': samples,
+        'step_seconds': step_seconds,
+    }
+
+    roaming = {}
+    if home_regions:
+        away = ~np.isin(regions, home_regions)
+        # un roam commence à chaque passage maison -> hors zone
+        roam_count = int(np.count_nonzero(away[1:] & ~away[:-1])) + int(away[0])
+        roaming = {
+            'roam_count': roam_count,
+            'time_in_lane_percent': percent(~away),
+            'time_roaming_percent': percent(away),
+            'roams_per_10min': round(roam_count / minutes * 10, 2)
+        }
+
+    early_lane_presence = {}
+    early_regions = regions[trajectory['t'] < early_minutes]
+    if early_home_region and len(early_regions) > 0:
+        early_lane_presence = {
+            'early_lane_presence_percent': percent(early_regions == early_home_region)
+        }
+
+    jungle_proximity = {
+        'jungle_time_percent': percent(regions == 'JUNGLE')
+    }
+
+    return {
+        'map_presence': map_presence,
+        'roaming': roaming,
+        'early_lane_presence': early_lane_presence,
+        'jungle_proximity': jungle_proximity,
+    }
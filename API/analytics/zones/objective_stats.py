@@ -1,32 +1,31 @@
 from ..map_utils import OBJECTIVE_LOCATIONS, calculate_distance, OBJECTIVE_PROXIMITY_THRESHOLD
+from ..spatial_index import build_event_index
 from .zone_definitions import OBJECTIVE_TYPE_MAPPING
 
 
-def count_deaths_near_objective(matches, objective_name, proximity):
+def count_deaths_near_objective(matches, objective_name, proximity, index=None):
     obj_location = OBJECTIVE_LOCATIONS.get(objective_name)
     if not obj_location:
         return 0, []
 
-    death_count = 0
+    if index is None:
+        index = build_event_index(matches)
+
+    deaths = index.query_objective(objective_name, proximity, event_type='death')
     death_details = []
 
-    for match in matches:
-        death_events = match.get('death_events', [])
-        for death in death_events:
-            dist = calculate_distance(
-                death['x'], death['y'],
-                obj_location['x'], obj_location['y']
-            )
-
-            if dist < proximity:
-                death_count += 1
-                death_details.append({
-                    'timestamp': death.get('timestamp', 0),
-                    'distance': round(dist, 1),
-                    'match_id': match.get('match_id')
-                })
-
-    return death_count, death_details
+    for death in sorted(deaths, key=lambda e: e['sequence']):
+        dist = calculate_distance(
+            death['x'], death['y'],
+            obj_location['x'], obj_location['y']
+        )
+        death_details.append({
+            'timestamp': death['timestamp'],
+            'distance': round(dist, 1),
+            'match_id': death['match_id']
+        })
+
+    return len(death_details), death_details
 
 
 def count_objective_control(matches, objective_name):
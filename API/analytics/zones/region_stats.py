@@ -1,18 +1,12 @@
-from ..map_utils import get_region
+from ..spatial_index import build_event_index
 from .zone_definitions import ROLE_TO_REGION
 
 
-def count_deaths_in_region(matches, region_name):
-    death_count = 0
+def count_deaths_in_region(matches, region_name, index=None):
+    if index is None:
+        index = build_event_index(matches)
 
-    for match in matches:
-        death_events = match.get("death_events", [])
-        for death in death_events:
-            death_region = get_region(death["x"], death["y"])
-            if death_region == region_name:
-                death_count += 1
-
-    return death_count
+    return len(index.query_region(region_name, event_type="death"))
 
 
 def calculate_avg_time_in_region(matches, region_name):
@@ -0,0 +1,230 @@
+from ..map_utils import (
+    OBJECTIVE_LOCATIONS,
+    OBJECTIVE_PROXIMITY_THRESHOLD,
+    calculate_distance,
+)
+from ..spatial_index import build_event_index
+from .zone_definitions import STORY_ZONES, OBJECTIVE_TYPE_MAPPING, ROLE_TO_REGION
+from .objective_stats import calculate_objective_control_rate
+
+# Un seul passage sur les matchs pour remplir toutes les zones d'un coup,
+# les morts sont indexées une fois puis chaque zone interroge l'index
+
+OBJECTIVE_PARTICIPATION_FIELDS = {
+    'BARON': 'baron_takedowns',
+    'DRAGON': 'dragon_takedowns',
+    'RIFT_HERALD': 'rift_herald_takedowns'
+}
+
+LANE_REGIONS = ['TOP_LANE', 'MID_LANE', 'BOT_LANE']
+
+
+def create_objective_counters(zone_config):
+    return {
+        'objective': zone_config['objective'],
+        'proximity': zone_config.get('proximity', OBJECTIVE_PROXIMITY_THRESHOLD),
+        'location': OBJECTIVE_LOCATIONS.get(zone_config['objective']),
+        'event_type': OBJECTIVE_TYPE_MAPPING.get(zone_config['objective']),
+        'participation_field': OBJECTIVE_PARTICIPATION_FIELDS.get(zone_config['objective']),
+        'deaths_near': 0,
+        'death_details': [],
+        'secured': 0,
+        'lost': 0,
+        'participations': 0,
+    }
+
+
+def create_region_counters():
+    return {
+        'deaths': 0,
+        'time_percent_total': 0,
+        'time_match_count': 0,
+        'role_matches': 0,
+        'role_counts': {},
+        'lane_values': {
+            'cs_at_10': [],
+            'gold_diff_at_10': [],
+            'kills': [],
+            'deaths': [],
+            'assists': [],
+        },
+    }
+
+
+def create_zone_accumulator():
+    objectives = {}
+    regions = {}
+
+    for zone_id, zone_config in STORY_ZONES.items():
+        if 'objective' in zone_config:
+            objectives[zone_id] = create_objective_counters(zone_config)
+        elif 'region' in zone_config:
+            regions.setdefault(zone_config['region'], create_region_counters())
+
+    return {'total_matches': 0, 'objectives': objectives, 'regions': regions}
+
+
+def accumulate_deaths(accumulator, index):
+    # les morts passent par l'index spatial: chaque zone ne visite que les cellules qui la touchent
+    for region_name, counters in accumulator['regions'].items():
+        counters['deaths'] += len(index.query_region(region_name, event_type='death'))
+
+    for counters in accumulator['objectives'].values():
+        location = counters['location']
+        if not location:
+            continue
+
+        deaths = index.query_objective(counters['objective'], counters['proximity'], event_type='death')
+        for death in sorted(deaths, key=lambda e: e['sequence']):
+            counters['deaths_near'] += 1
+            counters['death_details'].append({
+                'timestamp': death['timestamp'],
+                'distance': round(calculate_distance(
+                    death['x'], death['y'],
+                    location['x'], location['y']
+                ), 1),
+                'match_id': death['match_id']
+            })
+
+
+def accumulate_objectives(accumulator, match):
+    objectives = accumulator['objectives']
+
+    for event in match.get('objective_events', []):
+        for counters in objectives.values():
+            if event['type'] == counters['event_type']:
+                if event.get('team') == 'ally':
+                    counters['secured'] += 1
+                else:
+                    counters['lost'] += 1
+
+    for counters in objectives.values():
+        field = counters['participation_field']
+        if field:
+            counters['participations'] += match.get(field, 0)
+
+
+def accumulate_regions(accumulator, match):
+    regions = accumulator['regions']
+
+    role_stats = match.get('role_specific_stats', {})
+    map_presence = role_stats.get('map_presence', {})
+    region_dist = map_presence.get('region_distribution', {})
+
+    for region_name, counters in regions.items():
+        time_in_region = region_dist.get(region_name, 0)
+        if time_in_region > 0:
+            counters['time_percent_total'] += time_in_region
+            counters['time_match_count'] += 1
+
+    player_role = match.get('role')
+    role_region = ROLE_TO_REGION.get(player_role)
+    if role_region not in regions:
+        return
+
+    counters = regions[role_region]
+    counters['role_matches'] += 1
+    counters['role_counts'][player_role] = counters['role_counts'].get(player_role, 0) + 1
+
+    if role_region in LANE_REGIONS:
+        lane_values = counters['lane_values']
+        lane_values['cs_at_10'].append(match.get('cs_at_10', 0))
+        lane_values['gold_diff_at_10'].append(match.get('gold_diff_at_10', 0))
+        lane_values['kills'].append(match.get('kills', 0))
+        lane_values['deaths'].append(match.get('deaths', 0))
+        lane_values['assists'].append(match.get('assists', 0))
+
+
+def accumulate_match(accumulator, match):
+    accumulator['total_matches'] += 1
+    accumulate_objectives(accumulator, match)
+    accumulate_regions(accumulator, match)
+
+
+def average(values, digits=1):
+    return round(sum(values) / len(values), digits)
+
+
+def build_lane_performance(lane_values):
+    if not lane_values['cs_at_10']:
+        return {}
+
+    return {
+        "avg_cs_at_10": average(lane_values['cs_at_10']),
+        "avg_gold_diff_at_10": average(lane_values['gold_diff_at_10']),
+        "avg_kills": average(lane_values['kills']),
+        "avg_deaths": average(lane_values['deaths']),
+        "avg_assists": average(lane_values['assists']),
+    }
+
+
+def build_objective_zone(zone_id, zone_config, counters, total_matches):
+    deaths_near = counters['deaths_near']
+
+    return {
+        'zone_id': zone_id,
+        'zone_name': zone_config['name'],
+        'total_matches': total_matches,
+        'deaths_near': deaths_near,
+        'death_details': counters['death_details'],
+        'objectives_secured': counters['secured'],
+        'objectives_lost': counters['lost'],
+        'objective_control_rate': calculate_objective_control_rate(counters['secured'], counters['lost']),
+        'participated_in_fights': counters['participations'],
+        'avg_deaths_per_match': round(deaths_near / total_matches, 2) if total_matches > 0 else 0
+    }
+
+
+def build_region_zone(zone_id, zone_config, counters, total_matches):
+    deaths_in_region = counters['deaths']
+
+    avg_time_spent = 0.0
+    if counters['time_match_count'] > 0:
+        avg_time_spent = round(counters['time_percent_total'] / counters['time_match_count'], 1)
+
+    role_counts = counters['role_counts']
+    primary_role = max(role_counts, key=role_counts.get) if role_counts else None
+
+    return {
+        "zone_id": zone_id,
+        "zone_name": zone_config["name"],
+        "total_matches": total_matches,
+        "deaths_in_region": deaths_in_region,
+        "avg_time_spent_percent": avg_time_spent,
+        "matches_played_in_role": counters['role_matches'],
+        "avg_deaths_per_match": round(deaths_in_region / total_matches, 2)
+        if total_matches > 0
+        else 0,
+        "lane_performance": build_lane_performance(counters['lane_values']),
+        "primary_role": primary_role,
+    }
+
+
+def build_zone_stats(accumulator):
+    total_matches = accumulator['total_matches']
+    zone_stats = {}
+
+    for zone_id, zone_config in STORY_ZONES.items():
+        if 'objective' in zone_config:
+            zone_stats[zone_id] = build_objective_zone(
+                zone_id, zone_config, accumulator['objectives'][zone_id], total_matches
+            )
+        elif 'region' in zone_config:
+            zone_stats[zone_id] = build_region_zone(
+                zone_id, zone_config, accumulator['regions'][zone_config['region']], total_matches
+            )
+        else:
+            zone_stats[zone_id] = {}
+
+    return zone_stats
+
+
+def accumulate_all_zones(matches):
+    accumulator = create_zone_accumulator()
+
+    for match in matches:
+        accumulate_match(accumulator, match)
+
+    accumulate_deaths(accumulator, build_event_index(matches))
+
+    return build_zone_stats(accumulator)
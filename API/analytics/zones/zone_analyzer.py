@@ -2,6 +2,7 @@ from .zone_definitions import STORY_ZONES
 from .objective_stats import extract_objective_zone_stats
 from .region_stats import extract_region_zone_stats
 from .overview_stats import extract_overview_stats
+from .zone_accumulator import accumulate_all_zones
 
 
 def extract_zone_stats(matches, zone_id):
@@ -18,11 +19,7 @@ def extract_zone_stats(matches, zone_id):
 
 
 def extract_all_zones(matches):
-    zone_stats = {}
-
-    for zone_id in STORY_ZONES.keys():
-        zone_stats[zone_id] = extract_zone_stats(matches, zone_id)
-
+    zone_stats = accumulate_all_zones(matches)
     zone_stats['intro'] = extract_overview_stats(matches)
 
     return zone_stats
@@ -1,4 +1,22 @@
-from .benchmark_loader import get_benchmark, calculate_percentile, load_benchmarks
+from .benchmark_loader import get_benchmark, get_distribution, calculate_percentile, load_benchmarks
+from .quantile_sketch import TDigest
 from .benchmark_builder import BenchmarkBuilder
+from .crawl_engine import CrawlEngine
+from .checkpoint import CrawlCheckpoint
+from .columnar_store import ColumnarBenchmarkStore, write_columnar_store
+from .placement import place_player, place_players
 
-__all__ = ["get_benchmark", "calculate_percentile", "load_benchmarks", "BenchmarkBuilder"]
+__all__ = [
+    "get_benchmark",
+    "get_distribution",
+    "calculate_percentile",
+    "load_benchmarks",
+    "TDigest",
+    "BenchmarkBuilder",
+    "CrawlEngine",
+    "CrawlCheckpoint",
+    "ColumnarBenchmarkStore",
+    "write_columnar_store",
+    "place_player",
+    "place_players",
+]
@@ -1,198 +1,261 @@
-import asyncio
 import json
+import os
 from datetime import datetime
 from ..Core import Core
 from ..league.summoner import Summoner
 from ..league.rank import Rank
 from ..league.match import Match
-from ..analytics.stats_extractor import extract_match_stats
+from ..analytics.match_fields import compile_match_stats_extractor
+from ..analytics.stats_extractor import extract_timeline_benchmark_stats
+from ..analytics.participant_index import ParticipantIndex
+from .crawl_engine import CrawlEngine, DEFAULT_CRAWL_CONCURRENCY
+from .checkpoint import (
+    CrawlCheckpoint,
+    create_stat_accumulator,
+    add_sample,
+    calculate_averages,
+    calculate_distributions,
+    calculate_champion_benchmarks,
+    add_champion_sample,
+    serialize_raw_data,
+)
+from .match_filter import create_match_filter
+from .benchmark_loader import BENCHMARK_CACHE_PATH
+from .columnar_store import write_columnar_store
+
+BENCHMARK_STATS = [
+    "cs_per_min",
+    "vision_score",
+    "kda",
+    "damage_per_min",
+    "gold_per_minute",
+    "kill_participation",
+]
+
+BENCHMARK_FIELDS = ["role", "champion_name"] + BENCHMARK_STATS
+
+# métriques issues des timelines, seulement pour les matchs échantillonnés
+TIMELINE_BENCHMARK_STATS = [
+    "cs_at_10",
+    "cs_at_15",
+    "gold_diff_at_15",
+    "early_deaths",
+    "lane_pressure_score",
+    "cs_differential",
+    "trade_efficiency",
+    "damage_differential",
+]
+
+extract_benchmark_stats = compile_match_stats_extractor(BENCHMARK_FIELDS)
+
+
+RANK_TIERS = [
+    "IRON",
+    "BRONZE",
+    "SILVER",
+    "GOLD",
+    "PLATINUM",
+    "EMERALD",
+    "DIAMOND",
+    "MASTER",
+    "GRANDMASTER",
+    "CHALLENGER",
+]
+
+BENCHMARK_ROLES = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
 
 
 class BenchmarkBuilder:
-    def __init__(self, core=None):
+    def __init__(self, core=None, concurrency=DEFAULT_CRAWL_CONCURRENCY):
         self.core = core or Core()
         self.summoner_api = Summoner(self.core)
         self.rank_api = Rank(self.core)
         self.match_api = Match(self.core)
+        self.concurrency = concurrency
+        self.engine = CrawlEngine(self.core, concurrency)
+
+    def collect_stats(self, raw_data, rank, stats, keys):
+        role = stats.get("role", "UNKNOWN")
+        if role not in raw_data[rank]:
+            return
+
+        for key in keys:
+            if stats[key] is not None:
+                if key not in raw_data[rank][role]:
+                    raw_data[rank][role][key] = create_stat_accumulator()
+                add_sample(raw_data[rank][role][key], stats[key])
+
+    def collect_champion_stats(self, champion_data, rank, stats, keys):
+        role = stats.get("role", "UNKNOWN")
+        champion = stats.get("champion_name")
+        if role not in BENCHMARK_ROLES or not champion:
+            return
+
+        for key in keys:
+            if stats[key] is not None:
+                add_champion_sample(champion_data, rank, role, champion, key, stats[key])
+
+    def collect_match(self, raw_data, rank, match_data, timeline=None, champion_data=None):
+        index = ParticipantIndex(match_data)
+
+        for participant in index.participants:
+            stats = extract_benchmark_stats(match_data, participant["puuid"], index)
+            if stats:
+                self.collect_stats(raw_data, rank, stats, BENCHMARK_STATS)
+                if champion_data is not None:
+                    self.collect_champion_stats(champion_data, rank, stats, BENCHMARK_STATS)
+
+            if timeline:
+                timeline_stats = extract_timeline_benchmark_stats(
+                    match_data, timeline, participant["puuid"], index
+                )
+                if timeline_stats:
+                    self.collect_stats(raw_data, rank, timeline_stats, TIMELINE_BENCHMARK_STATS)
 
     async def build_benchmarks(
         self,
         region,
         platform,
         matches_per_rank=100,
-        output_file="API/benchmarks/benchmark_cache.json",
+        output_file=BENCHMARK_CACHE_PATH,
+        targets=None,
+        checkpoint_file=None,
+        resume=True,
+        timeline_sample_rate=0.0,
+        columnar_dir=None,
     ):
         print(f"\n{'=' * 60}")
         print(f"  Building Real Benchmarks from Match Data")
         print(f"{'=' * 60}\n")
 
-        rank_tiers = [
-            "IRON",
-            "BRONZE",
-            "SILVER",
-            "GOLD",
-            "PLATINUM",
-            "EMERALD",
-            "DIAMOND",
-            "MASTER",
-            "GRANDMASTER",
-            "CHALLENGER",
-        ]
-
-        roles = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
-
-        raw_data = {rank: {role: {} for role in roles} for rank in rank_tiers}
-
-        for rank in rank_tiers:
-            print(f"\n[{rank}] Fetching matches...")
-
-            players = await self.get_players_from_rank(rank, platform, limit=20)
-
-            if not players:
-                print(f"  No players found for {rank}, skipping...")
-                continue
+        # targets: autres (region, platform) à crawler en même temps que la principale
+        targets = targets or [(region, platform)]
 
-            print(f"  Found {len(players)} {rank} players")
-
-            match_ids = set()
-            for i, player_puuid in enumerate(players):
-                player_matches = await self.match_api.get_match_history(
-                    player_puuid, region, count=10
-                )
-                if player_matches:
-                    match_ids.update(player_matches)
-
-                if len(match_ids) >= matches_per_rank:
-                    break
-
-                if (i + 1) % 5 == 0:
-                    print(
-                        f"    Progress: {i + 1}/{len(players)} players, {len(match_ids)} matches"
-                    )
-                    await asyncio.sleep(0.5)
-
-            print(f"  Analyzing {len(match_ids)} matches...")
-
-            for idx, match_id in enumerate(list(match_ids)[:matches_per_rank]):
-                match_data = await self.match_api.get_match_details(match_id, region)
-                if not match_data:
-                    continue
-
-                for participant in match_data["info"]["participants"]:
-                    puuid = participant["puuid"]
-                    stats = extract_match_stats(match_data, puuid)
-
-                    if not stats:
-                        continue
-
-                    role = stats.get("role", "UNKNOWN")
-                    if role not in roles:
-                        continue
-
-                    if role not in raw_data[rank]:
-                        raw_data[rank][role] = {}
-
-                    for key in [
-                        "cs_per_min",
-                        "vision_score",
-                        "kda",
-                        "cs_at_10",
-                        "damage_per_min",
-                        "gold_per_minute",
-                        "kill_participation",
-                    ]:
-                        if key in stats and stats[key] is not None:
-                            if key not in raw_data[rank][role]:
-                                raw_data[rank][role][key] = []
-                            raw_data[rank][role][key].append(stats[key])
-
-                if (idx + 1) % 10 == 0:
-                    print(
-                        f"    Processed: {idx + 1}/{min(len(match_ids), matches_per_rank)}"
-                    )
-                    await asyncio.sleep(0.2)
+        config = {
+            "targets": [list(target) for target in targets],
+            "matches_per_rank": matches_per_rank,
+            "timeline_sample_rate": timeline_sample_rate,
+        }
+        checkpoint, matches_analyzed = await self.run_crawl(
+            targets, RANK_TIERS, matches_per_rank, checkpoint_file or f"{output_file}.checkpoint",
+            config, resume, timeline_sample_rate
+        )
+        raw_data = checkpoint.raw_data
 
         print(f"\n{'=' * 60}")
         print(f"  Calculating Benchmark Averages")
         print(f"{'=' * 60}\n")
 
         benchmarks = self.calculate_averages(raw_data)
+        distributions = self.calculate_distributions(raw_data)
+        champion_benchmarks = calculate_champion_benchmarks(checkpoint.champion_data)
 
         cache_data = {
             "generated_at": datetime.now().isoformat(),
             "region": region,
             "platform": platform,
-            "matches_analyzed": matches_per_rank,
+            "targets": [list(target) for target in targets],
+            "matches_analyzed": matches_analyzed,
             "benchmarks": benchmarks,
+            "distributions": distributions,
+            "champion_benchmarks": champion_benchmarks,
         }
 
-        with open(output_file, "w", encoding="utf-8") as f:
+        # écriture dans un fichier temporaire puis os.replace: le loader ne lit jamais un cache à moitié écrit
+        tmp_file = f"{output_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
             json.dump(cache_data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, output_file)
+
+        checkpoint.clear()
 
         print(f"\nBenchmarks saved to {output_file}")
+        if columnar_dir:
+            write_columnar_store(cache_data, columnar_dir)
+            print(f"  Columnar store written to {columnar_dir}")
         print(f"  Generated at: {cache_data['generated_at']}")
 
         return benchmarks
 
-    async def get_players_from_rank(self, rank, platform, limit=20):
+    async def run_crawl(self, targets, rank_tiers, matches_per_rank, checkpoint_file, config,
+                        resume=True, timeline_sample_rate=0.0, shard=None):
+        # gros crawls multi-régions: filtre de Bloom à la place du set exact des match ids
+        expected_matches = len(targets) * len(rank_tiers) * matches_per_rank
+        checkpoint = CrawlCheckpoint(
+            checkpoint_file, config=config, match_filter=create_match_filter(expected_matches)
+        )
+        if not (resume and checkpoint.load()):
+            checkpoint.raw_data = {rank: {role: {} for role in BENCHMARK_ROLES} for rank in rank_tiers}
+        raw_data = checkpoint.raw_data
+
+        self.engine = CrawlEngine(
+            self.core, self.concurrency, checkpoint, timeline_sample_rate, shard=shard
+        )
+
+        print(
+            f"Crawling {len(rank_tiers)} ranks on {', '.join(p for _, p in targets)} "
+            f"({self.engine.concurrency} concurrent requests)..."
+        )
+
         try:
-            queue = "RANKED_SOLO_5x5"
-            tier = rank
-            division = "I"
-
-            if rank in ["MASTER", "GRANDMASTER", "CHALLENGER"]:
-                entries = await self.core.client.get_lol_league_v4_entries_by_division(
-                    region=platform,
-                    queue=queue,
-                    tier=tier,
-                    division="I",
-                    queries={"page": 1}
-                )
-            else:
-                entries = await self.core.client.get_lol_league_v4_entries_by_division(
-                    region=platform,
-                    queue=queue,
-                    tier=tier,
-                    division=division,
-                    queries={"page": 1}
+            matches_analyzed = await self.engine.crawl(
+                targets,
+                rank_tiers,
+                matches_per_rank,
+                lambda rank, match_region, match_data, timeline: self.collect_match(
+                    raw_data, rank, match_data, timeline, checkpoint.champion_data
                 )
+            )
+        finally:
+            # crash, 429 en boucle ou Ctrl-C: on garde ce qui a été crawlé
+            checkpoint.save()
+            print(f"[Checkpoint] Progress saved to {checkpoint.path}")
+
+        return checkpoint, matches_analyzed
+
+    async def build_shard(self, shard, matches_per_rank=100, output_file=None, resume=True,
+                          timeline_sample_rate=0.0):
+        # un shard = une région x un rang x une part des matchs (voir sharding.py),
+        # il écrit des accumulateurs partiels que merge_partials combine ensuite
+        output_file = output_file or f"{shard['id']}.partial.json"
+        targets = [(shard["region"], shard["platform"])]
+        shard_matches = -(-matches_per_rank // shard["count"])
+
+        config = {
+            "shard": shard,
+            "matches_per_rank": matches_per_rank,
+            "timeline_sample_rate": timeline_sample_rate,
+        }
+        checkpoint, matches_analyzed = await self.run_crawl(
+            targets, [shard["rank"]], shard_matches, f"{output_file}.checkpoint",
+            config, resume, timeline_sample_rate, shard=shard
+        )
+
+        partial = {
+            "shard": shard,
+            "config": config,
+            "crawled_at": datetime.now().isoformat(),
+            "matches_analyzed": matches_analyzed,
+            "match_ids": checkpoint.processed_matches.to_dict(),
+            "raw_data": serialize_raw_data(checkpoint.raw_data),
+            "champion_data": checkpoint.champion_data,
+        }
 
-            puuids = []
-            for entry in entries[:limit]:
-                summoner_id = entry.get("summonerId")
-                if summoner_id:
-                    summoner_data = await self.summoner_api.get_summoner_by_id(
-                        summoner_id, platform
-                    )
-                    if summoner_data:
-                        puuids.append(summoner_data.get("puuid"))
-
-                if len(puuids) >= limit:
-                    break
+        tmp_file = f"{output_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(partial, f)
+        os.replace(tmp_file, output_file)
 
-                await asyncio.sleep(0.1)
+        checkpoint.clear()
 
-            return puuids
+        print(f"\nShard {shard['id']}: {matches_analyzed} matches saved to {output_file}")
+        return partial
 
-        except Exception as e:
-            print(f"  Error fetching players: {e}")
-            return []
+    async def get_players_from_rank(self, rank, platform, limit=20):
+        return await self.engine.get_players_from_rank(rank, platform, limit)
 
     def calculate_averages(self, raw_data):
-        benchmarks = {}
+        return calculate_averages(raw_data)
 
-        for rank, roles in raw_data.items():
-            benchmarks[rank] = {}
-
-            for role, stats in roles.items():
-                if not stats:
-                    continue
-
-                benchmarks[rank][role] = {}
-
-                for stat_name, values in stats.items():
-                    if values:
-                        avg = sum(values) / len(values)
-                        benchmarks[rank][role][stat_name] = round(avg, 2)
-
-        return benchmarks
+    def calculate_distributions(self, raw_data):
+        return calculate_distributions(raw_data)
@@ -1,5 +1,6 @@
 import json
 import os
+import time
 from datetime import datetime, timedelta
 from .fallback_data import (
     CS_BENCHMARKS as FALLBACK_CS,
@@ -7,18 +8,198 @@ from .fallback_data import (
     VISION_SCORE_BENCHMARKS as FALLBACK_VISION,
     KDA_BENCHMARKS as FALLBACK_KDA
 )
+from .quantile_sketch import TDigest, ShiftedSketch, grid_percentile_ranks
 
 
-_BENCHMARK_CACHE = None
-_CACHE_LOADED_AT = None
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_cache.json")
+BENCHMARK_CACHE_PATH = os.path.abspath(os.getenv("BENCHMARK_CACHE_PATH", DEFAULT_CACHE_PATH))
+MAX_CACHE_AGE_DAYS = 30
 
+# dossier du store colonne (columnar_store.py); s'il est configuré, get_benchmark lit les tableaux mmap
+BENCHMARK_STORE_DIR = os.getenv("BENCHMARK_STORE_DIR")
 
-def load_benchmarks(cache_file="API/benchmarks/benchmark_cache.json", max_age_days=30):
-    global _BENCHMARK_CACHE, _CACHE_LOADED_AT
+# on ne re-stat le fichier qu'au plus toutes les N secondes, le reste du temps c'est un dict hit
+RELOAD_CHECK_INTERVAL = 5
 
-    if _BENCHMARK_CACHE and _CACHE_LOADED_AT:
-        return _BENCHMARK_CACHE
+# shrinkage champion -> rôle: valeur = (n * moyenne champion + k * valeur rôle) / (n + k),
+# un champion peu joué reste proche du benchmark de son rôle
+CHAMPION_PRIOR_SAMPLES = 20
 
+FALLBACK_TABLES = {
+    "cs_per_min": FALLBACK_CS,
+    "cs_at_10": FALLBACK_CS_AT_10,
+    "vision_score": FALLBACK_VISION,
+}
+
+
+class BenchmarkTable:
+    # cache compilé: (stat, role, rank) -> valeur, fallbacks et moyennes KDA déjà résolus
+
+    def __init__(self, cache_data=None, path=None, mtime=None):
+        self.path = path
+        self.mtime = mtime
+        self.checked_at = time.monotonic()
+        self.benchmarks = cache_data["benchmarks"] if cache_data else None
+        self.distributions = (cache_data or {}).get("distributions", {})
+        self.champion_benchmarks = (cache_data or {}).get("champion_benchmarks", {})
+        self.values = {}
+        self.champion_values = {}
+        self.roles = set()
+        self._sketches = {}
+        self._grids = {}
+        self._compile()
+        self._compile_champions()
+
+    def _compile(self):
+        benchmarks = self.benchmarks or {}
+
+        stats = set(FALLBACK_TABLES) | {"kda"}
+        ranks = set(FALLBACK_KDA)
+        for table in FALLBACK_TABLES.values():
+            self.roles.update(table)
+            for rank_values in table.values():
+                ranks.update(rank_values)
+
+        for rank_tier, rank_data in benchmarks.items():
+            ranks.add(rank_tier)
+            for role, role_data in rank_data.items():
+                self.roles.add(role)
+                stats.update(role_data)
+
+        for stat_type in stats:
+            for rank_tier in ranks:
+                for role in list(self.roles) + [None]:
+                    value = resolve_benchmark(benchmarks, stat_type, role, rank_tier)
+                    if value is not None:
+                        self.values[(stat_type, role, rank_tier)] = value
+
+    def _compile_champions(self):
+        # niveau champion déjà rétréci vers rôle x rang: un seul lookup au moment de get
+        for rank_tier, roles in self.champion_benchmarks.items():
+            for role, champions in roles.items():
+                for champion, stats in champions.items():
+                    for stat_type, entry in stats.items():
+                        value = shrink_champion_value(
+                            entry["mean"], entry["count"], self.values.get((stat_type, role, rank_tier))
+                        )
+                        self.champion_values[(stat_type, role, rank_tier, champion)] = value
+
+    def get(self, stat_type, role, rank_tier, champion=None):
+        if champion:
+            value = self.champion_values.get((stat_type, role, rank_tier, champion))
+            if value is not None:
+                return value
+
+        if role not in self.roles:
+            role = None
+        return self.values.get((stat_type, role, rank_tier))
+
+    def get_sketch(self, stat_type, role, rank_tier, champion=None):
+        key = (stat_type, role, rank_tier)
+        if key not in self._sketches:
+            self._sketches[key] = build_sketch(self.distributions, stat_type, role, rank_tier)
+        return shift_for_champion(self, self._sketches[key], stat_type, role, rank_tier, champion)
+
+    def get_quantile_grid(self, stat_type, role, rank_tier, champion=None):
+        # grille de quantiles du sketch, calculée une fois par clé pour le placement vectorisé
+        key = (stat_type, role, rank_tier)
+        if key not in self._grids:
+            sketch = self.get_sketch(stat_type, role, rank_tier)
+            self._grids[key] = sketch.quantile_grid() if sketch is not None and sketch.count else None
+
+        grid = self._grids[key]
+        if grid is None:
+            return None
+        return grid + champion_offset(self, stat_type, role, rank_tier, champion)
+
+
+def shrink_champion_value(mean, count, role_value, prior_samples=CHAMPION_PRIOR_SAMPLES):
+    if role_value is None:
+        return mean
+    return round((count * mean + prior_samples * role_value) / (count + prior_samples), 2)
+
+
+def champion_offset(table, stat_type, role, rank_tier, champion):
+    if not champion:
+        return 0.0
+
+    champion_value = table.champion_values.get((stat_type, role, rank_tier, champion))
+    role_value = table.get(stat_type, role, rank_tier)
+    if champion_value is None or role_value is None:
+        return 0.0
+    return champion_value - role_value
+
+
+def shift_for_champion(table, sketch, stat_type, role, rank_tier, champion):
+    # percentile champion = distribution du rôle décalée de l'écart champion - rôle
+    offset = champion_offset(table, stat_type, role, rank_tier, champion)
+    if sketch is None or not offset:
+        return sketch
+    return ShiftedSketch(sketch, offset)
+
+
+def pool_benchmark(table, stat_type, role, rank_tier, champion_games):
+    # moyenne des niveaux champion pondérée par les parties (champion inconnu = niveau rôle)
+    total_games = sum(champion_games.values())
+    value = sum(
+        table.get(stat_type, role, rank_tier, champion) * games
+        for champion, games in champion_games.items()
+    ) / total_games
+    return round(value, 2)
+
+
+def resolve_benchmark(benchmarks, stat_type, role, rank_tier):
+    # règles de résolution, évaluées une seule fois à la compilation
+    if benchmarks and rank_tier in benchmarks:
+        rank_data = benchmarks[rank_tier]
+
+        if role and role in rank_data:
+            role_data = rank_data[role]
+            if stat_type in role_data:
+                return role_data[stat_type]
+
+        if stat_type == "kda":
+            kda_values = []
+            for role_name, role_data in rank_data.items():
+                if "kda" in role_data:
+                    kda_values.append(role_data["kda"])
+            if kda_values:
+                return round(sum(kda_values) / len(kda_values), 2)
+
+    if stat_type in FALLBACK_TABLES:
+        return FALLBACK_TABLES[stat_type].get(role, {}).get(rank_tier)
+    elif stat_type == "kda":
+        return FALLBACK_KDA.get(rank_tier)
+
+    return None
+
+
+def build_sketch(distributions, stat_type, role, rank_tier):
+    rank_data = distributions.get(rank_tier, {})
+
+    if role and stat_type in rank_data.get(role, {}):
+        return TDigest.from_dict(rank_data[role][stat_type])
+
+    if stat_type == "kda":
+        # comme get_benchmark: kda sans rôle = tous les rôles du rang
+        sketch = None
+        for role_data in rank_data.values():
+            if "kda" in role_data:
+                sketch = sketch or TDigest()
+                sketch.merge(TDigest.from_dict(role_data["kda"]))
+        return sketch
+
+    return None
+
+
+_TABLE = None
+
+
+def is_expired(generated_at, max_age_days):
+    return datetime.now() - generated_at > timedelta(days=max_age_days)
+
+
+def read_cache_file(cache_file, max_age_days):
     if not os.path.exists(cache_file):
         print(f"[Benchmarks] Cache file not found: {cache_file}")
         print(f"[Benchmarks] Using fallback hardcoded values")
@@ -31,20 +212,17 @@ def load_benchmarks(cache_file="API/benchmarks/benchmark_cache.json", max_age_da
         generated_at = datetime.fromisoformat(cache_data["generated_at"])
         age = datetime.now() - generated_at
 
-        if age > timedelta(days=max_age_days):
+        if is_expired(generated_at, max_age_days):
             print(f"[Benchmarks] Cache is {age.days} days old (max: {max_age_days})")
             print(f"[Benchmarks] Using fallback hardcoded values")
             print(f"[Benchmarks] Run benchmark_builder.py to refresh")
             return None
 
-        _BENCHMARK_CACHE = cache_data["benchmarks"]
-        _CACHE_LOADED_AT = datetime.now()
-
-        print(f"[Benchmarks] Loaded real benchmarks from cache")
+        print(f"[Benchmarks] Loaded real benchmarks from {cache_file}")
         print(f"[Benchmarks] Generated: {generated_at.strftime('%Y-%m-%d %H:%M')}")
         print(f"[Benchmarks] Age: {age.days} days")
 
-        return _BENCHMARK_CACHE
+        return cache_data
 
     except Exception as e:
         print(f"[Benchmarks] Error loading cache: {e}")
@@ -52,40 +230,122 @@ def load_benchmarks(cache_file="API/benchmarks/benchmark_cache.json", max_age_da
         return None
 
 
-def get_benchmark(stat_type, role, rank):
-    benchmarks = load_benchmarks()
+def get_cache_mtime(cache_file):
+    try:
+        return os.stat(cache_file).st_mtime_ns
+    except OSError:
+        return None
+
+
+def get_benchmark_table(cache_file=None, max_age_days=MAX_CACHE_AGE_DAYS):
+    global _TABLE
+
+    cache_file = os.path.abspath(cache_file) if cache_file else BENCHMARK_CACHE_PATH
+    table = _TABLE
+
+    if table and table.path == cache_file:
+        if time.monotonic() - table.checked_at < RELOAD_CHECK_INTERVAL:
+            return table
+
+        table.checked_at = time.monotonic()
+        if get_cache_mtime(cache_file) == table.mtime:
+            return table
+
+    # nouvelle table construite à part puis échangée d'un coup: les lecteurs ne voient jamais un état partiel
+    mtime = get_cache_mtime(cache_file)
+    cache_data = read_cache_file(cache_file, max_age_days)
+    _TABLE = BenchmarkTable(cache_data, cache_file, mtime)
+    return _TABLE
+
+
+_STORE = None
+
+
+def get_columnar_store(store_dir=None, max_age_days=MAX_CACHE_AGE_DAYS):
+    global _STORE
+    from .columnar_store import ColumnarBenchmarkStore, AXES_FILE
+
+    store_dir = os.path.abspath(store_dir or BENCHMARK_STORE_DIR)
+    axes_file = os.path.join(store_dir, AXES_FILE)
+    store = _STORE
+
+    if store and store.path == store_dir:
+        if time.monotonic() - store.checked_at >= RELOAD_CHECK_INTERVAL:
+            store.checked_at = time.monotonic()
+            if get_cache_mtime(axes_file) != store.mtime:
+                store = None
+    else:
+        store = None
+
+    if store is None:
+        mtime = get_cache_mtime(axes_file)
+        if mtime is None:
+            return None
+        store = _STORE = ColumnarBenchmarkStore(store_dir, mtime)
+
+    return store if check_store_age(store, max_age_days) else None
+
+
+def check_store_age(store, max_age_days):
+    # même règle que le JSON: au-delà de max_age_days on retombe sur le cache JSON / les fallbacks
+    try:
+        expired = is_expired(datetime.fromisoformat(store.generated_at), max_age_days)
+    except (TypeError, ValueError):
+        expired = True
+
+    if expired and not getattr(store, "expired_reported", False):
+        print(f"[Benchmarks] Columnar store {store.path} is too old or undated (max: {max_age_days} days)")
+        print(f"[Benchmarks] Using the JSON cache / fallback values instead")
+        store.expired_reported = True
+    return not expired
+
+
+def get_lookup_table():
+    if BENCHMARK_STORE_DIR:
+        store = get_columnar_store()
+        if store:
+            return store
+    return get_benchmark_table()
+
 
+def load_benchmarks(cache_file=None, max_age_days=MAX_CACHE_AGE_DAYS):
+    return get_benchmark_table(cache_file, max_age_days).benchmarks
+
+
+def get_benchmark(stat_type, role, rank, champion=None):
+    # champion: niveau champion x rôle x rang s'il a assez de parties, sinon rôle x rang
     rank_tier = rank.split("_")[0] if rank else None
+    return get_lookup_table().get(stat_type, role, rank_tier, champion)
 
-    if benchmarks and rank_tier in benchmarks:
-        rank_data = benchmarks[rank_tier]
 
-        if role and role in rank_data:
-            role_data = rank_data[role]
-            if stat_type in role_data:
-                return role_data[stat_type]
+def get_distribution(stat_type, role, rank, champion=None):
+    # sketch t-digest de la stat, None si le cache n'en a pas (ancien cache / fallback)
+    rank_tier = rank.split("_")[0] if rank else None
+    return get_lookup_table().get_sketch(stat_type, role, rank_tier, champion)
 
-        if stat_type == "kda":
-            kda_values = []
-            for role_name, role_data in rank_data.items():
-                if "kda" in role_data:
-                    kda_values.append(role_data["kda"])
-            if kda_values:
-                return round(sum(kda_values) / len(kda_values), 2)
 
-    if stat_type == "cs_per_min":
-        return FALLBACK_CS.get(role, {}).get(rank_tier)
-    elif stat_type == "cs_at_10":
-        return FALLBACK_CS_AT_10.get(role, {}).get(rank_tier)
-    elif stat_type == "vision_score":
-        return FALLBACK_VISION.get(role, {}).get(rank_tier)
-    elif stat_type == "kda":
-        return FALLBACK_KDA.get(rank_tier)
+def get_pool_benchmark(stat_type, role, rank, champion_games=None):
+    # benchmark d'un pool de champions (champion -> parties): moyenne pondérée des niveaux champion,
+    # sketch du rôle décalé d'autant; sans pool = get_benchmark / get_distribution classiques
+    role_value = get_benchmark(stat_type, role, rank)
+    sketch = get_distribution(stat_type, role, rank)
+    if role_value is None or not sum((champion_games or {}).values()):
+        return role_value, sketch
+
+    rank_tier = rank.split("_")[0] if rank else None
+    value = pool_benchmark(get_lookup_table(), stat_type, role, rank_tier, champion_games)
+
+    if sketch is not None and value != role_value:
+        sketch = ShiftedSketch(sketch, value - role_value)
+    return value, sketch
 
-    return None
 
+def calculate_percentile(player_value, benchmark_value, sketch=None):
+    if sketch is not None and sketch.count:
+        # même grille de quantiles que place_players: les deux API donnent le même percentile
+        percentile = float(grid_percentile_ranks(sketch.quantile_grid(), player_value))
+        return max(1, min(99, int(round(percentile))))
 
-def calculate_percentile(player_value, benchmark_value):
     if not benchmark_value:
         return None
 
@@ -0,0 +1,255 @@
+import json
+import os
+import time
+from .quantile_sketch import TDigest
+from .match_filter import ExactMatchFilter, load_match_filter
+
+# Checkpoint du crawl: joueurs et matchs déjà traités + accumulateurs partiels,
+# sauvegardés ensemble de façon atomique pour reprendre sans rien compter deux fois
+
+CHECKPOINT_EVERY_MATCHES = 25
+CHECKPOINT_EVERY_SECONDS = 60
+
+# en dessous, pas de benchmark champion dans le cache (le loader retombe sur rôle x rang)
+CHAMPION_MIN_SAMPLES = 5
+
+
+def create_stat_accumulator():
+    # somme pour la moyenne + sketch pour les vrais percentiles, taille fixe par clé
+    return {"total": 0, "count": 0, "sketch": TDigest()}
+
+
+def add_sample(accumulator, value):
+    accumulator["total"] += value
+    accumulator["count"] += 1
+    accumulator["sketch"].add(value)
+
+
+def add_champion_sample(champion_data, rank, role, champion, stat, value):
+    # champion x rôle x rang: juste somme + nombre (creux, pas de sketch), déjà sérialisable en JSON
+    stats = champion_data.setdefault(rank, {}).setdefault(role, {}).setdefault(champion, {})
+    accumulator = stats.setdefault(stat, {"total": 0, "count": 0})
+    accumulator["total"] += value
+    accumulator["count"] += 1
+
+
+def merge_champion_data(champion_data, other):
+    for rank, roles in other.items():
+        for role, champions in roles.items():
+            for champion, stats in champions.items():
+                for stat, acc in stats.items():
+                    target = (
+                        champion_data.setdefault(rank, {})
+                        .setdefault(role, {})
+                        .setdefault(champion, {})
+                        .setdefault(stat, {"total": 0, "count": 0})
+                    )
+                    target["total"] += acc["total"]
+                    target["count"] += acc["count"]
+    return champion_data
+
+
+def calculate_champion_benchmarks(champion_data, min_samples=CHAMPION_MIN_SAMPLES):
+    champion_benchmarks = {}
+
+    # clés triées: l'ordre d'arrivée des matchs ne change pas le fichier
+    for rank, roles in sorted(champion_data.items()):
+        for role, champions in sorted(roles.items()):
+            for champion, stats in sorted(champions.items()):
+                for stat_name, accumulator in sorted(stats.items()):
+                    if accumulator["count"] >= min_samples:
+                        champion_benchmarks.setdefault(rank, {}).setdefault(role, {}).setdefault(
+                            champion, {}
+                        )[stat_name] = {
+                            "mean": round(accumulator["total"] / accumulator["count"], 2),
+                            "count": accumulator["count"],
+                        }
+
+    return champion_benchmarks
+
+
+def merge_raw_data(raw_data, other):
+    # fusion d'accumulateurs (shards, reprises): sommes additionnées, sketches fusionnés
+    for rank, roles in other.items():
+        for role, stats in roles.items():
+            target = raw_data.setdefault(rank, {}).setdefault(role, {})
+            for stat, acc in stats.items():
+                if stat not in target:
+                    target[stat] = create_stat_accumulator()
+                target[stat]["total"] += acc["total"]
+                target[stat]["count"] += acc["count"]
+                target[stat]["sketch"].merge(acc["sketch"])
+    return raw_data
+
+
+def calculate_averages(raw_data):
+    benchmarks = {}
+
+    for rank, roles in raw_data.items():
+        benchmarks[rank] = {}
+
+        for role, stats in roles.items():
+            if not stats:
+                continue
+
+            benchmarks[rank][role] = {}
+
+            for stat_name, accumulator in stats.items():
+                if accumulator["count"]:
+                    avg = accumulator["total"] / accumulator["count"]
+                    benchmarks[rank][role][stat_name] = round(avg, 2)
+
+    return benchmarks
+
+
+def calculate_distributions(raw_data):
+    distributions = {}
+
+    for rank, roles in raw_data.items():
+        for role, stats in roles.items():
+            for stat_name, accumulator in stats.items():
+                if accumulator["count"]:
+                    distributions.setdefault(rank, {}).setdefault(role, {})[stat_name] = (
+                        accumulator["sketch"].to_dict()
+                    )
+
+    return distributions
+
+
+def serialize_raw_data(raw_data):
+    return {
+        rank: {
+            role: {
+                stat: {
+                    "total": acc["total"],
+                    "count": acc["count"],
+                    "sketch": acc["sketch"].to_dict(),
+                }
+                for stat, acc in stats.items()
+            }
+            for role, stats in roles.items()
+        }
+        for rank, roles in raw_data.items()
+    }
+
+
+def deserialize_raw_data(data):
+    return {
+        rank: {
+            role: {
+                stat: {
+                    "total": acc["total"],
+                    "count": acc["count"],
+                    "sketch": TDigest.from_dict(acc["sketch"]),
+                }
+                for stat, acc in stats.items()
+            }
+            for role, stats in roles.items()
+        }
+        for rank, roles in data.items()
+    }
+
+
+class CrawlCheckpoint:
+
+    def __init__(self, path, config=None, every_matches=CHECKPOINT_EVERY_MATCHES,
+                 every_seconds=CHECKPOINT_EVERY_SECONDS, match_filter=None):
+        self.path = path
+        self.config = config or {}
+        self.every_matches = every_matches
+        self.every_seconds = every_seconds
+
+        self.processed_puuids = set()
+        # matchs déjà ajoutés aux accumulateurs (set exact ou filtre de Bloom, voir match_filter.py)
+        self.processed_matches = match_filter if match_filter is not None else ExactMatchFilter()
+        self.rank_counts = {}
+        self.raw_data = {}
+        self.champion_data = {}
+
+        self._pending = 0
+        self._saved_at = time.monotonic()
+
+    @staticmethod
+    def rank_key(rank, platform):
+        return f"{platform}:{rank}"
+
+    def rank_count(self, rank, platform):
+        return self.rank_counts.get(self.rank_key(rank, platform), 0)
+
+    @property
+    def match_count(self):
+        return sum(self.rank_counts.values())
+
+    def is_player_done(self, puuid):
+        return puuid in self.processed_puuids
+
+    def mark_player(self, puuid):
+        self.processed_puuids.add(puuid)
+
+    def mark_match(self, match_id, rank, platform):
+        # appelé après que le match a été ajouté aux accumulateurs
+        self.processed_matches.add(match_id)
+        key = self.rank_key(rank, platform)
+        self.rank_counts[key] = self.rank_counts.get(key, 0) + 1
+
+        self._pending += 1
+        self.maybe_save()
+
+    def maybe_save(self):
+        elapsed = time.monotonic() - self._saved_at
+        if self._pending >= self.every_matches or (self._pending and elapsed >= self.every_seconds):
+            self.save()
+
+    def save(self):
+        data = {
+            "saved_at": time.time(),
+            "config": self.config,
+            "processed_puuids": sorted(self.processed_puuids),
+            "processed_matches": self.processed_matches.to_dict(),
+            "rank_counts": self.rank_counts,
+            "raw_data": serialize_raw_data(self.raw_data),
+            "champion_data": self.champion_data,
+        }
+
+        tmp_file = f"{self.path}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_file, self.path)
+
+        self._pending = 0
+        self._saved_at = time.monotonic()
+
+    def load(self):
+        # reprise seulement si le checkpoint correspond à la même config de crawl
+        if not os.path.exists(self.path):
+            return False
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[Checkpoint] Unreadable checkpoint {self.path}: {e}")
+            return False
+
+        if data.get("config") != self.config:
+            print(f"[Checkpoint] Config changed since {self.path} was written, starting fresh")
+            return False
+
+        self.processed_puuids = set(data.get("processed_puuids", []))
+        if "processed_matches" in data:
+            self.processed_matches = load_match_filter(data["processed_matches"])
+        else:
+            self.processed_matches = ExactMatchFilter(data.get("processed_match_ids", []))
+        self.rank_counts = data.get("rank_counts", {})
+        self.raw_data = deserialize_raw_data(data.get("raw_data", {}))
+        self.champion_data = data.get("champion_data", {})
+
+        print(
+            f"[Checkpoint] Resuming: {self.match_count} matches, "
+            f"{len(self.processed_puuids)} players already processed"
+        )
+        return True
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,199 @@
+import json
+import os
+import sys
+import time
+import numpy as np
+from .benchmark_loader import BenchmarkTable, shift_for_champion, champion_offset
+from .quantile_sketch import QUANTILE_LEVELS, sketch_to_grid, grid_percentile_ranks
+
+# Format colonne du cache: tableaux numpy stat x rôle x rang (+ grille de quantiles) ouverts en
+# mmap lecture seule, les workers partagent les pages au lieu de parser chacun leur JSON
+
+AXES_FILE = "axes.json"
+NO_ROLE = ""
+
+
+class QuantileGridSketch:
+    # vue sur une ligne de la grille, même interface que TDigest pour calculate_percentile
+
+    def __init__(self, values, count):
+        self.values = values
+        self.count = count
+
+    def quantile(self, q):
+        return float(np.interp(q, QUANTILE_LEVELS, self.values))
+
+    def percentile_rank(self, value):
+        return float(grid_percentile_ranks(self.values, [value])[0])
+
+    def quantile_grid(self):
+        return self.values
+
+
+def write_columnar_store(cache_data, directory):
+    table = BenchmarkTable(cache_data)
+
+    stats = sorted({stat for stat, _, _ in table.values} | {
+        stat
+        for roles in table.distributions.values()
+        for role_stats in roles.values()
+        for stat in role_stats
+    })
+    roles = sorted(table.roles) + [NO_ROLE]
+    ranks = sorted({rank for _, _, rank in table.values})
+
+    shape = (len(stats), len(roles), len(ranks))
+    values = np.full(shape, np.nan)
+    counts = np.zeros(shape, dtype=np.int64)
+    quantiles = np.full(shape + (len(QUANTILE_LEVELS),), np.nan)
+
+    for s, stat in enumerate(stats):
+        for r, role in enumerate(roles):
+            role_key = role or None
+            for k, rank in enumerate(ranks):
+                value = table.values.get((stat, role_key, rank))
+                if value is not None:
+                    values[s, r, k] = value
+
+                sketch = table.get_sketch(stat, role_key, rank)
+                if sketch is not None and sketch.count:
+                    counts[s, r, k] = sketch.count
+                    quantiles[s, r, k] = sketch_to_grid(sketch)
+
+    os.makedirs(directory, exist_ok=True)
+    previous_version = read_store_version(directory)
+
+    # fichiers versionnés puis axes.json remplacé en dernier: un lecteur voit l'ancienne ou la nouvelle version
+    version = f"{time.time_ns():x}"
+    files = {}
+    for name, array in (("values", values), ("counts", counts), ("quantiles", quantiles)):
+        files[name] = f"{version}.{name}.npy"
+        np.save(os.path.join(directory, files[name]), array)
+
+    axes = {
+        "version": version,
+        "generated_at": (cache_data or {}).get("generated_at"),
+        "stats": stats,
+        "roles": roles,
+        "ranks": ranks,
+        "quantile_levels": len(QUANTILE_LEVELS),
+        "files": files,
+        # niveau champion creux, déjà rétréci: quelques centaines d'entrées, pas la peine d'un tableau
+        "champions": [
+            [stat, role, rank, champion, value]
+            for (stat, role, rank, champion), value in sorted(table.champion_values.items())
+        ],
+    }
+
+    tmp_file = os.path.join(directory, f"{AXES_FILE}.tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(axes, f, indent=2)
+    os.replace(tmp_file, os.path.join(directory, AXES_FILE))
+
+    # la version remplacée reste jusqu'au prochain build: un lecteur qui a lu l'ancien axes.json
+    # mais pas encore ouvert ses tableaux les trouve toujours; seules les versions plus anciennes partent
+    kept = {version, previous_version}
+    for filename in os.listdir(directory):
+        if filename.endswith(".npy") and filename.split(".", 1)[0] not in kept:
+            os.remove(os.path.join(directory, filename))
+
+    return axes
+
+
+def read_store_version(directory):
+    try:
+        with open(os.path.join(directory, AXES_FILE), "r", encoding="utf-8") as f:
+            return json.load(f).get("version")
+    except (OSError, ValueError):
+        return None
+
+
+class ColumnarBenchmarkStore:
+
+    def __init__(self, directory, mtime=None):
+        self.path = directory
+        self.mtime = mtime
+        self.checked_at = time.monotonic()
+
+        with open(os.path.join(directory, AXES_FILE), "r", encoding="utf-8") as f:
+            axes = json.load(f)
+
+        self.generated_at = axes.get("generated_at")
+        self.stat_index = {stat: i for i, stat in enumerate(axes["stats"])}
+        self.role_index = {role: i for i, role in enumerate(axes["roles"])}
+        self.rank_index = {rank: i for i, rank in enumerate(axes["ranks"])}
+        self.roles = {role for role in axes["roles"] if role != NO_ROLE}
+        self.champion_values = {
+            (stat, role, rank, champion): value
+            for stat, role, rank, champion, value in axes.get("champions", [])
+        }
+
+        files = axes["files"]
+        self.values = np.load(os.path.join(directory, files["values"]), mmap_mode="r")
+        self.counts = np.load(os.path.join(directory, files["counts"]), mmap_mode="r")
+        self.quantiles = np.load(os.path.join(directory, files["quantiles"]), mmap_mode="r")
+
+        # le store ne garde pas le dict imbriqué, load_benchmarks passe par le JSON
+        self.benchmarks = None
+
+    def _position(self, stat_type, role, rank_tier):
+        s = self.stat_index.get(stat_type)
+        k = self.rank_index.get(rank_tier)
+        if s is None or k is None:
+            return None
+        r = self.role_index[role if role in self.roles else NO_ROLE]
+        return s, r, k
+
+    def get(self, stat_type, role, rank_tier, champion=None):
+        if champion:
+            value = self.champion_values.get((stat_type, role, rank_tier, champion))
+            if value is not None:
+                return value
+
+        position = self._position(stat_type, role, rank_tier)
+        if position is None:
+            return None
+
+        value = float(self.values[position])
+        return None if np.isnan(value) else value
+
+    def get_sketch(self, stat_type, role, rank_tier, champion=None):
+        position = self._position(stat_type, role, rank_tier)
+        if position is None:
+            return None
+
+        count = int(self.counts[position])
+        if not count:
+            return None
+        sketch = QuantileGridSketch(np.asarray(self.quantiles[position]), count)
+        return shift_for_champion(self, sketch, stat_type, role, rank_tier, champion)
+
+    def get_quantile_grid(self, stat_type, role, rank_tier, champion=None):
+        # vue mmap directe sans champion, copie décalée seulement s'il y a un écart champion; None si pas de distribution
+        position = self._position(stat_type, role, rank_tier)
+        if position is None or not self.counts[position]:
+            return None
+
+        offset = champion_offset(self, stat_type, role, rank_tier, champion)
+        if not offset:
+            return self.quantiles[position]
+        return self.quantiles[position] + offset
+
+
+def main(argv=None):
+    argv = argv if argv is not None else sys.argv[1:]
+    if len(argv) != 2:
+        print("Usage: python -m API.benchmarks.columnar_store <benchmark_cache.json> <output_dir>")
+        return 1
+
+    cache_file, directory = argv
+    with open(cache_file, "r", encoding="utf-8") as f:
+        cache_data = json.load(f)
+
+    axes = write_columnar_store(cache_data, directory)
+    print(f"Columnar benchmark store written to {directory} ({len(axes['stats'])} stats)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
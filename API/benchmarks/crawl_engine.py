@@ -0,0 +1,261 @@
+import asyncio
+import hashlib
+from ..league.summoner import Summoner
+from ..league.match import Match
+from .match_filter import create_match_filter
+
+# Crawl du ladder en parallèle: entrées de ligue -> ids de matchs -> détails, chaque appel API
+# passe par un sémaphore, le rate limiter du client Riot reste le seul frein (plus de sleep)
+
+DEFAULT_CRAWL_CONCURRENCY = 8
+PLAYERS_PER_RANK = 20
+MATCHES_PER_PLAYER = 10
+RANKED_QUEUE = "RANKED_SOLO_5x5"
+
+
+def stable_hash(key):
+    # hash stable entre process/machines (contrairement à hash()), 32 bits
+    return int(hashlib.sha1(key.encode("utf-8")).hexdigest()[:8], 16)
+
+
+class CrawlEngine:
+
+    def __init__(self, core, concurrency=DEFAULT_CRAWL_CONCURRENCY, checkpoint=None,
+                 timeline_sample_rate=0.0, shard=None):
+        self.core = core
+        self.summoner_api = Summoner(core)
+        self.match_api = Match(core)
+        self.concurrency = concurrency
+        self.checkpoint = checkpoint
+        self.timeline_sample_rate = timeline_sample_rate
+        # shard: {"index": i, "count": n}, ce process lit tout le pool de joueurs mais ne garde que sa part des matchs
+        self.shard = shard
+
+        self._semaphore = asyncio.Semaphore(concurrency)
+        # filtre global vérifié avant tout téléchargement de détails, toutes régions et rangs confondus,
+        # un match n'y entre qu'une fois ses détails récupérés
+        self.seen_match_ids = create_match_filter()
+        # matchs réclamés dont le téléchargement est en cours (pas deux fois le même en parallèle)
+        self.in_flight_match_ids = set()
+        self.matches_fetched = 0
+
+        if checkpoint:
+            # reprise: les matchs déjà comptés ne sont ni re-téléchargés ni re-comptés
+            self.seen_match_ids = checkpoint.processed_matches.copy()
+            self.matches_fetched = checkpoint.match_count
+
+    async def _call(self, func, *args, **kwargs):
+        async with self._semaphore:
+            return await func(*args, **kwargs)
+
+    async def get_league_entries(self, rank, platform, page=1):
+        # les tiers apex n'ont qu'une division "I"
+        try:
+            return await self._call(
+                self.core.client.get_lol_league_v4_entries_by_division,
+                region=platform,
+                queue=RANKED_QUEUE,
+                tier=rank,
+                division="I",
+                queries={"page": page}
+            )
+        except Exception as e:
+            print(f"  Error fetching league entries for {rank}: {e}")
+            return []
+
+    async def resolve_puuid(self, entry, platform):
+        # les entrées récentes contiennent déjà le puuid, sinon lookup summoner
+        puuid = entry.get("puuid")
+        if puuid:
+            return puuid
+
+        summoner_id = entry.get("summonerId")
+        if not summoner_id:
+            return None
+
+        summoner_data = await self._call(self.summoner_api.get_summoner_by_id, summoner_id, platform)
+        return summoner_data.get("puuid") if summoner_data else None
+
+    async def get_ranked_entries(self, rank, platform, count):
+        # autant de pages que nécessaire (~205 entrées par page) pour avoir count joueurs
+        entries = []
+        page = 1
+        while len(entries) < count:
+            page_entries = await self.get_league_entries(rank, platform, page)
+            if not page_entries:
+                break
+            entries.extend(page_entries)
+            page += 1
+        return entries[:count]
+
+    async def get_players_from_rank(self, rank, platform, limit=PLAYERS_PER_RANK):
+        entries = await self.get_league_entries(rank, platform)
+        puuids = await asyncio.gather(
+            *(self.resolve_puuid(entry, platform) for entry in (entries or [])[:limit])
+        )
+        return [puuid for puuid in puuids if puuid]
+
+    def owns_match(self, match_id):
+        # un match n'appartient qu'à un shard de son rang: deux shards ne le comptent jamais deux fois,
+        # et comme chaque shard lit tous les historiques du pool, aucun match n'est perdu
+        return not self.shard or stable_hash(match_id) % self.shard["count"] == self.shard["index"]
+
+    def _claim_match(self, match_id, rank_state, matches_per_rank):
+        if not self.owns_match(match_id):
+            return False
+        if match_id in self.seen_match_ids or match_id in self.in_flight_match_ids:
+            return False
+        if rank_state["claimed"] >= matches_per_rank:
+            return False
+        self.in_flight_match_ids.add(match_id)
+        rank_state["claimed"] += 1
+        rank_state["pending"] += 1
+        return True
+
+    async def _wait_for_fetches(self, rank_state):
+        # attend la fin d'un téléchargement du rang (réussi ou non), chaque fin réveille tous les joueurs
+        await rank_state["fetched"].wait()
+
+    def should_fetch_timeline(self, match_id):
+        # échantillon déterministe (hash du match id): même sous-ensemble d'une reprise ou d'une machine à l'autre
+        if self.timeline_sample_rate <= 0:
+            return False
+        bucket = stable_hash(match_id) / 0xFFFFFFFF
+        return bucket < self.timeline_sample_rate
+
+    async def _fetch_match(self, match_id, region):
+        match_data = await self._call(self.match_api.get_match_details, match_id, region)
+        if not match_data:
+            return None, None
+
+        timeline = None
+        if self.should_fetch_timeline(match_id):
+            timeline = await self._call(self.match_api.get_match_timeline, match_id, region)
+        return match_data, timeline
+
+    def _record_match(self, match_id, rank, region, platform, match_data, timeline, on_match, rank_state):
+        self.in_flight_match_ids.discard(match_id)
+        rank_state["pending"] -= 1
+        fetched, rank_state["fetched"] = rank_state["fetched"], asyncio.Event()
+        fetched.set()
+
+        if not match_data:
+            # échec API: la place est rendue au rang, le match pourra être réclamé à nouveau
+            rank_state["claimed"] -= 1
+            return
+
+        self.seen_match_ids.add(match_id)
+        self.matches_fetched += 1
+        on_match(rank, region, match_data, timeline)
+
+        if self.checkpoint:
+            self.checkpoint.mark_match(match_id, rank, platform)
+
+    async def _crawl_match(self, match_id, rank, region, platform, rank_state, on_match):
+        match_data, timeline = await self._fetch_match(match_id, region)
+        self._record_match(match_id, rank, region, platform, match_data, timeline, on_match, rank_state)
+
+    async def _crawl_player(self, puuid, rank, region, platform, rank_state, matches_per_rank, on_match):
+        if rank_state["claimed"] >= matches_per_rank:
+            return
+
+        match_ids = await self._call(
+            self.match_api.get_match_history, puuid, region, count=MATCHES_PER_PLAYER
+        )
+        if not match_ids:
+            return
+
+        # nouvelles réclamations tant que des téléchargements échouent et qu'il reste des candidats
+        candidates = list(match_ids)
+        while candidates:
+            claimed = [
+                match_id for match_id in candidates
+                if self._claim_match(match_id, rank_state, matches_per_rank)
+            ]
+            if not claimed:
+                # quota atteint mais des téléchargements en cours: un échec rendra une place
+                if rank_state["claimed"] >= matches_per_rank and rank_state["pending"]:
+                    await self._wait_for_fetches(rank_state)
+                    continue
+                return
+            await asyncio.gather(*(
+                self._crawl_match(match_id, rank, region, platform, rank_state, on_match)
+                for match_id in claimed
+            ))
+            candidates = [match_id for match_id in candidates if match_id not in claimed]
+
+    async def _crawl_entry(self, entry, rank, region, platform, rank_state, matches_per_rank, on_match):
+        if rank_state["claimed"] >= matches_per_rank:
+            return
+
+        puuid = await self.resolve_puuid(entry, platform)
+        if not puuid:
+            return
+        if self.checkpoint and self.checkpoint.is_player_done(puuid):
+            return
+
+        await self._crawl_player(puuid, rank, region, platform, rank_state, matches_per_rank, on_match)
+
+        if self.checkpoint:
+            self.checkpoint.mark_player(puuid)
+
+    async def _crawl_ordered(self, entries, rank, region, platform, rank_state, matches_per_rank, on_match):
+        # shards: tous les historiques du pool d'abord, puis réclamation dans l'ordre ladder/historique,
+        # les mêmes réponses API donnent toujours les mêmes matchs (reprise comprise), comptés dans le même ordre
+        puuids = await asyncio.gather(*(self.resolve_puuid(entry, platform) for entry in entries))
+        histories = await asyncio.gather(*(
+            self._call(self.match_api.get_match_history, puuid, region, count=MATCHES_PER_PLAYER)
+            for puuid in puuids if puuid
+        ))
+
+        candidates = [match_id for match_ids in histories for match_id in (match_ids or [])]
+        while candidates:
+            claimed = [
+                match_id for match_id in candidates
+                if self._claim_match(match_id, rank_state, matches_per_rank)
+            ]
+            if not claimed:
+                return
+            results = await asyncio.gather(*(self._fetch_match(match_id, region) for match_id in claimed))
+
+            # les échecs rendent leur place, le tour suivant réclame les candidats suivants (même ordre)
+            for match_id, (match_data, timeline) in zip(claimed, results):
+                self._record_match(match_id, rank, region, platform, match_data, timeline, on_match, rank_state)
+            candidates = [match_id for match_id in candidates if match_id not in claimed]
+
+    async def crawl_rank(self, rank, region, platform, matches_per_rank, on_match,
+                         players_per_rank=PLAYERS_PER_RANK):
+        # en shard, le pool grandit avec le nombre de shards: plus de shards = plus de joueurs couverts
+        if self.shard:
+            players_per_rank *= self.shard["count"]
+
+        entries = await self.get_ranked_entries(rank, platform, players_per_rank)
+        if not entries:
+            print(f"  [{rank}] No players found on {platform}, skipping...")
+            return 0
+
+        rank_state = {
+            "claimed": self.checkpoint.rank_count(rank, platform) if self.checkpoint else 0,
+            "pending": 0,
+            "fetched": asyncio.Event(),
+        }
+        if self.shard:
+            await self._crawl_ordered(entries, rank, region, platform, rank_state, matches_per_rank, on_match)
+        else:
+            await asyncio.gather(*(
+                self._crawl_entry(entry, rank, region, platform, rank_state, matches_per_rank, on_match)
+                for entry in entries
+            ))
+
+        print(f"  [{rank}] {platform}: {rank_state['claimed']} matches from {len(entries)} players")
+        return rank_state["claimed"]
+
+    async def crawl(self, targets, rank_tiers, matches_per_rank, on_match,
+                    players_per_rank=PLAYERS_PER_RANK):
+        # targets: liste de (region, platform), tous les rangs de toutes les régions en même temps
+        await asyncio.gather(*(
+            self.crawl_rank(rank, region, platform, matches_per_rank, on_match, players_per_rank)
+            for region, platform in targets
+            for rank in rank_tiers
+        ))
+        return self.matches_fetched
@@ -0,0 +1,129 @@
+import base64
+import hashlib
+import math
+
+# Dédoublonnage des match ids pour tout le crawl: les joueurs d'un même rang partagent beaucoup de
+# parties, un match ne doit être téléchargé et compté qu'une fois (ses 10 participants une seule fois)
+
+# au-delà de ce nombre de matchs attendus on passe du set exact au filtre de Bloom
+BLOOM_THRESHOLD = 100_000
+BLOOM_ERROR_RATE = 0.001
+
+
+class ExactMatchFilter:
+
+    def __init__(self, match_ids=()):
+        self.match_ids = set(match_ids)
+
+    def add(self, match_id):
+        self.match_ids.add(match_id)
+
+    def __contains__(self, match_id):
+        return match_id in self.match_ids
+
+    def __len__(self):
+        return len(self.match_ids)
+
+    def copy(self):
+        return ExactMatchFilter(self.match_ids)
+
+    def to_dict(self):
+        return {"type": "exact", "match_ids": sorted(self.match_ids)}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("match_ids", []))
+
+
+class BloomMatchFilter:
+    # pas de faux négatif: un match vu n'est jamais re-téléchargé; un faux positif (~error_rate)
+    # fait juste sauter un match jamais vu, la mémoire reste fixe quel que soit le nombre de régions
+
+    def __init__(self, capacity, error_rate=BLOOM_ERROR_RATE, bits=None, count=0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray(bits) if bits is not None else bytearray((self.size + 7) // 8)
+        self.count = count
+
+    def _positions(self, match_id):
+        # double hashing (Kirsch-Mitzenmacher) à partir d'un seul digest
+        digest = hashlib.blake2b(match_id.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, match_id):
+        added = False
+        for position in self._positions(match_id):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                added = True
+        if added:
+            self.count += 1
+
+    def __contains__(self, match_id):
+        for position in self._positions(match_id):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                return False
+        return True
+
+    def __len__(self):
+        return self.count
+
+    def copy(self):
+        return BloomMatchFilter(self.capacity, self.error_rate, self.bits, self.count)
+
+    def estimated_count(self):
+        # nombre d'ids estimé depuis les bits à 1 (Swamidass-Baldi), vaut aussi pour une union
+        set_bits = sum(bin(byte).count("1") for byte in self.bits)
+        if set_bits >= self.size:
+            return float(self.count)
+        return -self.size / self.hash_count * math.log(1 - set_bits / self.size)
+
+    def union(self, other):
+        if self.size != other.size or self.hash_count != other.hash_count:
+            raise ValueError("Bloom filters with different sizes cannot be combined")
+        bits = bytes(a | b for a, b in zip(self.bits, other.bits))
+        merged = BloomMatchFilter(self.capacity, self.error_rate, bits)
+        merged.count = int(round(merged.estimated_count()))
+        return merged
+
+    def estimate_overlap(self, other):
+        # |A ∩ B| ≈ |A| + |B| - |A ∪ B|, l'union étant le OU des bits
+        union = self.union(other)
+        overlap = self.estimated_count() + other.estimated_count() - union.estimated_count()
+        return max(0, int(round(overlap)))
+
+    def to_dict(self):
+        return {
+            "type": "bloom",
+            "capacity": self.capacity,
+            "error_rate": self.error_rate,
+            "count": self.count,
+            "bits": base64.b64encode(bytes(self.bits)).decode("ascii"),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["capacity"],
+            data.get("error_rate", BLOOM_ERROR_RATE),
+            base64.b64decode(data["bits"]),
+            data.get("count", 0),
+        )
+
+
+def create_match_filter(expected_matches=0, bloom_threshold=BLOOM_THRESHOLD):
+    if expected_matches > bloom_threshold:
+        return BloomMatchFilter(expected_matches)
+    return ExactMatchFilter()
+
+
+def load_match_filter(data):
+    if data.get("type") == "bloom":
+        return BloomMatchFilter.from_dict(data)
+    return ExactMatchFilter.from_dict(data)
@@ -0,0 +1,96 @@
+import numpy as np
+from .benchmark_loader import get_lookup_table, pool_benchmark
+from .quantile_sketch import grid_percentile_ranks
+
+# Placement vectorisé: toutes les stats d'un joueur (ou d'un lot de joueurs) d'un rôle/rang en un appel,
+# benchmark et grille de quantiles résolus une fois par stat, percentiles calculés en numpy
+
+# stats comparées à tout le rang, sans rôle (comme le KDA de Player.add_benchmarks)
+ROLE_AGNOSTIC_STATS = {"kda"}
+
+# stats de base où 0 veut dire "pas de donnée": l'ancien add_benchmarks les sautait (`if not value`),
+# alors que 0 compte pour les métriques timeline (aucune mort avant 10 min, écart nul)
+ZERO_IS_MISSING_STATS = {"cs_per_min", "cs_at_10", "vision_score", "kda"}
+
+# arrondi d'affichage de "player" / "difference", 2 décimales par défaut
+DISPLAY_DECIMALS = {
+    "cs_at_10": 1,
+    "vision_score": 1,
+}
+
+
+def resolve_placement(table, stat_names, role, rank_tier, champion_games=None):
+    # benchmark et grille (éventuellement décalée vers le pool de champions) de chaque stat
+    benchmarks = []
+    grids = []
+
+    for stat_type in stat_names:
+        stat_role = None if stat_type in ROLE_AGNOSTIC_STATS else role
+        if stat_role is None and stat_type not in ROLE_AGNOSTIC_STATS:
+            benchmarks.append(None)
+            grids.append(None)
+            continue
+
+        benchmark = table.get(stat_type, stat_role, rank_tier)
+        grid = table.get_quantile_grid(stat_type, stat_role, rank_tier)
+
+        if benchmark is not None and stat_role and champion_games and sum(champion_games.values()):
+            pool_value = pool_benchmark(table, stat_type, stat_role, rank_tier, champion_games)
+            if grid is not None:
+                grid = grid + (pool_value - benchmark)
+            benchmark = pool_value
+
+        benchmarks.append(benchmark)
+        grids.append(grid)
+
+    return benchmarks, grids
+
+
+def place_players(values, stat_names, role, rank, champion_games=None):
+    # values: tableau (joueurs x stats), NaN = stat absente; renvoie (benchmarks, percentiles)
+    # avec les mêmes règles que calculate_percentile, NaN quand la stat ne peut pas être placée
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    rank_tier = rank.split("_")[0] if rank else None
+    benchmarks, grids = resolve_placement(get_lookup_table(), stat_names, role, rank_tier, champion_games)
+
+    percentiles = np.full(values.shape, np.nan)
+    for i, (benchmark, grid) in enumerate(zip(benchmarks, grids)):
+        column = values[:, i]
+
+        if grid is not None:
+            percentiles[:, i] = np.clip(np.rint(grid_percentile_ranks(grid, column)), 1, 99)
+        elif benchmark:
+            deviation = (column - benchmark) / benchmark
+            percentiles[:, i] = np.clip(np.trunc(50 + deviation * 100), 1, 99)
+
+    return np.array([np.nan if b is None else b for b in benchmarks], dtype=float), percentiles
+
+
+def place_player(stats, role, rank, champion_games=None):
+    # stats: {stat: valeur joueur ou None} -> même format que aggregated_stats["benchmarks"]
+    stat_names = [
+        stat for stat, value in stats.items()
+        if value is not None and (value or stat not in ZERO_IS_MISSING_STATS)
+    ]
+    if not stat_names:
+        return {}
+
+    benchmarks, percentiles = place_players(
+        [[stats[stat] for stat in stat_names]], stat_names, role, rank, champion_games
+    )
+
+    placement = {}
+    for i, stat_type in enumerate(stat_names):
+        if np.isnan(benchmarks[i]):
+            continue
+
+        decimals = DISPLAY_DECIMALS.get(stat_type, 2)
+        benchmark = float(benchmarks[i])
+        placement[stat_type] = {
+            "player": round(stats[stat_type], decimals),
+            "benchmark": benchmark,
+            "percentile": None if np.isnan(percentiles[0, i]) else int(percentiles[0, i]),
+            "difference": round(stats[stat_type] - benchmark, decimals),
+        }
+
+    return placement
@@ -0,0 +1,212 @@
+import math
+from bisect import bisect_left, bisect_right
+import numpy as np
+
+# t-digest (variante "merging"): distribution résumée en centroïdes (moyenne, poids),
+# taille bornée par la compression, fusionnable entre crawls / shards
+
+DEFAULT_COMPRESSION = 100
+BUFFER_FACTOR = 5
+
+# grille de quantiles (0%, 1%, ..., 100%) utilisée par le store colonne et le placement vectorisé
+QUANTILE_LEVELS = np.linspace(0.0, 1.0, 101)
+
+
+class TDigest:
+
+    def __init__(self, compression=DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = []
+        self.weights = []
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer = []
+        self._grid = None
+
+    def add(self, value, weight=1):
+        value = float(value)
+        self._grid = None
+        self._buffer.append((value, weight))
+        self.count += weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+        if len(self._buffer) >= self.compression * BUFFER_FACTOR:
+            self.compress()
+
+    def merge(self, other):
+        if not other.count:
+            return self
+
+        other.compress()
+        self._grid = None
+        self._buffer.extend(zip(other.means, other.weights))
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.compress()
+        return self
+
+    def _k(self, q):
+        # fonction d'échelle k1: petits centroïdes aux queues, gros au milieu
+        return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+    def compress(self):
+        if not self._buffer:
+            return
+
+        points = sorted(list(zip(self.means, self.weights)) + self._buffer)
+        self._buffer = []
+
+        total = sum(weight for _, weight in points)
+        means = []
+        weights = []
+
+        cur_mean, cur_weight = points[0]
+        weight_so_far = 0
+        k_lower = self._k(0)
+
+        for mean, weight in points[1:]:
+            q_upper = (weight_so_far + cur_weight + weight) / total
+            if self._k(q_upper) - k_lower <= 1:
+                cur_weight += weight
+                cur_mean += (mean - cur_mean) * weight / cur_weight
+            else:
+                means.append(cur_mean)
+                weights.append(cur_weight)
+                weight_so_far += cur_weight
+                k_lower = self._k(weight_so_far / total)
+                cur_mean, cur_weight = mean, weight
+
+        means.append(cur_mean)
+        weights.append(cur_weight)
+
+        self.means = means
+        self.weights = weights
+
+    def _cdf_points(self):
+        # points (valeur, poids cumulé) reliés linéairement: min, centres des centroïdes, max
+        self.compress()
+        xs = [self.min]
+        ys = [0.0]
+        cumulative = 0
+
+        for mean, weight in zip(self.means, self.weights):
+            xs.append(mean)
+            ys.append(cumulative + weight / 2)
+            cumulative += weight
+
+        xs.append(self.max)
+        ys.append(float(cumulative))
+        return xs, ys
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+
+        q = min(max(q, 0.0), 1.0)
+        xs, ys = self._cdf_points()
+        target = q * self.count
+
+        i = bisect_left(ys, target)
+        if i == 0:
+            return xs[0]
+        if i >= len(ys):
+            return xs[-1]
+
+        span = ys[i] - ys[i - 1]
+        if span <= 0:
+            return xs[i]
+        return xs[i - 1] + (xs[i] - xs[i - 1]) * (target - ys[i - 1]) / span
+
+    def cdf(self, value):
+        if not self.count:
+            return None
+        if value < self.min:
+            return 0.0
+        if value > self.max:
+            return 1.0
+
+        xs, ys = self._cdf_points()
+        lo = bisect_left(xs, value)
+        hi = bisect_right(xs, value)
+
+        if lo < hi:
+            # valeur pile sur un ou plusieurs points: milieu de la marche
+            return (ys[lo] + ys[hi - 1]) / 2 / self.count
+
+        span = xs[lo] - xs[lo - 1]
+        weight = ys[lo - 1] + (ys[lo] - ys[lo - 1]) * (value - xs[lo - 1]) / span
+        return weight / self.count
+
+    def percentile_rank(self, value):
+        cdf = self.cdf(value)
+        return None if cdf is None else cdf * 100
+
+    def quantile_grid(self):
+        # grille QUANTILE_LEVELS calculée une fois tant que le sketch ne change pas
+        if self._grid is None:
+            self._grid = sketch_to_grid(self)
+        return self._grid
+
+    def to_dict(self):
+        self.compress()
+        return {
+            "compression": self.compression,
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "centroids": [[m, w] for m, w in zip(self.means, self.weights)],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        digest = cls(data.get("compression", DEFAULT_COMPRESSION))
+        centroids = data.get("centroids", [])
+        digest.means = [m for m, _ in centroids]
+        digest.weights = [w for _, w in centroids]
+        digest.count = data.get("count", sum(digest.weights))
+        if centroids:
+            digest.min = data.get("min", digest.means[0])
+            digest.max = data.get("max", digest.means[-1])
+        return digest
+
+
+class ShiftedSketch:
+    # distribution du rôle décalée de l'écart d'un champion (ou d'un pool de champions),
+    # même interface que TDigest pour calculate_percentile sans stocker un sketch par champion
+
+    def __init__(self, sketch, offset):
+        self.sketch = sketch
+        self.offset = offset
+        self.count = sketch.count
+
+    def quantile(self, q):
+        value = self.sketch.quantile(q)
+        return None if value is None else value + self.offset
+
+    def percentile_rank(self, value):
+        return self.sketch.percentile_rank(value - self.offset)
+
+    def quantile_grid(self):
+        return self.sketch.quantile_grid() + self.offset
+
+
+def sketch_to_grid(sketch):
+    return np.array([sketch.quantile(q) for q in QUANTILE_LEVELS])
+
+
+def grid_percentile_ranks(grid, values):
+    # percentile de plusieurs valeurs d'un coup sur une grille de quantiles (NaN -> NaN),
+    # mêmes règles que TDigest.cdf: 0/100 hors bornes, milieu de la marche sur une valeur répétée
+    values = np.asarray(values, dtype=float)
+    lo = np.searchsorted(grid, values, side="left")
+    hi = np.searchsorted(grid, values, side="right")
+
+    last = len(QUANTILE_LEVELS) - 1
+    step = (QUANTILE_LEVELS[np.minimum(lo, last)] + QUANTILE_LEVELS[np.clip(hi - 1, 0, last)]) / 2
+    ranks = np.where(lo < hi, step, np.interp(values, grid, QUANTILE_LEVELS)) * 100
+
+    ranks = np.where(values < grid[0], 0.0, ranks)
+    return np.where(values > grid[-1], 100.0, ranks)
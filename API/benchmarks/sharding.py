@@ -0,0 +1,200 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+from .checkpoint import (
+    deserialize_raw_data,
+    merge_raw_data,
+    merge_champion_data,
+    calculate_averages,
+    calculate_distributions,
+    calculate_champion_benchmarks,
+)
+from .match_filter import BloomMatchFilter, load_match_filter
+from .benchmark_builder import BenchmarkBuilder, RANK_TIERS
+from .columnar_store import write_columnar_store
+from ..Core import Core
+from ..utils.region_helper import get_region_from_platform
+
+# Crawl découpé en shards (plateforme x rang x part des matchs) lancés par des process/machines
+# indépendants (une clé API chacun), chacun écrit un fichier partiel d'accumulateurs fusionnables,
+# merge_partials les combine dans un benchmark_cache identique octet pour octet quel que soit l'ordre
+
+
+def shard_id(platform, rank, index, count):
+    return f"{platform}-{rank.lower()}-{index}of{count}"
+
+
+def plan_shards(platforms, rank_tiers=RANK_TIERS, shard_count=1):
+    shards = []
+    for platform in platforms:
+        region = get_region_from_platform(platform)
+        if not region:
+            raise ValueError(f"Unknown platform: {platform}")
+
+        for rank in rank_tiers:
+            for index in range(shard_count):
+                shards.append({
+                    "id": shard_id(platform, rank, index, shard_count),
+                    "region": region,
+                    "platform": platform,
+                    "rank": rank,
+                    "index": index,
+                    "count": shard_count,
+                })
+    return shards
+
+
+def load_partial(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def count_overlap(match_filter, seen_ids, seen_bloom):
+    # matchs du partiel déjà vus: test exact quand un des deux côtés a ses ids, estimation
+    # par les bits quand les deux sont des filtres de Bloom
+    if not isinstance(match_filter, BloomMatchFilter):
+        return sum(
+            1 for match_id in match_filter.match_ids
+            if match_id in seen_ids or (seen_bloom is not None and match_id in seen_bloom)
+        )
+
+    overlapping = sum(1 for match_id in seen_ids if match_id in match_filter)
+    if seen_bloom is not None:
+        overlapping += match_filter.estimate_overlap(seen_bloom)
+        # ids exacts déjà comptés qui sont aussi dans l'union Bloom
+        overlapping -= sum(1 for match_id in seen_ids if match_id in match_filter and match_id in seen_bloom)
+    return max(0, overlapping)
+
+
+def merge_partials(partials):
+    # ordre fixe (id de shard) pour les sommes flottantes et la fusion des sketches: résultat déterministe
+    partials = sorted(partials, key=lambda partial: partial["shard"]["id"])
+
+    shard_ids = [partial["shard"]["id"] for partial in partials]
+    duplicates = sorted({sid for sid in shard_ids if shard_ids.count(sid) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate shard partials: {', '.join(duplicates)}")
+
+    configs = {
+        json.dumps({k: v for k, v in partial["config"].items() if k != "shard"}, sort_keys=True)
+        for partial in partials
+    }
+    if len(configs) > 1:
+        raise ValueError("Shard partials were crawled with different settings")
+
+    raw_data = {}
+    champion_data = {}
+    seen_ids = set()
+    seen_bloom = None
+    overlapping = 0
+    matches_analyzed = 0
+
+    for partial in partials:
+        merge_raw_data(raw_data, deserialize_raw_data(partial["raw_data"]))
+        merge_champion_data(champion_data, partial.get("champion_data", {}))
+        matches_analyzed += partial["matches_analyzed"]
+
+        match_filter = load_match_filter(partial.get("match_ids", {}))
+        overlapping += count_overlap(match_filter, seen_ids, seen_bloom)
+
+        if isinstance(match_filter, BloomMatchFilter):
+            seen_bloom = match_filter if seen_bloom is None else seen_bloom.union(match_filter)
+        else:
+            seen_ids |= match_filter.match_ids
+
+    if overlapping:
+        # impossible entre shards d'un même rang, possible entre deux rangs d'une même partie
+        approximate = "about " if seen_bloom is not None else ""
+        print(f"[Shards] {approximate}{overlapping} matches were crawled by more than one rank shard")
+
+    targets = sorted({(p["shard"]["region"], p["shard"]["platform"]) for p in partials})
+    region, platform = targets[0] if targets else (None, None)
+
+    return {
+        # date du dernier shard et non du merge: relancer le merge redonne le même fichier
+        "generated_at": max((p["crawled_at"] for p in partials), default=None),
+        "region": region,
+        "platform": platform,
+        "targets": [list(target) for target in targets],
+        "shards": [partial["shard"]["id"] for partial in partials],
+        "matches_analyzed": matches_analyzed,
+        "benchmarks": calculate_averages(raw_data),
+        "distributions": calculate_distributions(raw_data),
+        "champion_benchmarks": calculate_champion_benchmarks(champion_data),
+    }
+
+
+def write_merged_cache(paths, output_file, columnar_dir=None):
+    cache_data = merge_partials([load_partial(path) for path in paths])
+
+    tmp_file = f"{output_file}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(cache_data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_file, output_file)
+
+    if columnar_dir:
+        write_columnar_store(cache_data, columnar_dir)
+
+    print(f"[Shards] Merged {len(cache_data['shards'])} shards ({cache_data['matches_analyzed']} matches) into {output_file}")
+    return cache_data
+
+
+async def crawl_shard(shard, matches_per_rank, output_dir, concurrency, timeline_sample_rate):
+    os.makedirs(output_dir, exist_ok=True)
+    output_file = os.path.join(output_dir, f"{shard['id']}.partial.json")
+
+    async with Core() as core:
+        builder = BenchmarkBuilder(core=core, concurrency=concurrency)
+        return await builder.build_shard(
+            shard, matches_per_rank, output_file, timeline_sample_rate=timeline_sample_rate
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m API.benchmarks.sharding")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    plan = commands.add_parser("plan", help="list shard ids")
+    plan.add_argument("--platforms", nargs="+", default=["euw1"])
+    plan.add_argument("--shards", type=int, default=1, help="match shards per platform x rank")
+
+    crawl = commands.add_parser("crawl", help="crawl one shard into a partial file")
+    crawl.add_argument("shard_id")
+    crawl.add_argument("--platforms", nargs="+", default=["euw1"])
+    crawl.add_argument("--shards", type=int, default=1)
+    crawl.add_argument("--matches-per-rank", type=int, default=100)
+    crawl.add_argument("--output-dir", default="benchmark_partials")
+    crawl.add_argument("--concurrency", type=int, default=8)
+    crawl.add_argument("--timeline-sample-rate", type=float, default=0.0)
+
+    merge = commands.add_parser("merge", help="merge partial files into a benchmark cache")
+    merge.add_argument("partials", nargs="+")
+    merge.add_argument("--output", required=True)
+    merge.add_argument("--columnar-dir")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "plan":
+        for shard in plan_shards(args.platforms, shard_count=args.shards):
+            print(shard["id"])
+        return 0
+
+    if args.command == "crawl":
+        shards = {shard["id"]: shard for shard in plan_shards(args.platforms, shard_count=args.shards)}
+        if args.shard_id not in shards:
+            print(f"Unknown shard {args.shard_id}, run the plan command to list them")
+            return 1
+        asyncio.run(crawl_shard(
+            shards[args.shard_id], args.matches_per_rank, args.output_dir,
+            args.concurrency, args.timeline_sample_rate
+        ))
+        return 0
+
+    write_merged_cache(args.partials, args.output, args.columnar_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
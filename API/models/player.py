@@ -5,15 +5,18 @@ from ..league.rank import Rank
 from ..league.match import Match
 from ..league.mastery import ChampionMastery
 from ..analytics.stats_extractor import extract_match_stats, extract_timeline_stats
+from ..analytics.match_fields import compile_match_stats_extractor
+from ..analytics.participant_index import ParticipantIndex
 from ..analytics.stats_aggregator import aggregate_stats, get_role_specific_stats
-from ..benchmarks.benchmark_loader import get_benchmark, calculate_percentile
+from ..benchmarks.placement import place_player
 from ..utils.region_helper import get_region_config, get_region_from_platform
 import json
 
 
 class Player:
 
-    def __init__(self, game_name, tag_line, platform=None, region=None):
+    def __init__(self, game_name, tag_line, platform=None, region=None, stats_fields=None,
+                 movement_step_seconds=None):
         self.game_name = game_name
         self.tag_line = tag_line
 
@@ -45,7 +48,18 @@ class Player:
         self.champion_mastery = None
         self.aggregated_stats = {}
 
+        # stats_fields: ne garder que ces champs (carte, etc.), process_matches refuse alors de tourner
+        self.stats_fields = stats_fields
+        self._extract_stats = (
+            compile_match_stats_extractor(stats_fields) if stats_fields else extract_match_stats
+        )
+
+        # movement_step_seconds: présence/roams sur une trajectoire interpolée (trajectory.py),
+        # None = un point par minute comme les stats déjà stockées
+        self.movement_step_seconds = movement_step_seconds
+
         self._match_details_cache = {}
+        self._match_index_cache = {}
 
     async def __aenter__(self):
         await self._core.__aenter__()
@@ -87,13 +101,20 @@ class Player:
         return self._match_details_cache.get(match_id)
 
 
+    def _get_match_index(self, match_id, match_data):
+        if match_id not in self._match_index_cache:
+            self._match_index_cache[match_id] = ParticipantIndex(match_data)
+        return self._match_index_cache[match_id]
+
+
     async def _process_match_ids(self, match_ids):
         print(f"Fetching match details and extracting player data...")
 
         for i, match_id in enumerate(match_ids):
             match_data = await self._get_match_details_cached(match_id)
             if match_data:
-                player_stats = extract_match_stats(match_data, self.puuid)
+                index = self._get_match_index(match_id, match_data)
+                player_stats = self._extract_stats(match_data, self.puuid, index)
                 if player_stats:
                     self.processed_stats.append(player_stats)
 
@@ -149,7 +170,9 @@ class Player:
                         match_data,
                         timeline,
                         self.puuid,
-                        role=stat_entry.get("role")
+                        role=stat_entry.get("role"),
+                        index=self._get_match_index(match_id, match_data),
+                        movement_step_seconds=self.movement_step_seconds
                     )
                     if timeline_stats:
                         stat_entry.update(timeline_stats)
@@ -162,6 +185,12 @@ class Player:
 
 
     def process_matches(self):
+        if self.stats_fields:
+            raise ValueError(
+                "process_matches needs the full match stats, this Player only extracts "
+                f"{sorted(self.stats_fields)} (create it without stats_fields)"
+            )
+
         if not self.processed_stats:
             print("No processed stats. Call load_recent_matches() first.")
             return None
@@ -198,72 +227,39 @@ class Player:
 
         rank_tier = rank.split("_")[0]
 
-        benchmarks = {}
+        # pool de champions joués sur le rôle principal: un main Yuumi n'est pas comparé aux CS d'un Pyke
+        champion_games = {}
+        for stats in self.processed_stats:
+            if stats.get("role") == primary_role and stats.get("champion_name"):
+                champion = stats["champion_name"]
+                champion_games[champion] = champion_games.get(champion, 0) + 1
 
         farming = self.aggregated_stats.get("farming", {})
         early_game = self.aggregated_stats.get("early_game", {})
         vision = self.aggregated_stats.get("vision", {})
         overall = self.aggregated_stats.get("overall_performance", {})
+        laning = self.aggregated_stats.get("laning_phase", {})
+        wave_management = laning.get("wave_management", {})
+        trading = laning.get("trading", {})
+        death_analysis = self.aggregated_stats.get("death_analysis", {})
+
+        # toutes les stats placées d'un coup (place_player), les métriques timeline seulement
+        # si le cache contient leurs benchmarks
+        player_values = {
+            "cs_per_min": farming.get("avg_cs_per_min"),
+            "cs_at_10": early_game.get("avg_cs_at_10"),
+            "vision_score": vision.get("avg_vision_score"),
+            "kda": overall.get("avg_kda"),
+            "cs_at_15": early_game.get("avg_cs_at_15"),
+            "gold_diff_at_15": early_game.get("avg_gold_diff_at_15"),
+            "early_deaths": death_analysis.get("avg_deaths_before_10"),
+            "lane_pressure_score": wave_management.get("avg_lane_pressure_score"),
+            "cs_differential": wave_management.get("avg_cs_differential"),
+            "trade_efficiency": trading.get("avg_trade_efficiency"),
+            "damage_differential": trading.get("avg_damage_differential"),
+        }
 
-        player_cs_per_min = farming.get("avg_cs_per_min")
-        if player_cs_per_min and primary_role:
-            cs_benchmark = get_benchmark("cs_per_min", primary_role, rank_tier)
-            if cs_benchmark:
-                benchmarks["cs_per_min"] = {
-                    "player": round(player_cs_per_min, 2),
-                    "benchmark": cs_benchmark,
-                    "percentile": calculate_percentile(
-                        player_cs_per_min,
-                        cs_benchmark
-                    ),
-                    "difference": round(player_cs_per_min - cs_benchmark, 2),
-                }
-
-        player_cs_at_10 = early_game.get("avg_cs_at_10")
-        if player_cs_at_10 and primary_role:
-            cs10_benchmark = get_benchmark("cs_at_10", primary_role, rank_tier)
-            if cs10_benchmark:
-                benchmarks["cs_at_10"] = {
-                    "player": round(player_cs_at_10, 1),
-                    "benchmark": cs10_benchmark,
-                    "percentile": calculate_percentile(
-                        player_cs_at_10,
-                        cs10_benchmark
-                    ),
-                    "difference": round(player_cs_at_10 - cs10_benchmark, 1),
-                }
-
-        player_vision = vision.get("avg_vision_score")
-        if player_vision and primary_role:
-            vision_benchmark = get_benchmark(
-                "vision_score",
-                primary_role,
-                rank_tier
-            )
-            if vision_benchmark:
-                benchmarks["vision_score"] = {
-                    "player": round(player_vision, 1),
-                    "benchmark": vision_benchmark,
-                    "percentile": calculate_percentile(
-                        player_vision,
-                        vision_benchmark
-                    ),
-                    "difference": round(player_vision - vision_benchmark, 1),
-                }
-
-        player_kda = overall.get("avg_kda")
-        if player_kda:
-            kda_benchmark = get_benchmark("kda", None, rank_tier)
-            if kda_benchmark:
-                benchmarks["kda"] = {
-                    "player": round(player_kda, 2),
-                    "benchmark": kda_benchmark,
-                    "percentile": calculate_percentile(
-                        player_kda,
-                        kda_benchmark
-                    ),
-                    "difference": round(player_kda - kda_benchmark, 2),
-                }
+        benchmarks = place_player(player_values, primary_role, rank_tier, champion_games)
 
         self.aggregated_stats["benchmarks"] = benchmarks
         print(f"Benchmarks added for {primary_role} @ {rank_tier}")
@@ -1,13 +1,40 @@
 import os
 import time
+import json
+import threading
+import boto3
+from botocore.config import Config
 from dotenv import load_dotenv
 from langchain_aws import ChatBedrock
 from langchain_core.messages import SystemMessage, HumanMessage
+from .concurrency import get_bedrock_budget, estimate_tokens, DEFAULT_MAX_IN_FLIGHT
+from .prompt_builder import build_batch_prompt
 
 load_dotenv()
 
 USE_MOCK = os.getenv('USE_MOCK_AI', 'false').lower() == 'true'
 
+# Expected completion size of a 2-3 sentence zone story (token budget estimate)
+STORY_OUTPUT_TOKENS = 200
+
+DEFAULT_MODEL_ID = "eu.anthropic.claude-sonnet-4-5-20250929-v1:0"
+DEFAULT_MODEL_KWARGS = {
+    "temperature": 0.7,
+    "max_tokens": 4092
+}
+
+# HTTP connections kept per region (story threads + chat requests share them)
+BEDROCK_POOL_CONNECTIONS = max(10, DEFAULT_MAX_IN_FLIGHT * 2)
+
+# Error fragments Bedrock / botocore use for throttling
+RATE_LIMIT_KEYWORDS = [
+    "too many requests",
+    "too many connections",
+    "throttlingexception",
+    "throttling",
+    "rate limit"
+]
+
 if USE_MOCK:
     from testing.mocks.mock_ai import generate_mock_story
 
@@ -38,22 +65,124 @@ OUTPUT FORMAT:
 - End with actionable advice (what they should actually DO to improve)"""
 
 
-def create_bedrock_client():
+# Batched mode: same rules, several zones per request, JSON output keyed by zone_id
+BATCH_STORY_SYSTEM_PROMPT = STORY_SYSTEM_PROMPT + """
+
+BATCH MODE:
+- The request contains several zones, each under a [zone_id] header
+- Apply the output format above to EACH zone separately
+- Respond ONLY with valid JSON: {"zone_id": "story", ...}
+- Use exactly the zone ids given, one string per zone, no other keys"""
+
+
+_runtime_clients = {}
+_chat_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_bedrock_region():
+    return os.getenv('AWS_DEFAULT_REGION', 'eu-west-3')
+
+
+def get_runtime_client(region_name=None):
+    """
+    Shared boto3 bedrock-runtime client for a region (thread-safe, pooled connections).
+
+    Credentials are resolved once here instead of for every chat instance.
+    """
+    region_name = region_name or get_bedrock_region()
+
+    with _clients_lock:
+        client = _runtime_clients.get(region_name)
+        if client is None:
+            client = boto3.client(
+                "bedrock-runtime",
+                region_name=region_name,
+                config=Config(max_pool_connections=BEDROCK_POOL_CONNECTIONS)
+            )
+            _runtime_clients[region_name] = client
+        return client
+
+
+def get_story_model_id():
+    """
+    Model id stories are generated with ('mock' in mock mode), part of the story cache key.
+    """
+    return "mock" if USE_MOCK else DEFAULT_MODEL_ID
+
+
+def create_bedrock_client(model_id=DEFAULT_MODEL_ID, region_name=None, model_kwargs=None):
     """
-    Create Bedrock client for story generation.
+    Create a new Bedrock chat client on top of the shared runtime client.
+
+    Prefer get_bedrock_client(), which reuses instances across calls.
     """
+    region_name = region_name or get_bedrock_region()
+
     chat = ChatBedrock(
-        model_id="eu.anthropic.claude-sonnet-4-5-20250929-v1:0",
-        region_name=os.getenv('AWS_DEFAULT_REGION', 'eu-west-3'),
-        model_kwargs={
-            "temperature": 0.7,
-            "max_tokens": 4092
-        }
+        model_id=model_id,
+        region_name=region_name,
+        client=get_runtime_client(region_name),
+        model_kwargs=dict(DEFAULT_MODEL_KWARGS if model_kwargs is None else model_kwargs)
     )
     return chat
 
 
-def invoke_with_retry(chat, messages, context=""):
+def get_bedrock_client(model_id=DEFAULT_MODEL_ID, region_name=None, **model_kwargs):
+    """
+    Process-wide Bedrock chat client, one per model id / region / parameters.
+
+    Args:
+        model_id: Bedrock model id
+        region_name: AWS region (defaults to AWS_DEFAULT_REGION)
+        **model_kwargs: Model parameters (defaults to DEFAULT_MODEL_KWARGS)
+
+    Returns:
+        Shared ChatBedrock instance (safe to use from several threads)
+    """
+    region_name = region_name or get_bedrock_region()
+    model_kwargs = model_kwargs or DEFAULT_MODEL_KWARGS
+    key = (model_id, region_name, tuple(sorted(model_kwargs.items())))
+
+    chat = _chat_clients.get(key)
+    if chat is not None:
+        return chat
+
+    # Built outside the lock (get_runtime_client takes it), first instance stored wins
+    chat = create_bedrock_client(model_id, region_name, model_kwargs)
+    with _clients_lock:
+        return _chat_clients.setdefault(key, chat)
+
+
+def warm_up_bedrock_clients():
+    """
+    Build the default clients at startup so the first story does not pay for
+    boto3 client creation and credential resolution.
+    """
+    if USE_MOCK:
+        return
+
+    try:
+        get_bedrock_client()
+        print(f"Bedrock client ready ({DEFAULT_MODEL_ID}, {get_bedrock_region()})")
+    except Exception as e:
+        print(f"WARNING: Bedrock client warm-up failed: {e}")
+
+
+def is_rate_limit_error(error):
+    error_str = str(error).lower()
+    return any(keyword in error_str for keyword in RATE_LIMIT_KEYWORDS)
+
+
+def _invoke(chat, messages, budget, tokens):
+    if budget is None:
+        return chat.invoke(messages)
+
+    with budget.slot(tokens):
+        return chat.invoke(messages)
+
+
+def invoke_with_retry(chat, messages, context="", budget=None, tokens=0):
     """
     Shared retry wrapper for Bedrock API calls with exponential backoff.
 
@@ -61,6 +190,8 @@ def invoke_with_retry(chat, messages, context=""):
         chat: Bedrock chat client
         messages: List of messages to send
         context: Description of what's being generated (for error messages)
+        budget: Optional BedrockBudget; each attempt takes a slot and reports throttling to it
+        tokens: Estimated tokens per attempt, charged to the budget
 
     Returns:
         Response content string
@@ -71,20 +202,19 @@ def invoke_with_retry(chat, messages, context=""):
     max_retries = 5
     for attempt in range(max_retries):
         try:
-            response = chat.invoke(messages)
+            response = _invoke(chat, messages, budget, tokens)
+            if budget is not None:
+                budget.on_success()
             return response.content.strip()
 
         except Exception as retry_error:
             error_str = str(retry_error)
 
             # Check for rate limiting errors
-            is_rate_limit = any(keyword in error_str.lower() for keyword in [
-                "too many requests",
-                "too many connections",
-                "throttlingexception",
-                "throttling",
-                "rate limit"
-            ])
+            is_rate_limit = is_rate_limit_error(retry_error)
+
+            if is_rate_limit and budget is not None:
+                budget.on_throttle()
 
             if is_rate_limit and attempt < max_retries - 1:
                 wait_time = (2 ** attempt) * 2
@@ -107,6 +237,111 @@ def invoke_with_retry(chat, messages, context=""):
     raise Exception("RATE_LIMIT_ERROR: Too many requests to AI service. Please wait a moment and try again.")
 
 
+def chunk_text(chunk):
+    """
+    Text carried by a streamed message chunk (str content or a list of content blocks).
+    """
+    content = getattr(chunk, 'content', chunk)
+    if isinstance(content, str):
+        return content
+
+    parts = []
+    for block in content or []:
+        if isinstance(block, str):
+            parts.append(block)
+        elif isinstance(block, dict) and block.get('type') == 'text':
+            parts.append(block.get('text', ''))
+    return ''.join(parts)
+
+
+def _stream(chat, messages, budget, tokens):
+    if budget is None:
+        yield from chat.stream(messages)
+        return
+
+    # The slot is held until the stream ends (or the consumer stops reading)
+    with budget.slot(tokens):
+        yield from chat.stream(messages)
+
+
+def stream_with_retry(chat, messages, context="", budget=None, tokens=0):
+    """
+    Streaming counterpart of invoke_with_retry.
+
+    Rate limits are retried with the same backoff as long as nothing has been
+    yielded yet; once chunks went out, errors are raised to the caller.
+
+    Args:
+        chat: Bedrock chat client
+        messages: List of messages to send
+        context: Description of what's being generated (for error messages)
+        budget: Optional BedrockBudget; the stream holds one slot while it runs
+        tokens: Estimated tokens per attempt, charged to the budget
+
+    Yields:
+        Message chunks as Bedrock produces them
+
+    Raises:
+        Exception: RATE_LIMIT_ERROR if rate limited after all retries
+    """
+    max_retries = 5
+    for attempt in range(max_retries):
+        started = False
+        try:
+            for chunk in _stream(chat, messages, budget, tokens):
+                started = True
+                yield chunk
+            if budget is not None:
+                budget.on_success()
+            return
+
+        except Exception as retry_error:
+            is_rate_limit = is_rate_limit_error(retry_error)
+
+            if is_rate_limit and budget is not None:
+                budget.on_throttle()
+
+            if started or not is_rate_limit:
+                print(f"ERROR: AI streaming failed for {context}: {retry_error}")
+                if is_rate_limit:
+                    raise Exception("RATE_LIMIT_ERROR: Too many requests to AI service. Please wait a moment and try again.")
+                raise
+
+            if attempt < max_retries - 1:
+                wait_time = (2 ** attempt) * 2
+                print(f"Rate limited. Waiting {wait_time}s before retry (attempt {attempt + 1}/{max_retries})...")
+                time.sleep(wait_time)
+
+    print(f"ERROR: AI streaming failed after {max_retries} retries for {context}")
+    raise Exception("RATE_LIMIT_ERROR: Too many requests to AI service. Please wait a moment and try again.")
+
+
+def stream_story(prompt, zone_id=None, mode='coach'):
+    """
+    Generate a zone story using Bedrock AI, yielding text as it is produced.
+    """
+    if USE_MOCK:
+        print(f"[MOCK MODE] Using mock AI responses in {mode.upper()} mode")
+        yield generate_mock_story(zone_id or "default", mode=mode)
+        return
+
+    messages = [
+        SystemMessage(content=STORY_SYSTEM_PROMPT),
+        HumanMessage(content=prompt)
+    ]
+
+    for chunk in stream_with_retry(
+        get_bedrock_client(),
+        messages,
+        context=f"zone {zone_id}",
+        budget=get_bedrock_budget(),
+        tokens=estimate_tokens(STORY_SYSTEM_PROMPT + prompt, STORY_OUTPUT_TOKENS)
+    ):
+        text = chunk_text(chunk)
+        if text:
+            yield text
+
+
 def generate_story(prompt, zone_id=None, mode='coach'):
     """
     Generate zone story using Bedrock AI.
@@ -115,11 +350,91 @@ def generate_story(prompt, zone_id=None, mode='coach'):
         print(f"[MOCK MODE] Using mock AI responses in {mode.upper()} mode")
         return generate_mock_story(zone_id or "default", mode=mode)
 
-    chat = create_bedrock_client()
+    chat = get_bedrock_client()
 
     messages = [
         SystemMessage(content=STORY_SYSTEM_PROMPT),
         HumanMessage(content=prompt)
     ]
 
-    return invoke_with_retry(chat, messages, context=f"zone {zone_id}")
+    return invoke_with_retry(
+        chat,
+        messages,
+        context=f"zone {zone_id}",
+        budget=get_bedrock_budget(),
+        tokens=estimate_tokens(STORY_SYSTEM_PROMPT + prompt, STORY_OUTPUT_TOKENS)
+    )
+
+
+def parse_batch_stories(result_text, zone_ids):
+    """
+    Parse and validate a batched story response.
+
+    Args:
+        result_text: Raw model output (JSON, optionally inside a markdown code block)
+        zone_ids: Zone ids that were requested
+
+    Returns:
+        Dictionary of zone_id -> story for every valid section (may be partial),
+        or None if the response is not a JSON object
+    """
+    if not result_text:
+        return None
+
+    if '```json' in result_text:
+        result_text = result_text.split('```json')[1].split('```')[0].strip()
+    elif '```' in result_text:
+        result_text = result_text.split('```')[1].split('```')[0].strip()
+
+    try:
+        result = json.loads(result_text)
+    except json.JSONDecodeError as e:
+        print(f"Batch story JSON parsing error: {e}")
+        return None
+
+    if not isinstance(result, dict):
+        print(f"Invalid batch story format: {type(result).__name__}")
+        return None
+
+    stories = {}
+    for zone_id in zone_ids:
+        story = result.get(zone_id)
+        if isinstance(story, str) and story.strip():
+            stories[zone_id] = story.strip()
+
+    return stories
+
+
+def generate_stories_batch(prompts, mode='coach'):
+    """
+    Generate stories for several zones in a single Bedrock call.
+
+    Args:
+        prompts: Dictionary of zone_id -> zone prompt
+        mode: 'coach' for helpful advice or 'roast' for savage humor
+
+    Returns:
+        Dictionary of zone_id -> story (zones missing or invalid in the response are left out),
+        or None if the whole response could not be parsed
+    """
+    if USE_MOCK:
+        print(f"[MOCK MODE] Using mock AI responses in {mode.upper()} mode")
+        return {zone_id: generate_mock_story(zone_id, mode=mode) for zone_id in prompts}
+
+    prompt = build_batch_prompt(prompts, mode)
+    chat = get_bedrock_client()
+
+    messages = [
+        SystemMessage(content=BATCH_STORY_SYSTEM_PROMPT),
+        HumanMessage(content=prompt)
+    ]
+
+    result_text = invoke_with_retry(
+        chat,
+        messages,
+        context=f"zones {', '.join(prompts)}",
+        budget=get_bedrock_budget(),
+        tokens=estimate_tokens(BATCH_STORY_SYSTEM_PROMPT + prompt, STORY_OUTPUT_TOKENS * len(prompts))
+    )
+
+    return parse_batch_stories(result_text, list(prompts))
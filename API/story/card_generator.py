@@ -2,7 +2,7 @@
 Generate personalized titles and stories for player cards using AI.
 """
 
-from .bedrock_client import create_bedrock_client, invoke_with_retry
+from .bedrock_client import get_bedrock_client, invoke_with_retry
 from langchain_core.messages import SystemMessage, HumanMessage
 import os
 import json
@@ -99,7 +99,7 @@ Generate a title and story that captures this player's essence. The title should
 Remember to respond ONLY with valid JSON in the format specified in the system prompt."""
 
     try:
-        chat = create_bedrock_client()
+        chat = get_bedrock_client()
 
         messages = [
             SystemMessage(content=CARD_SYSTEM_PROMPT),
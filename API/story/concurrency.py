@@ -0,0 +1,138 @@
+"""
+Shared concurrency budget for Bedrock calls.
+
+Limits how many requests are in flight and how many tokens per minute are spent,
+and adapts the in-flight limit to throttling (halved on throttle, +1 after a run of successes).
+"""
+
+import os
+import threading
+import time
+
+DEFAULT_MAX_IN_FLIGHT = int(os.getenv('BEDROCK_MAX_IN_FLIGHT', '4'))
+DEFAULT_TOKENS_PER_MINUTE = int(os.getenv('BEDROCK_TOKENS_PER_MINUTE', '100000'))
+
+# Successes needed before the in-flight limit grows back by one
+RECOVERY_SUCCESSES = 3
+
+# Rough token estimate for prompt text (characters per token)
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text, output_tokens=0):
+    """
+    Estimate the tokens a request will consume.
+
+    Args:
+        text: Prompt text (system + user)
+        output_tokens: Expected completion length
+
+    Returns:
+        Estimated token count
+    """
+    return len(text or '') // CHARS_PER_TOKEN + output_tokens
+
+
+class BedrockBudget:
+    """
+    In-flight limit + token bucket shared by every thread calling Bedrock.
+    """
+
+    def __init__(self, max_in_flight=DEFAULT_MAX_IN_FLIGHT, tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE,
+                 min_in_flight=1):
+        self.max_in_flight = max_in_flight
+        self.min_in_flight = min_in_flight
+        self.limit = max_in_flight
+        self.in_flight = 0
+
+        self.tokens_per_minute = tokens_per_minute
+        self.tokens = float(tokens_per_minute)
+        self._refilled_at = time.monotonic()
+
+        self._successes = 0
+        self._condition = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.tokens_per_minute,
+            self.tokens + (now - self._refilled_at) * self.tokens_per_minute / 60
+        )
+        self._refilled_at = now
+
+    def acquire(self, tokens=0):
+        """
+        Block until a slot is free and the token bucket can pay for the request.
+        """
+        # A request larger than the whole bucket still goes through once the bucket is full
+        tokens = min(tokens, self.tokens_per_minute)
+
+        with self._condition:
+            while True:
+                self._refill()
+                if self.in_flight < self.limit and self.tokens >= tokens:
+                    self.in_flight += 1
+                    self.tokens -= tokens
+                    return
+
+                wait = None
+                if self.in_flight < self.limit:
+                    wait = (tokens - self.tokens) * 60 / self.tokens_per_minute
+                self._condition.wait(wait)
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self):
+        with self._condition:
+            self._successes += 1
+            if self._successes >= RECOVERY_SUCCESSES and self.limit < self.max_in_flight:
+                self.limit += 1
+                self._successes = 0
+                self._condition.notify_all()
+
+    def on_throttle(self):
+        with self._condition:
+            self._successes = 0
+            new_limit = max(self.min_in_flight, self.limit // 2)
+            if new_limit < self.limit:
+                print(f"Bedrock throttled: in-flight limit {self.limit} -> {new_limit}")
+            self.limit = new_limit
+
+    def slot(self, tokens=0):
+        """
+        Context manager holding one in-flight slot for the duration of a call.
+        """
+        return _BudgetSlot(self, tokens)
+
+
+class _BudgetSlot:
+
+    def __init__(self, budget, tokens):
+        self.budget = budget
+        self.tokens = tokens
+
+    def __enter__(self):
+        self.budget.acquire(self.tokens)
+        return self.budget
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.budget.release()
+        return False
+
+
+_budget = None
+_budget_lock = threading.Lock()
+
+
+def get_bedrock_budget():
+    """
+    Process-wide budget shared by all story generation threads.
+    """
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            _budget = BedrockBudget()
+        return _budget
@@ -0,0 +1,296 @@
+"""
+Speculative prefetch of zone stories.
+
+After the intro is served, the remaining zones of a player are generated in the
+background, most likely clicks first, so the on-demand endpoint finds them ready.
+Prefetch is low priority: it only starts a model call when no interactive request
+is running and the shared Bedrock budget has a slot to spare, and an interactive
+request for a zone takes that zone off the queue (or waits for the prefetch
+already generating it instead of paying for a second call).
+"""
+
+import heapq
+import itertools
+import os
+import threading
+from concurrent.futures import Future
+from .concurrency import get_bedrock_budget
+from .story_generator import generate_zone_story
+
+STORY_PREFETCH_ENABLED = os.getenv('STORY_PREFETCH_ENABLED', 'true').lower() == 'true'
+STORY_PREFETCH_WORKERS = int(os.getenv('STORY_PREFETCH_WORKERS', '1'))
+
+# 'most_played' or a comma-separated list of zone ids to prefetch first (others follow, most played first)
+STORY_PREFETCH_ORDER = os.getenv('STORY_PREFETCH_ORDER', 'most_played')
+
+# Bedrock slots kept free for interactive requests while prefetching
+PREFETCH_RESERVED_SLOTS = 1
+
+# How often a waiting worker re-checks the budget (it is not notified when slots free up)
+PREFETCH_POLL_INTERVAL = 0.25
+
+
+def zone_activity(stats):
+    """
+    How much the player is likely to care about a zone, from its stats.
+
+    Lanes/regions rank by matches played there then time spent; objectives
+    (no role matches) come after, by fights and deaths around them.
+    """
+    total_matches = stats.get('total_matches') or 1
+    objective_activity = (stats.get('participated_in_fights', 0) + stats.get('deaths_near', 0)) / total_matches
+
+    return (
+        stats.get('matches_played_in_role', 0),
+        stats.get('avg_time_spent_percent', 0),
+        objective_activity
+    )
+
+
+def prefetch_order(zone_stats_dict, order=None):
+    """
+    Zones to prefetch, in priority order (intro excluded).
+
+    Args:
+        zone_stats_dict: Dictionary of zone_id -> stats
+        order: 'most_played' or comma-separated zone ids to put first (defaults to STORY_PREFETCH_ORDER)
+
+    Returns:
+        List of zone ids
+    """
+    order = order or STORY_PREFETCH_ORDER
+    zone_ids = [zone_id for zone_id in zone_stats_dict if zone_id != 'intro']
+
+    most_played = sorted(
+        zone_ids,
+        key=lambda zone_id: zone_activity(zone_stats_dict[zone_id] or {}),
+        reverse=True
+    )
+    if order == 'most_played':
+        return most_played
+
+    pinned = [zone_id.strip() for zone_id in order.split(',') if zone_id.strip() in zone_ids]
+    return pinned + [zone_id for zone_id in most_played if zone_id not in pinned]
+
+
+class StoryPrefetcher:
+    """
+    Priority queue of zone stories to generate ahead of the user's clicks.
+
+    Every player's best zone comes before anyone's second zone, so a burst of
+    new players all get their most likely click ready first.
+    """
+
+    def __init__(self, workers=STORY_PREFETCH_WORKERS, budget=None, reserved_slots=PREFETCH_RESERVED_SLOTS):
+        self.workers = workers
+        self.budget = budget
+        self.reserved_slots = reserved_slots
+
+        self._queue = []
+        self._queued = {}
+        self._running = {}
+        self._generations = {}
+        self._store_locks = {}
+        self._interactive = 0
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._threads = []
+
+    def _start_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._work,
+                name=f'story-prefetch-{len(self._threads)}',
+                daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def schedule(self, puuid, zone_stats_dict, story_mode='coach', on_story=None, order=None):
+        """
+        Queue a player's zones for prefetch, replacing anything still queued for that player.
+
+        Args:
+            puuid: Player PUUID
+            zone_stats_dict: Dictionary of zone_id -> stats (zones the caller considers generatable)
+            story_mode: 'coach' or 'roast'
+            on_story: Callable (zone_id, story_text, stats) persisting a prefetched story
+            order: Priority order override (see prefetch_order)
+
+        Returns:
+            Number of zones queued
+        """
+        zone_ids = prefetch_order(zone_stats_dict, order)
+
+        with self._condition:
+            generation = self._generations.get(puuid, 0) + 1
+            self._generations[puuid] = generation
+            self._drop_queued(puuid)
+
+            for rank, zone_id in enumerate(zone_ids):
+                key = (puuid, zone_id, story_mode)
+                if key in self._running:
+                    continue
+
+                job = {
+                    'key': key,
+                    'puuid': puuid,
+                    'zone_id': zone_id,
+                    'stats': zone_stats_dict[zone_id],
+                    'story_mode': story_mode,
+                    'generation': generation,
+                    'on_story': on_story,
+                    'cancelled': False,
+                }
+                self._queued[key] = job
+                heapq.heappush(self._queue, (rank, next(self._sequence), job))
+
+            self._start_workers()
+            self._condition.notify_all()
+
+        return len(zone_ids)
+
+    def _drop_queued(self, puuid):
+        for key in [key for key in self._queued if key[0] == puuid]:
+            self._queued.pop(key)['cancelled'] = True
+
+    def cancel(self, puuid):
+        """
+        Drop a player's queued zones (a zone already generating finishes but is not persisted).
+
+        A prefetched story being stored when this is called is written before it returns.
+        """
+        with self._store_lock(puuid):
+            with self._condition:
+                self._generations[puuid] = self._generations.get(puuid, 0) + 1
+                self._drop_queued(puuid)
+
+    def _store_lock(self, puuid):
+        # Per-player lock around the generation check + store, so no I/O runs under the condition
+        with self._condition:
+            return self._store_locks.setdefault(puuid, threading.Lock())
+
+    def claim(self, puuid, zone_id, story_mode='coach'):
+        """
+        Take a zone away from the prefetcher because the user asked for it.
+
+        Returns:
+            Future of the story if the prefetcher is generating it right now, else None
+            (the zone is removed from the queue and the caller generates it)
+        """
+        key = (puuid, zone_id, story_mode)
+        with self._condition:
+            job = self._queued.pop(key, None)
+            if job is not None:
+                job['cancelled'] = True
+            return self._running.get(key)
+
+    def begin_interactive(self):
+        with self._condition:
+            self._interactive += 1
+
+    def end_interactive(self):
+        with self._condition:
+            self._interactive = max(0, self._interactive - 1)
+            self._condition.notify_all()
+
+    def interactive(self):
+        """
+        Context manager pausing prefetch for the duration of an interactive request.
+        """
+        return _InteractiveScope(self)
+
+    def pending(self):
+        with self._condition:
+            return len(self._queued)
+
+    def _has_spare_slot(self):
+        budget = self.budget or get_bedrock_budget()
+        # No prefetch at all once throttling has brought the limit down to the reserved slots
+        return budget.in_flight < budget.limit - self.reserved_slots
+
+    def _next_job(self):
+        # Called with the condition held: drops stale heads, returns the best live job or None
+        while self._queue:
+            job = self._queue[0][2]
+            if not job['cancelled'] and job['generation'] == self._generations.get(job['puuid']):
+                return job
+            heapq.heappop(self._queue)
+        return None
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while True:
+                    job = self._next_job()
+                    if job is not None and not self._interactive and self._has_spare_slot():
+                        break
+                    # Nothing queued: sleep until schedule(); otherwise poll the budget
+                    self._condition.wait(PREFETCH_POLL_INTERVAL if job is not None else None)
+
+                heapq.heappop(self._queue)
+                del self._queued[job['key']]
+                future = Future()
+                self._running[job['key']] = future
+
+            self._run(job, future)
+
+    def _run(self, job, future):
+        zone_id = job['zone_id']
+        story = None
+        try:
+            story = generate_zone_story(zone_id, job['stats'], job['story_mode'])
+            future.set_result(story)
+        except Exception as e:
+            print(f"  Prefetch failed for {zone_id}: {e}")
+            future.set_exception(e)
+        finally:
+            with self._condition:
+                self._running.pop(job['key'], None)
+                self._condition.notify_all()
+
+        if not story or not job['on_story']:
+            return
+
+        # The generation check and the store share the player's store lock, so a cancel
+        # either lands before (and the story is dropped) or waits for the store
+        with self._store_lock(job['puuid']):
+            with self._condition:
+                current = job['generation'] == self._generations.get(job['puuid'])
+            if not current:
+                return
+
+            try:
+                job['on_story'](zone_id, story, job['stats'])
+                print(f"  Prefetched {zone_id} ({job['story_mode']})")
+            except Exception as e:
+                print(f"  Could not store prefetched {zone_id}: {e}")
+
+
+class _InteractiveScope:
+
+    def __init__(self, prefetcher):
+        self.prefetcher = prefetcher
+
+    def __enter__(self):
+        self.prefetcher.begin_interactive()
+        return self.prefetcher
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.prefetcher.end_interactive()
+        return False
+
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_story_prefetcher():
+    """
+    Process-wide prefetcher shared by all requests.
+    """
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = StoryPrefetcher()
+        return _prefetcher
@@ -1,3 +1,11 @@
+from decimal import Decimal
+
+# Bump when a prompt template or the story system prompts change (invalidates cached stories)
+PROMPT_VERSION = 2
+
+# Decimal places kept for non-integer stats in rendered prompts
+PROMPT_NUMBER_DECIMALS = 2
+
 ROLE_DISPLAY_NAMES = {
     "UTILITY": "Support",
     "BOTTOM": "ADC",
@@ -123,6 +131,47 @@ Positioning and vision tips. 2nd person."""
     return prompt
 
 
+def build_batch_prompt(prompts, mode="coach"):
+    """
+    Combine several zone prompts into one request (one section per zone_id).
+
+    Args:
+        prompts: Dictionary of zone_id -> zone prompt
+        mode: 'coach' for helpful advice or 'roast' for savage humor
+
+    Returns:
+        Prompt string asking for a JSON object keyed by zone_id
+    """
+    sections = "\n\n".join(f"[{zone_id}]\n{prompt}" for zone_id, prompt in prompts.items())
+    zone_list = ", ".join(prompts)
+
+    return f"""Write one story per zone below, in {mode.upper()} tone.
+
+{sections}
+
+Respond ONLY with a JSON object mapping each zone id ({zone_list}) to its story."""
+
+
+def normalize_stats(value):
+    """
+    Canonical form of zone stats before rendering.
+
+    Stats read back from DynamoDB come out as floats (5 -> 5.0) while live stats keep
+    their ints, so integral numbers become ints and the rest are rounded: the same stats
+    render the same prompt (and story fingerprint) whichever path produced them.
+    """
+    if isinstance(value, dict):
+        return {key: normalize_stats(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize_stats(item) for item in value]
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (float, Decimal)):
+        value = round(float(value), PROMPT_NUMBER_DECIMALS)
+        return int(value) if value.is_integer() else value
+    return value
+
+
 def build_prompt(zone_id, stats, mode="coach"):
     """
     Build prompt for story generation based on zone and mode.
@@ -135,6 +184,8 @@ def build_prompt(zone_id, stats, mode="coach"):
     Returns:
         Prompt string for AI generation
     """
+    stats = normalize_stats(stats or {})
+
     if zone_id == "intro":
         return build_intro_prompt(stats, mode)
     elif zone_id == "baron_pit":
@@ -0,0 +1,143 @@
+"""
+Content-addressed cache for zone stories.
+
+A story is keyed by a fingerprint of everything that determines the model input:
+zone id, story mode, prompt template version, model id and the rendered zone prompt.
+The rendered prompt is the normalized form of the zone stats (only the fields the
+template reads, formatted the way the model sees them), so players whose zone stats
+coincide share the same entry and identical prompts never trigger a second model call.
+
+Entries live in an in-process LRU; an optional persistent backend (e.g. DynamoDB)
+can be plugged in with configure_story_cache().
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from .prompt_builder import PROMPT_VERSION
+
+DEFAULT_STORY_CACHE_SIZE = int(os.getenv('STORY_CACHE_SIZE', '512'))
+
+
+def story_fingerprint(zone_id, mode, prompt, model_id):
+    """
+    Stable hash identifying a story request.
+
+    Args:
+        zone_id: Zone identifier
+        mode: 'coach' or 'roast'
+        prompt: Rendered zone prompt (from build_prompt)
+        model_id: Model generating the story
+
+    Returns:
+        Hex sha256 digest
+    """
+    payload = json.dumps(
+        {
+            'zone_id': zone_id,
+            'mode': mode,
+            'prompt_version': PROMPT_VERSION,
+            'model_id': model_id,
+            'prompt': prompt.strip(),
+        },
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class StoryCache:
+    """
+    Thread-safe LRU of fingerprint -> story text, backed by an optional persistent store.
+    """
+
+    def __init__(self, max_size=DEFAULT_STORY_CACHE_SIZE, load=None, save=None):
+        self.max_size = max_size
+        self.load = load
+        self.save = save
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, fingerprint, story):
+        with self._lock:
+            self._entries[fingerprint] = story
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get(self, fingerprint):
+        """
+        Look up a story, in memory first then in the persistent store.
+
+        Returns:
+            Story text or None on a miss
+        """
+        with self._lock:
+            story = self._entries.get(fingerprint)
+            if story is not None:
+                self._entries.move_to_end(fingerprint)
+                return story
+
+        if self.load is None:
+            return None
+
+        try:
+            story = self.load(fingerprint)
+        except Exception as e:
+            print(f"WARNING: Story cache lookup failed: {e}")
+            return None
+
+        if story:
+            self._remember(fingerprint, story)
+        return story or None
+
+    def put(self, fingerprint, story, zone_id=None, mode=None):
+        """
+        Store a generated story (empty stories are not cached).
+        """
+        if not story:
+            return
+
+        self._remember(fingerprint, story)
+
+        if self.save is None:
+            return
+
+        try:
+            self.save(fingerprint, story, zone_id, mode)
+        except Exception as e:
+            print(f"WARNING: Story cache write failed: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_story_cache = StoryCache()
+
+
+def get_story_cache():
+    """
+    Process-wide story cache shared by all generation threads.
+    """
+    return _story_cache
+
+
+def configure_story_cache(load=None, save=None, max_size=None):
+    """
+    Plug a persistent backend into the shared story cache.
+
+    Args:
+        load: Callable fingerprint -> story text or None
+        save: Callable (fingerprint, story, zone_id, mode) storing a story
+        max_size: In-process LRU size (keeps the current size if None)
+    """
+    _story_cache.load = load
+    _story_cache.save = save
+    if max_size is not None:
+        _story_cache.max_size = max_size
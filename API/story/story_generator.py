@@ -1,12 +1,21 @@
-import time
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from .prompt_builder import build_prompt
-from .bedrock_client import generate_story
+from .bedrock_client import generate_story, generate_stories_batch, stream_story, get_story_model_id
+from .concurrency import get_bedrock_budget
+from .story_cache import get_story_cache, story_fingerprint
+
+# Zones per Bedrock request when generating the full map (1 = one request per zone)
+STORY_BATCH_SIZE = int(os.getenv('STORY_BATCH_SIZE', '3'))
 
 
 def generate_zone_story(zone_id, zone_stats, story_mode='coach'):
     """
     Generate a story for a specific zone.
 
+    Identical prompts (same zone, mode and normalized stats) are served from
+    the story cache without a model call.
+
     Args:
         zone_id: Zone identifier (e.g., 'baron_pit')
         zone_stats: Statistics for the zone
@@ -20,42 +29,190 @@ def generate_zone_story(zone_id, zone_stats, story_mode='coach'):
     if not prompt:
         return None
 
+    cache = get_story_cache()
+    fingerprint = story_fingerprint(zone_id, story_mode, prompt, get_story_model_id())
+    story = cache.get(fingerprint)
+    if story:
+        print(f"  Story cache hit for {zone_id}")
+        return story
+
     story = generate_story(prompt, zone_id, mode=story_mode)
+    cache.put(fingerprint, story, zone_id, story_mode)
     return story
 
 
-def generate_all_stories(zone_stats_dict, story_mode='coach'):
+def stream_zone_story(zone_id, zone_stats, story_mode='coach'):
+    """
+    Generate a story for a specific zone, yielding text chunks as the model produces them.
+
+    A story cache hit is yielded as a single chunk; a completed generation is cached
+    like generate_zone_story does.
+
+    Args:
+        zone_id: Zone identifier (e.g., 'baron_pit')
+        zone_stats: Statistics for the zone
+        story_mode: 'coach' for helpful advice or 'roast' for savage humor
+
+    Yields:
+        Story text chunks (nothing if no prompt can be built)
+    """
+    prompt = build_prompt(zone_id, zone_stats, mode=story_mode)
+
+    if not prompt:
+        return
+
+    cache = get_story_cache()
+    fingerprint = story_fingerprint(zone_id, story_mode, prompt, get_story_model_id())
+    story = cache.get(fingerprint)
+    if story:
+        print(f"  Story cache hit for {zone_id}")
+        yield story
+        return
+
+    chunks = []
+    for text in stream_story(prompt, zone_id, mode=story_mode):
+        chunks.append(text)
+        yield text
+
+    cache.put(fingerprint, ''.join(chunks).strip(), zone_id, story_mode)
+
+
+def generate_zone_stories_batch(zone_stats_dict, story_mode='coach'):
+    """
+    Generate stories for several zones with one Bedrock call.
+
+    Zones found in the story cache are not sent to the model. Zones the batched
+    response is missing (or could not be parsed) fall back to a regular per-zone call.
+
+    Args:
+        zone_stats_dict: Dictionary of zone_id -> stats
+        story_mode: 'coach' for helpful advice or 'roast' for savage humor
+
+    Returns:
+        Dictionary of zone_id -> story text or None
+    """
+    cache = get_story_cache()
+    model_id = get_story_model_id()
+    stories = {zone_id: None for zone_id in zone_stats_dict}
+
+    prompts = {}
+    fingerprints = {}
+    for zone_id, stats in zone_stats_dict.items():
+        prompt = build_prompt(zone_id, stats, mode=story_mode)
+        if not prompt:
+            continue
+
+        fingerprints[zone_id] = story_fingerprint(zone_id, story_mode, prompt, model_id)
+        cached = cache.get(fingerprints[zone_id])
+        if cached:
+            print(f"  Story cache hit for {zone_id}")
+            stories[zone_id] = cached
+        else:
+            prompts[zone_id] = prompt
+
+    if not prompts:
+        return stories
+
+    if len(prompts) == 1:
+        zone_id, prompt = next(iter(prompts.items()))
+        stories[zone_id] = generate_story(prompt, zone_id, mode=story_mode)
+    else:
+        batch = generate_stories_batch(prompts, mode=story_mode) or {}
+        for zone_id, prompt in prompts.items():
+            if batch.get(zone_id):
+                stories[zone_id] = batch[zone_id]
+            else:
+                print(f"  Batch response missing {zone_id}, generating it separately...")
+                stories[zone_id] = generate_story(prompt, zone_id, mode=story_mode)
+
+    for zone_id in prompts:
+        cache.put(fingerprints[zone_id], stories[zone_id], zone_id, story_mode)
+
+    return stories
+
+
+def iter_all_stories(zone_stats_dict, story_mode='coach', max_workers=None, batch_size=STORY_BATCH_SIZE):
+    """
+    Generate stories for all zones concurrently, yielding each one as soon as it is ready.
+
+    Zones are grouped into batches of batch_size sharing one Bedrock call (batch_size=1
+    means one call per zone). Concurrency is bounded by the shared Bedrock budget
+    (in-flight limit and token rate), which backs off on its own when Bedrock throttles.
+
+    Args:
+        zone_stats_dict: Dictionary of zone_id -> stats
+        story_mode: 'coach' for helpful advice or 'roast' for savage humor
+        max_workers: Thread count (defaults to the budget's in-flight limit)
+        batch_size: Zones per Bedrock request
+
+    Yields:
+        (zone_id, {zone_name, story, stats}) in completion order, entry is None if no story
+    """
+    if not zone_stats_dict:
+        return
+
+    zone_ids = list(zone_stats_dict)
+    batch_size = max(1, batch_size)
+    batches = [zone_ids[i:i + batch_size] for i in range(0, len(zone_ids), batch_size)]
+
+    budget = get_bedrock_budget()
+    workers = min(max_workers or budget.max_in_flight, len(batches))
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='zone-story')
+    try:
+        futures = [
+            executor.submit(
+                generate_zone_stories_batch,
+                {zone_id: zone_stats_dict[zone_id] for zone_id in batch},
+                story_mode
+            )
+            for batch in batches
+        ]
+
+        for future in as_completed(futures):
+            for zone_id, story in future.result().items():
+                stats = zone_stats_dict[zone_id]
+
+                entry = None
+                if story:
+                    entry = {
+                        'zone_name': stats.get('zone_name', zone_id),
+                        'story': story,
+                        'stats': stats
+                    }
+                yield zone_id, entry
+    finally:
+        # First failure (e.g. RATE_LIMIT_ERROR) or early stop: drop batches not started yet
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def generate_all_stories(zone_stats_dict, story_mode='coach', batch_size=STORY_BATCH_SIZE):
     """
     Generate stories for all zones.
 
     Args:
         zone_stats_dict: Dictionary of zone_id -> stats
         story_mode: 'coach' for helpful advice or 'roast' for savage humor
+        batch_size: Zones per Bedrock request
 
     Returns:
         Dictionary of zone_id -> {zone_name, story, stats}
     """
-    stories = {}
-
     mode_emoji = "🎓" if story_mode == 'coach' else "🔥"
     print(f"\n{mode_emoji} Generating stories in {story_mode.upper()} mode...")
 
-    for i, (zone_id, stats) in enumerate(zone_stats_dict.items()):
-        zone_name = stats.get('zone_name', zone_id)
+    finished = {}
+    for i, (zone_id, entry) in enumerate(iter_all_stories(zone_stats_dict, story_mode, batch_size=batch_size)):
+        zone_name = zone_stats_dict[zone_id].get('zone_name', zone_id)
         print(f"  [{i+1}/{len(zone_stats_dict)}] {zone_name}...")
-
-        story = generate_zone_story(zone_id, stats, story_mode)
-
-        if story:
-            stories[zone_id] = {
-                'zone_name': zone_name,
-                'story': story,
-                'stats': stats
-            }
-
-        # Rate limiting between API calls
-        if i < len(zone_stats_dict) - 1:
-            time.sleep(2)
+        finished[zone_id] = entry
+
+    # Keep the input zone order regardless of completion order
+    stories = {
+        zone_id: finished[zone_id]
+        for zone_id in zone_stats_dict
+        if finished.get(zone_id)
+    }
 
     print(f"✅ Generated {len(stories)} stories in {story_mode} mode\n")
     return stories
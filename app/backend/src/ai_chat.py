@@ -1,9 +1,13 @@
 import os
+import sys
 import time
 from dotenv import load_dotenv
-from langchain_aws import ChatBedrock
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage
-import boto3
+
+# Repo root on the path so API/db import when run standalone (python ai_chat.py)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+from API.story.bedrock_client import get_bedrock_client
 
 # Import our League of Legends tools
 from league_tools import TOOL_DEFINITIONS, execute_tool, set_player_puuid
@@ -58,14 +62,8 @@ RESPONSE STYLE:
 
 
 def create_chat():
-    chat = ChatBedrock(
-        model_id="eu.anthropic.claude-sonnet-4-5-20250929-v1:0",
-        region_name=os.getenv('AWS_DEFAULT_REGION', 'eu-west-3'),
-        model_kwargs={
-            "temperature": 0.7,
-            "max_tokens": 4092
-        }
-    )
+    # Shared pooled client (same model/params as the stories), no per-request boto3 setup
+    chat = get_bedrock_client()
     # Bind the League of Legends tools to the chat model
     chat_with_tools = chat.bind(tools=TOOL_DEFINITIONS)
     return chat_with_tools
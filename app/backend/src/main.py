@@ -1,4 +1,4 @@
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, g, jsonify, request, send_from_directory, stream_with_context
 import base64
 import os
 import sys
@@ -16,6 +16,9 @@ from API.models.player import Player
 from API.analytics.zones.zone_analyzer import analyze_player_zones
 from API.story.story_generator import generate_all_stories
 from API.story.card_generator import generate_card_content_with_fallback
+from API.story.bedrock_client import warm_up_bedrock_clients, stream_with_retry, chunk_text
+from API.story.story_cache import configure_story_cache
+from API.story.prefetch import get_story_prefetcher, STORY_PREFETCH_ENABLED
 from app.backend.src.utils.input_validator import (
     validate_game_name, validate_tag_line, validate_platform,
     validate_match_count, validate_story_mode, validate_riot_id,
@@ -32,6 +35,7 @@ import json
 from db.src.queries.story_queries import (
     get_all_stories, store_all_stories, is_story_fresh, delete_all_stories, get_story, check_story_mode, store_story
 )
+from db.src.queries.story_cache_queries import get_cached_story, store_cached_story
 from db.src.repositories.player_repository import PlayerRepository
 from db.src.repositories.session_repository import SessionRepository
 from db.src.repositories.conversation_repository import ConversationRepository
@@ -41,8 +45,35 @@ player_repo = PlayerRepository(dynamodb)
 session_repo = SessionRepository(dynamodb)
 conversation_repo = ConversationRepository(dynamodb)
 
+# Stories are shared by stats fingerprint across players and survive /api/refresh
+configure_story_cache(load=get_cached_story, save=store_cached_story)
+
+# Build the shared Bedrock clients once at startup instead of on the first story/chat request
+warm_up_bedrock_clients()
+
 app = Flask(__name__)
 
+# Background generation of the zones the player has not clicked yet (low priority)
+story_prefetcher = get_story_prefetcher()
+
+# Seconds an on-demand request waits for a zone the prefetcher is already generating
+PREFETCH_CLAIM_TIMEOUT = 30
+
+
+@app.before_request
+def pause_prefetch():
+    """API requests are interactive: no new prefetch call starts while one is running"""
+    if request.path.startswith('/api/'):
+        story_prefetcher.begin_interactive()
+        g.prefetch_paused = True
+
+
+@app.teardown_request
+def resume_prefetch(exc=None):
+    # For streamed responses this runs once the stream is done
+    if g.pop('prefetch_paused', False):
+        story_prefetcher.end_interactive()
+
 # Serve everything from public folder (HTML, CSS, JS, assets)
 PUBLIC_FOLDER = os.path.join(os.path.dirname(__file__), '../../frontend/public')
 
@@ -54,6 +85,9 @@ MIN_MATCH_COUNT = 5
 MAX_MATCH_COUNT = 50
 MAX_REQUEST_SIZE = 1024 * 10
 
+# Only the fields the rewind card reads from processed_stats
+CARD_FIELDS = ['match_id', 'champion_name', 'win', 'kills', 'deaths', 'assists']
+
 
 # Utility: Convert riot_id format (URL-safe to standard)
 def parse_riot_id(riot_id_str):
@@ -80,6 +114,21 @@ def run_async(coro):
         loop.close()
 
 
+# Utility: Server-sent events
+def sse_event(event, data):
+    """Format one server-sent event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def sse_response(events):
+    """Stream a generator of SSE strings (flushed as produced, not buffered by proxies)"""
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @app.route('/')
 def index():
     return send_from_directory(PUBLIC_FOLDER, 'index.html')
@@ -312,8 +361,40 @@ def generate_and_store_stories(player, zone_stats, riot_id, story_mode):
                 print(f"  WARNING: Skipping {zone_id} - empty stats")
         print(f"Cached stats for {stored_count}/{len(zone_stats)-1} additional zones")
 
+    if player.puuid and STORY_PREFETCH_ENABLED:
+        schedule_story_prefetch(player.puuid, zone_stats, story_mode)
+
     return stories
 
+
+def schedule_story_prefetch(puuid, zone_stats, story_mode):
+    """Queue the zones the on-demand endpoint would accept, the prefetcher stores their stories"""
+    prefetch_zones = {
+        zone_id: stats
+        for zone_id, stats in zone_stats.items()
+        if zone_id != 'intro' and has_zone_stats(stats) and lane_has_data(zone_id, stats)
+    }
+
+    def store_prefetched(zone_id, story_text, stats):
+        store_story(puuid, zone_id, story_text, stats.get('zone_name', zone_id), stats, story_mode)
+
+    queued = story_prefetcher.schedule(puuid, prefetch_zones, story_mode, on_story=store_prefetched)
+    print(f"Queued {queued} zones for background story prefetch")
+
+
+def claim_prefetched_story(puuid, zone_id, story_mode):
+    """Take a zone off the prefetch queue; if it is being generated right now, wait for that story"""
+    pending = story_prefetcher.claim(puuid, zone_id, story_mode)
+    if pending is None:
+        return None
+
+    print(f"  Waiting for prefetch of {zone_id} already in progress")
+    try:
+        return pending.result(timeout=PREFETCH_CLAIM_TIMEOUT)
+    except Exception as e:
+        print(f"  Prefetch of {zone_id} unavailable ({e}), generating on demand")
+        return None
+
 def _perform_analysis(game_name, tag_line, platform='euw1', match_count=15, force_refresh=False, story_mode='coach'):
     """
     Shared analysis logic for both /api/analyze and /api/refresh.
@@ -469,6 +550,86 @@ def analyze_player():
         return jsonify({'error': 'Internal server error'}), 500
 
 
+def has_zone_stats(zone_stats):
+    """Stats are usable if there is more than just zone_id and zone_name"""
+    return bool(zone_stats) and isinstance(zone_stats, dict) and len(zone_stats) > 2
+
+
+def lane_has_data(zone_id, zone_stats):
+    """Lane zones need actual lane_performance data"""
+    if zone_id not in ['top_lane', 'mid_lane', 'bot_lane']:
+        return True
+    return bool(zone_stats.get('lane_performance')) and zone_stats.get('matches_played_in_role', 0) != 0
+
+
+def lane_no_data_error(zone_id, zone_stats):
+    return {
+        'error': f'Not enough data for {zone_stats.get("zone_name", zone_id)}. You haven\'t played enough matches in this lane recently. Try exploring other zones or play more games!',
+        'zone_id': zone_id,
+        'error_type': 'no_data'
+    }
+
+
+def store_zone_story(puuid, zone_id, story_text, zone_stats, story_mode):
+    """Persist a generated zone story and return the API record"""
+    store_story(
+        puuid,
+        zone_id,
+        story_text,
+        zone_stats.get('zone_name', zone_id),
+        zone_stats,
+        story_mode
+    )
+
+    return {
+        'zone_id': zone_id,
+        'zone_name': zone_stats.get('zone_name', zone_id),
+        'story': story_text,
+        'stats': zone_stats,
+        'story_mode': story_mode,
+        'generated_at': int(time.time())
+    }
+
+
+async def fetch_zone_stats(riot_id_parsed, platform, zone_id):
+    """
+    Fetch recent matches from the Riot API and extract stats for one zone (slow path).
+
+    Returns:
+        (zone_stats, puuid, error)
+    """
+    parts = riot_id_parsed.split('#')
+    if len(parts) != 2:
+        return None, None, "Invalid riot_id format"
+
+    game_name, tag_line = parts
+
+    async with Player(game_name, tag_line, platform=platform) as player_obj:
+        # Load profile and matches
+        success = await player_obj.load_profile()
+        if not success:
+            return None, None, "Failed to load player profile"
+
+        await player_obj.load_recent_matches(count=15)
+
+        if not player_obj.processed_stats:
+            return None, None, "No match data found"
+
+        await player_obj.load_match_timelines()
+        player_obj.process_matches()
+
+        # Extract stats for this specific zone
+        from API.analytics.zones.zone_analyzer import extract_zone_stats
+        zone_stats = extract_zone_stats(player_obj.processed_stats, zone_id)
+
+        if not has_zone_stats(zone_stats):
+            print(f"  ERROR: No valid stats extracted for {zone_id}")
+            print(f"  Stats: {zone_stats}")
+            return None, None, f"No statistics available for zone {zone_id}. This zone may not have enough data from your recent matches."
+
+        return zone_stats, player_obj.puuid, None
+
+
 @app.route('/api/generate-story/<path:riot_id>/<zone_id>', methods=['POST'])
 def generate_zone_story_endpoint(riot_id, zone_id):
     """
@@ -555,27 +716,22 @@ def generate_zone_story_endpoint(riot_id, zone_id):
 
             # Case 2: Stats cached but no story yet OR mode mismatch - generate story quickly
             # Verify stats are valid (not just an empty dict)
-            if zone_stats and isinstance(zone_stats, dict) and len(zone_stats) > 2:  # More than just zone_id and zone_name
+            if has_zone_stats(zone_stats):
                 print(f"  Generating story using cached stats (fast: ~1-2s)")
                 print(f"  Stats keys: {list(zone_stats.keys())}")
 
                 # For lane zones, verify there's actual lane_performance data
-                if zone_id in ['top_lane', 'mid_lane', 'bot_lane']:
-                    lane_perf = zone_stats.get('lane_performance', {})
-                    matches_in_role = zone_stats.get('matches_played_in_role', 0)
-
-                    if not lane_perf or matches_in_role == 0:
-                        print(f"  WARNING: No lane performance data for {zone_id}")
-                        return jsonify({
-                            'error': f'Not enough data for {zone_stats.get("zone_name", zone_id)}. You haven\'t played enough matches in this lane recently. Try exploring other zones or play more games!',
-                            'zone_id': zone_id,
-                            'error_type': 'no_data'
-                        }), 404
+                if not lane_has_data(zone_id, zone_stats):
+                    print(f"  WARNING: No lane performance data for {zone_id}")
+                    return jsonify(lane_no_data_error(zone_id, zone_stats)), 404
 
                 from API.story.story_generator import generate_zone_story
 
                 try:
-                    story_text = generate_zone_story(zone_id, zone_stats, story_mode)
+                    story_text = (
+                        claim_prefetched_story(player.puuid, zone_id, story_mode)
+                        or generate_zone_story(zone_id, zone_stats, story_mode)
+                    )
                 except Exception as gen_error:
                     if "RATE_LIMIT_ERROR" in str(gen_error):
                         return jsonify({
@@ -592,23 +748,7 @@ def generate_zone_story_endpoint(riot_id, zone_id):
 
                 if story_text:
                     # Store the generated story
-                    store_story(
-                        player.puuid,
-                        zone_id,
-                        story_text,
-                        zone_stats.get('zone_name', zone_id),
-                        zone_stats,
-                        story_mode
-                    )
-
-                    return jsonify({
-                        'zone_id': zone_id,
-                        'zone_name': zone_stats.get('zone_name', zone_id),
-                        'story': story_text,
-                        'stats': zone_stats,
-                        'story_mode': story_mode,
-                        'generated_at': int(time.time())
-                    }), 200
+                    return jsonify(store_zone_story(player.puuid, zone_id, story_text, zone_stats, story_mode)), 200
                 else:
                     # AI generation returned None - likely insufficient data
                     print(f"  ERROR: Story generation returned None for {zone_id}")
@@ -625,67 +765,25 @@ def generate_zone_story_endpoint(riot_id, zone_id):
         print(f"  No cached data - fetching from Riot API (this may take 30-60s)...")
 
         async def generate_story_for_zone():
-            parts = riot_id_parsed.split('#')
-            if len(parts) != 2:
-                return None, "Invalid riot_id format"
-
-            game_name, tag_line = parts
             # Use the player's actual region from the database (stored as 'region', not 'platform')
-            platform = player.region
-
-            async with Player(game_name, tag_line, platform=platform) as player_obj:
-                # Load profile and matches
-                success = await player_obj.load_profile()
-                if not success:
-                    return None, "Failed to load player profile"
-
-                await player_obj.load_recent_matches(count=15)
-
-                if not player_obj.processed_stats:
-                    return None, "No match data found"
-
-                await player_obj.load_match_timelines()
-                player_obj.process_matches()
+            zone_stats, puuid, error = await fetch_zone_stats(riot_id_parsed, player.region, zone_id)
+            if error:
+                return None, error
 
-                # Extract stats for this specific zone
-                from API.analytics.zones.zone_analyzer import extract_zone_stats
-                zone_stats = extract_zone_stats(player_obj.processed_stats, zone_id)
+            # Generate story
+            from API.story.story_generator import generate_zone_story
+            try:
+                story_text = generate_zone_story(zone_id, zone_stats, story_mode)
+            except Exception as gen_error:
+                if "RATE_LIMIT_ERROR" in str(gen_error):
+                    return None, "Too many requests. Please wait a moment and try again."
+                raise
 
-                if not zone_stats or not isinstance(zone_stats, dict) or len(zone_stats) <= 2:
-                    print(f"  ERROR: No valid stats extracted for {zone_id}")
-                    print(f"  Stats: {zone_stats}")
-                    return None, f"No statistics available for zone {zone_id}. This zone may not have enough data from your recent matches."
-
-                # Generate story
-                from API.story.story_generator import generate_zone_story
-                try:
-                    story_text = generate_zone_story(zone_id, zone_stats, story_mode)
-                except Exception as gen_error:
-                    if "RATE_LIMIT_ERROR" in str(gen_error):
-                        return None, "Too many requests. Please wait a moment and try again."
-                    raise
-
-                if not story_text:
-                    return None, "Failed to generate story"
-
-                # Store for future use
-                store_story(
-                    player_obj.puuid,
-                    zone_id,
-                    story_text,
-                    zone_stats.get('zone_name', zone_id),
-                    zone_stats,
-                    story_mode
-                )
+            if not story_text:
+                return None, "Failed to generate story"
 
-                return {
-                    'zone_id': zone_id,
-                    'zone_name': zone_stats.get('zone_name', zone_id),
-                    'story': story_text,
-                    'stats': zone_stats,
-                    'story_mode': story_mode,
-                    'generated_at': int(time.time())
-                }, None
+            # Store for future use
+            return store_zone_story(puuid, zone_id, story_text, zone_stats, story_mode), None
 
         result, error = run_async(generate_story_for_zone())
 
@@ -733,6 +831,145 @@ def generate_zone_story_endpoint(riot_id, zone_id):
         return jsonify(error_details), 500
 
 
+@app.route('/api/stream/generate-story/<path:riot_id>/<zone_id>', methods=['POST'])
+def stream_zone_story_endpoint(riot_id, zone_id):
+    """
+    Streaming version of /api/generate-story (server-sent events).
+
+    Request body (optional):
+    {
+        "storyMode": "coach" or "roast"
+    }
+
+    Events:
+        status  {"stage": "fetching_matches"}  (no cached stats, Riot API fetch first)
+        token   {"text": "..."}                 (story text as Bedrock produces it)
+        done    {zone_id, zone_name, story, stats, story_mode, generated_at}  (persisted record)
+        error   {"error": "...", "status": 404|429|500, ...}
+
+    Validation errors are returned as regular JSON responses before the stream starts.
+    """
+    try:
+        is_valid, error = validate_riot_id(riot_id)
+        if not is_valid:
+            return jsonify({'error': error}), 400
+
+        is_valid, error = validate_zone_id(zone_id)
+        if not is_valid:
+            return jsonify({'error': error}), 400
+
+        riot_id_parsed = parse_riot_id(riot_id)
+        player = player_repo.get_by_riot_id(riot_id_parsed)
+        if not player:
+            return jsonify({'error': 'Player not found'}), 404
+
+        data = request.get_json(silent=True) or {}
+        story_mode = data.get('storyMode', 'coach')
+
+        is_valid, error = validate_story_mode(story_mode)
+        if not is_valid:
+            return jsonify({'error': error}), 400
+        if not story_mode:
+            story_mode = 'coach'
+
+        print(f"Streaming story for {riot_id_parsed} / {zone_id} ({story_mode})")
+
+        existing_story = get_story(player.puuid, zone_id)
+        zone_stats = existing_story.get('stats', {}) if existing_story else {}
+
+        # Fully cached story in the right mode: nothing to generate
+        if existing_story and existing_story.get('story_mode', 'coach') == story_mode:
+            cached_story_text = existing_story.get('story_text', '').strip()
+            if cached_story_text:
+                record = {
+                    'zone_id': zone_id,
+                    'zone_name': existing_story.get('zone_name', zone_id),
+                    'story': cached_story_text,
+                    'stats': zone_stats,
+                    'story_mode': story_mode,
+                    'generated_at': existing_story.get('generated_at')
+                }
+                return sse_response(iter([
+                    sse_event('token', {'text': cached_story_text}),
+                    sse_event('done', record)
+                ]))
+
+        if has_zone_stats(zone_stats) and not lane_has_data(zone_id, zone_stats):
+            return jsonify(lane_no_data_error(zone_id, zone_stats)), 404
+
+        def events():
+            from API.story.story_generator import stream_zone_story
+
+            stats = zone_stats
+            puuid = player.puuid
+
+            if not has_zone_stats(stats):
+                yield sse_event('status', {'stage': 'fetching_matches'})
+                stats, puuid, fetch_error = run_async(fetch_zone_stats(riot_id_parsed, player.region, zone_id))
+                if fetch_error:
+                    status = 404 if "No statistics available" in fetch_error else 500
+                    yield sse_event('error', {'error': fetch_error, 'zone_id': zone_id, 'status': status})
+                    return
+
+            chunks = []
+            try:
+                prefetched = claim_prefetched_story(puuid, zone_id, story_mode)
+                story_chunks = [prefetched] if prefetched else stream_zone_story(zone_id, stats, story_mode)
+                for text in story_chunks:
+                    chunks.append(text)
+                    yield sse_event('token', {'text': text})
+            except Exception as gen_error:
+                print(f"  ERROR: Story streaming failed: {gen_error}")
+                if "RATE_LIMIT_ERROR" in str(gen_error):
+                    yield sse_event('error', {
+                        'error': 'Too many requests. Please wait a moment and try again.',
+                        'zone_id': zone_id,
+                        'retry_after': 10,
+                        'status': 429
+                    })
+                else:
+                    yield sse_event('error', {
+                        'error': f'Failed to generate story for zone {zone_id}. Please try again.',
+                        'zone_id': zone_id,
+                        'status': 500
+                    })
+                return
+
+            story_text = ''.join(chunks).strip()
+            if not story_text:
+                yield sse_event('error', {
+                    'error': f'Not enough data for {stats.get("zone_name", zone_id)}. You haven\'t played enough matches in this area recently. Try exploring other zones or play more games!',
+                    'zone_id': zone_id,
+                    'error_type': 'no_data',
+                    'status': 404
+                })
+                return
+
+            yield sse_event('done', store_zone_story(puuid, zone_id, story_text, stats, story_mode))
+
+        return sse_response(events())
+
+    except Exception as e:
+        # Errors before the stream starts (DynamoDB lookups) get the same JSON as /api/generate-story
+        error_str = str(e)
+
+        if "RATE_LIMIT_ERROR" in error_str or "Too many requests" in error_str.lower():
+            print(f"Rate limit error in /api/stream/generate-story: {e}")
+            return jsonify({
+                'error': 'Too many requests. Please wait a moment and try again.',
+                'zone_id': zone_id,
+                'retry_after': 10
+            }), 429
+
+        print(f"Error in /api/stream/generate-story: {e}")
+        traceback.print_exc()
+        return jsonify({
+            'error': 'Failed to generate story',
+            'details': error_str,
+            'type': type(e).__name__
+        }), 500
+
+
 @app.route('/api/refresh/<riot_id>', methods=['POST'])
 def refresh_player(riot_id):
     try:
@@ -772,6 +1009,7 @@ def refresh_player(riot_id):
 
         player = player_repo.get_by_riot_id(riot_id_parsed)
         if player:
+            story_prefetcher.cancel(player.puuid)
             deleted_count = delete_all_stories(player.puuid)
             print(f"Deleted {deleted_count} old stories")
 
@@ -823,21 +1061,18 @@ def generate_card(riot_id):
 
         # Fetch FRESH data from Riot API using Player class
         async def fetch_player_data():
-            async with Player(game_name, tag_line, platform=platform) as player:
+            async with Player(game_name, tag_line, platform=platform, stats_fields=CARD_FIELDS) as player:
                 # Load profile (gets summoner info, rank, champion mastery)
                 success = await player.load_profile()
                 if not success:
                     return None
 
-                # Load recent matches to calculate stats
+                # Load recent matches to calculate stats (card fields only)
                 await player.load_recent_matches(count=15)
 
                 if not player.processed_stats:
                     return None
 
-                # Process matches to get aggregated stats
-                player.process_matches()
-
                 return player
 
         player = run_async(fetch_player_data())
@@ -952,6 +1187,102 @@ def generate_card(riot_id):
         return jsonify({'error': 'Internal server error'}), 500
 
 
+def build_coach_messages(puuid, session_token, user_message, conversation_history):
+    """Build the coach prompt: system prompt with player context and memory, recent history, user message"""
+    # Extract player name from session token (since session has riot_id)
+    session = session_repo.get_session(session_token)
+    player_name = session.riot_id if session else f"Player ({puuid[:8]})"
+
+    print(f"Session valid for player: {player_name}")
+
+    # Set PUUID for tool use (match history access)
+    set_player_puuid(puuid)
+
+    # Load recent conversations from DynamoDB (last 3 conversations)
+    recent_conversations = []
+    try:
+        recent_conversations = conversation_repo.get_recent_conversations(puuid, count=3)
+        if recent_conversations:
+            print(f"Loaded {len(recent_conversations)} previous conversation(s)")
+    except Exception as e:
+        print(f"Could not load conversation history: {e}")
+
+    # Build system prompt with player context
+    system_prompt = SYSTEM_PROMPT
+    system_prompt += f"\n\nPLAYER CONTEXT:\nPlayer: {player_name}\n"
+
+    # Add conversation history context to system prompt
+    if recent_conversations:
+        history_context = "\n\nRECENT CONVERSATION HISTORY:\n"
+        history_context += "You have chatted with this player before. Here are summaries of recent conversations:\n\n"
+
+        for idx, conv in enumerate(reversed(recent_conversations), 1):
+            history_context += f"--- Conversation {idx} (from {conv.created_at[:10]}) ---\n"
+            # Include last few messages from each conversation
+            for msg in conv.messages[-4:]:  # Last 4 messages per conversation
+                role_label = "Player" if msg.role == "user" else "You"
+                history_context += f"{role_label}: {msg.content[:150]}{'...' if len(msg.content) > 150 else ''}\n"
+            history_context += "\n"
+
+        history_context += "Use this context to remember the player's preferences, past discussions, and provide continuity.\n"
+        system_prompt += history_context
+
+    # Initialize messages with system prompt
+    messages = [SystemMessage(content=system_prompt)]
+
+    # Add conversation history (last 6 messages for context)
+    if conversation_history:
+        for msg in conversation_history[-6:]:
+            role = msg.get('role', 'user')
+            content = msg.get('content', '')
+
+            if role == 'user':
+                messages.append(HumanMessage(content=content))
+            elif role == 'ai':
+                messages.append(AIMessage(content=content))
+
+    # Add current user message
+    messages.append(HumanMessage(content=user_message))
+
+    return messages
+
+
+def run_coach_tool(tool_call, messages):
+    """Execute one tool call of a coach response, appending the result to messages"""
+    tool_name = tool_call['name']
+    tool_input = tool_call['args']
+    tool_use_id = tool_call['id']
+
+    print(f"   Tool: {tool_name}({json.dumps(tool_input)})")
+
+    # Execute the tool
+    tool_result = execute_tool(tool_name, tool_input)
+
+    # Add tool result to messages
+    messages.append(ToolMessage(
+        content=json.dumps(tool_result, indent=2),
+        tool_call_id=tool_use_id
+    ))
+
+
+def save_coach_conversation(puuid, user_message, ai_response):
+    """Save the exchange to DynamoDB, returns the conversation or None"""
+    try:
+        from db.src.models.conversation import Conversation
+
+        # Create new conversation
+        conv = Conversation.create_new(puuid)
+        conv.add_message("user", user_message)
+        conv.add_message("assistant", ai_response)
+        conversation_repo.create_conversation(conv)
+
+        print("Conversation saved to DynamoDB")
+        return conv
+    except Exception as db_error:
+        print(f"Could not save conversation: {db_error}")
+        return None
+
+
 @app.route('/api/coach', methods=['POST'])
 def coach_endpoint():
     """
@@ -998,60 +1329,7 @@ def coach_endpoint():
         if not puuid:
             return jsonify({'error': 'Invalid or expired session'}), 401
 
-        # Extract player name from session token (since session has riot_id)
-        session = session_repo.get_session(session_token)
-        player_name = session.riot_id if session else f"Player ({puuid[:8]})"
-
-        print(f"Session valid for player: {player_name}")
-
-        # Set PUUID for tool use (match history access)
-        set_player_puuid(puuid)
-
-        # Load recent conversations from DynamoDB (last 3 conversations)
-        recent_conversations = []
-        try:
-            recent_conversations = conversation_repo.get_recent_conversations(puuid, count=3)
-            if recent_conversations:
-                print(f"Loaded {len(recent_conversations)} previous conversation(s)")
-        except Exception as e:
-            print(f"Could not load conversation history: {e}")
-
-        # Build system prompt with player context
-        system_prompt = SYSTEM_PROMPT
-        system_prompt += f"\n\nPLAYER CONTEXT:\nPlayer: {player_name}\n"
-
-        # Add conversation history context to system prompt
-        if recent_conversations:
-            history_context = "\n\nRECENT CONVERSATION HISTORY:\n"
-            history_context += "You have chatted with this player before. Here are summaries of recent conversations:\n\n"
-
-            for idx, conv in enumerate(reversed(recent_conversations), 1):
-                history_context += f"--- Conversation {idx} (from {conv.created_at[:10]}) ---\n"
-                # Include last few messages from each conversation
-                for msg in conv.messages[-4:]:  # Last 4 messages per conversation
-                    role_label = "Player" if msg.role == "user" else "You"
-                    history_context += f"{role_label}: {msg.content[:150]}{'...' if len(msg.content) > 150 else ''}\n"
-                history_context += "\n"
-
-            history_context += "Use this context to remember the player's preferences, past discussions, and provide continuity.\n"
-            system_prompt += history_context
-
-        # Initialize messages with system prompt
-        messages = [SystemMessage(content=system_prompt)]
-
-        # Add conversation history (last 6 messages for context)
-        if conversation_history:
-            for msg in conversation_history[-6:]:
-                role = msg.get('role', 'user')
-                content = msg.get('content', '')
-
-                if role == 'user':
-                    messages.append(HumanMessage(content=content))
-                elif role == 'ai':
-                    messages.append(AIMessage(content=content))
-
-        # Add current user message
-        messages.append(HumanMessage(content=user_message))
+        messages = build_coach_messages(puuid, session_token, user_message, conversation_history)
 
         # Create chat model with tools
         chat = create_chat()
@@ -1094,20 +1372,7 @@ def coach_endpoint():
                 print(f"AI using {len(response.tool_calls)} tool(s)")
 
                 for tool_call in response.tool_calls:
-                    tool_name = tool_call['name']
-                    tool_input = tool_call['args']
-                    tool_use_id = tool_call['id']
-
-                    print(f"   Tool: {tool_name}({json.dumps(tool_input)})")
-
-                    # Execute the tool
-                    tool_result = execute_tool(tool_name, tool_input)
-
-                    # Add tool result to messages
-                    messages.append(ToolMessage(
-                        content=json.dumps(tool_result, indent=2),
-                        tool_call_id=tool_use_id
-                    ))
+                    run_coach_tool(tool_call, messages)
 
                 # Continue loop to get Claude's response after using tools
                 continue
@@ -1118,18 +1383,7 @@ def coach_endpoint():
                 print(f"AI Response: {ai_response[:100]}...")
 
                 # Save conversation to DynamoDB
-                try:
-                    from db.src.models.conversation import Conversation
-
-                    # Create new conversation
-                    conv = Conversation.create_new(puuid)
-                    conv.add_message("user", user_message)
-                    conv.add_message("assistant", ai_response)
-                    conversation_repo.create_conversation(conv)
-
-                    print("Conversation saved to DynamoDB")
-                except Exception as db_error:
-                    print(f"Could not save conversation: {db_error}")
+                save_coach_conversation(puuid, user_message, ai_response)
 
                 return jsonify({
                     'response': ai_response,
@@ -1152,6 +1406,103 @@ def coach_endpoint():
         }), 500
 
 
+@app.route('/api/stream/coach', methods=['POST'])
+def stream_coach_endpoint():
+    """
+    Streaming version of /api/coach (server-sent events).
+
+    Request body: same as /api/coach
+
+    Events:
+        token  {"text": "..."}                             (answer text as Bedrock produces it)
+        tool   {"name": "...", "args": {...}, "status": "running"|"done"}
+               (tokens streamed before a tool event belong to an intermediate step, not the answer)
+        done   {"response": "...", "status": "success", "conversation_id": "..."}  (persisted exchange)
+               or {"error": "...", "response": "..."} when the tool loop runs out of iterations (as /api/coach)
+        error  {"error": "...", "status": 429|500}
+
+    Validation errors are returned as regular JSON responses before the stream starts.
+    """
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({'error': 'Invalid JSON'}), 400
+
+    session_token = data.get('session_token')
+    user_message = data.get('message', '')
+    conversation_history = data.get('conversationHistory', [])
+
+    if not session_token:
+        return jsonify({'error': 'session_token is required'}), 400
+
+    if not user_message:
+        return jsonify({'error': 'message is required'}), 400
+
+    puuid = session_repo.get_puuid_from_session(session_token)
+    if not puuid:
+        return jsonify({'error': 'Invalid or expired session'}), 401
+
+    print(f"Streaming chat request: {user_message}")
+
+    def events():
+        try:
+            messages = build_coach_messages(puuid, session_token, user_message, conversation_history)
+            chat = create_chat()
+
+            # Tool use loop - one streamed Bedrock call per round
+            max_iterations = 10
+            for _ in range(max_iterations):
+                response = None
+                for chunk in stream_with_retry(chat, messages, context="coach"):
+                    text = chunk_text(chunk)
+                    if text:
+                        yield sse_event('token', {'text': text})
+                    response = chunk if response is None else response + chunk
+
+                if response is None:
+                    # Bedrock closed the stream without a single chunk
+                    yield sse_event('error', {'error': 'AI returned an empty response', 'status': 500})
+                    return
+
+                # Add AI response to history
+                messages.append(response)
+
+                if not response.tool_calls:
+                    ai_response = chunk_text(response)
+                    conv = save_coach_conversation(puuid, user_message, ai_response)
+                    yield sse_event('done', {
+                        'response': ai_response,
+                        'status': 'success',
+                        'conversation_id': conv.conversation_id if conv else None
+                    })
+                    return
+
+                print(f"AI using {len(response.tool_calls)} tool(s)")
+                for tool_call in response.tool_calls:
+                    yield sse_event('tool', {'name': tool_call['name'], 'args': tool_call['args'], 'status': 'running'})
+                    run_coach_tool(tool_call, messages)
+                    yield sse_event('tool', {'name': tool_call['name'], 'args': tool_call['args'], 'status': 'done'})
+
+            # Max iterations reached: /api/coach answers this with a 200, so it ends the stream as done
+            yield sse_event('done', {
+                'error': 'AI processing took too long',
+                'response': 'I apologize, but I need to simplify my analysis. Could you rephrase your question?'
+            })
+
+        except Exception as e:
+            print(f"\nError in /api/stream/coach: {e}")
+            traceback.print_exc()
+            if "RATE_LIMIT_ERROR" in str(e):
+                yield sse_event('error', {
+                    'error': 'Too many requests. Please wait a moment and try again.',
+                    'retry_after': 10,
+                    'status': 429
+                })
+            else:
+                yield sse_event('error', {'error': 'Internal server error', 'message': str(e), 'status': 500})
+
+    return sse_response(events())
+
+
 # ============================================================================
 # STATIC FILE SERVING (Must be last to not override API routes)
 # ============================================================================
@@ -82,6 +82,16 @@ TABLE_CONFIGS = [
             {'AttributeName': 'zone_id', 'AttributeType': 'S'}
         ]
     },
+    {
+        'name': 'StoryCache',
+        'description': 'Stores AI-generated zone stories by content fingerprint (zone, mode, prompt version, model, stats), shared across players',
+        'key_schema': [
+            {'AttributeName': 'fingerprint', 'KeyType': 'HASH'}  # Partition key: sha256 hex digest
+        ],
+        'attribute_definitions': [
+            {'AttributeName': 'fingerprint', 'AttributeType': 'S'}
+        ]
+    },
     {
         'name': 'PlayerTitles',
         'description': 'Stores generated player titles based on playstyle and champions',
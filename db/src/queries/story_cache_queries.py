@@ -0,0 +1,61 @@
+import time
+from ..db_handshake import get_dynamodb_resources
+
+
+def get_table():
+    dynamodb = get_dynamodb_resources()
+    return dynamodb.Table('StoryCache')
+
+
+def store_cached_story(fingerprint, story_text, zone_id=None, story_mode=None):
+    table = get_table()
+
+    timestamp = int(time.time())
+    ttl = timestamp + (30 * 24 * 60 * 60)
+
+    item = {
+        'fingerprint': fingerprint,
+        'story_text': story_text,
+        'zone_id': zone_id or '',
+        'story_mode': story_mode or '',
+        'generated_at': timestamp,
+        'ttl': ttl
+    }
+
+    table.put_item(Item=item)
+    return item
+
+
+def get_cached_story_item(fingerprint):
+    table = get_table()
+
+    response = table.get_item(
+        Key={
+            'fingerprint': fingerprint
+        }
+    )
+
+    item = response.get('Item')
+    if not item:
+        return None
+
+    # DynamoDB TTL deletion is lazy, expired items can still be returned for a while
+    if item.get('ttl') and int(item['ttl']) < int(time.time()):
+        return None
+
+    return item
+
+
+def get_cached_story(fingerprint):
+    item = get_cached_story_item(fingerprint)
+    return item.get('story_text') if item else None
+
+
+def delete_cached_story(fingerprint):
+    table = get_table()
+
+    table.delete_item(
+        Key={
+            'fingerprint': fingerprint
+        }
+    )